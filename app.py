@@ -29,6 +29,7 @@ from PyQt5.QtCore import Qt
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from ui.main_window import MeetingAssistantWindow
+from transcription.model_cache import model_cache
 from config.settings import Config
 
 def check_dependencies():
@@ -95,6 +96,11 @@ def main():
     # Setup environment
     setup_environment()
 
+    # Warm the Whisper model in the background so the first transcription doesn't wait for it
+    model_cache.preload(Config.WHISPER_MODEL)
+    if Config.TWO_PASS_TRANSCRIPTION:
+        model_cache.preload(Config.DRAFT_WHISPER_MODEL)
+
     # Create QApplication
     app = QApplication(sys.argv)
     app.setApplicationName("Meeting Assistant")
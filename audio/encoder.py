@@ -0,0 +1,150 @@
+import queue
+import subprocess
+import tempfile
+import threading
+
+class StreamingEncoder:
+    """Long-lived FFmpeg process that encodes raw PCM chunks fed through stdin
+
+    Chunks are queued and written to FFmpeg by a thread of its own, so a
+    slow or stalled encoder never blocks the caller. If more than
+    max_pending chunks back up, the encoder is given up on (failed is
+    set) and the caller keeps its own copy of the audio instead.
+    """
+
+    def __init__(self, filepath, sample_rate, channels, bitrate='128k', max_pending=256):
+        self.filepath = filepath
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.bitrate = bitrate
+        self.process = None
+        self.failed = False
+        self.error = None
+        self._stderr = None
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._writer = None
+
+    def start(self):
+        """Launch the encoder process, returning False if it could not start"""
+        # FFmpeg diagnostics go to a temp file so a chatty encoder can never
+        # block on a full stderr pipe while we are feeding stdin
+        self._stderr = tempfile.TemporaryFile()
+        try:
+            self.process = subprocess.Popen([
+                'ffmpeg', '-loglevel', 'error',
+                '-f', 's16le',
+                '-ar', str(self.sample_rate),
+                '-ac', str(self.channels),
+                '-i', 'pipe:0',
+                '-codec:a', 'libmp3lame',
+                '-b:a', self.bitrate,
+                '-y',  # Overwrite output file
+                self.filepath
+            ], stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=self._stderr)
+        except FileNotFoundError:
+            self._fail("FFmpeg not found")
+            return False
+        except Exception as e:
+            self._fail(f"Failed to start FFmpeg: {e}")
+            return False
+
+        self._writer = threading.Thread(target=self._feed, daemon=True)
+        self._writer.start()
+        return True
+
+    def write(self, data):
+        """Queue a chunk of raw PCM for the encoder; never blocks"""
+        if self.failed or not self.process:
+            return False
+
+        try:
+            self._queue.put_nowait(data)
+            return True
+        except queue.Full:
+            self._fail(f"Encoder fell behind by more than {self._queue.maxsize} chunks")
+            return False
+
+    def finish(self, timeout=10):
+        """Close stdin and wait for the encoder to flush, returning success"""
+        if not self.process:
+            return False
+
+        if not self.failed:
+            try:
+                self._queue.put(None, timeout=timeout)
+                self._writer.join(timeout)
+            except queue.Full:
+                pass
+            if self._writer.is_alive():
+                self._fail("Encoder did not finish in time")
+        if self.failed:
+            # Whatever it has written is incomplete; the caller falls back to its own copy
+            self.abort()
+            return False
+
+        try:
+            self.process.stdin.close()
+        except (BrokenPipeError, OSError) as e:
+            self._fail(f"Encoder stopped accepting audio: {e}")
+
+        try:
+            returncode = self.process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+            self._fail("Encoder did not finish in time")
+            self._close_stderr()
+            return False
+
+        if returncode != 0:
+            self._fail(f"FFmpeg exited with code {returncode}")
+        self._close_stderr()
+
+        return not self.failed
+
+    def abort(self):
+        """Terminate the encoder without waiting for it to flush"""
+        if self.process and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+        if self._writer:
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                pass  # The writer is mid-write, and that write fails now the process is gone
+            self._writer.join(1)
+        self._close_stderr()
+
+    def _feed(self):
+        """Writer thread: pass queued chunks to FFmpeg until None arrives or the pipe breaks"""
+        while True:
+            data = self._queue.get()
+            if data is None:
+                return
+            try:
+                self.process.stdin.write(data)
+            except (BrokenPipeError, OSError, ValueError) as e:
+                self._fail(f"Encoder stopped accepting audio: {e}")
+                return
+
+    def _fail(self, message):
+        self.failed = True
+        if self.error is None:
+            self.error = message
+            details = self._read_stderr()
+            if details:
+                self.error += f"\n{details}"
+
+    def _read_stderr(self):
+        if not self._stderr:
+            return ""
+        try:
+            self._stderr.seek(0)
+            return self._stderr.read().decode('utf-8', errors='replace').strip()
+        except Exception:
+            return ""
+
+    def _close_stderr(self):
+        if self._stderr:
+            self._stderr.close()
+            self._stderr = None
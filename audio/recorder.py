@@ -1,26 +1,41 @@
 import pyaudio
 import wave
+import os
 import threading
 import time
 from datetime import datetime
 from config.settings import Config
+from audio.encoder import StreamingEncoder
+from audio.resampler import StreamingResampler
+from audio.utils import get_analysis_path
 
 class AudioRecorder:
     def __init__(self):
         self.audio = pyaudio.PyAudio()
         self.is_recording = False
-        self.frames = []
         self.stream = None
         self.recording_thread = None
+        self.filepath = None
+        self.spool_path = None
+        self.wave_file = None
+        self.encoder = None
+        self.resampler = None
+        self.analysis_file = None
+        self.listeners = []
+
+    def add_listener(self, callback):
+        """Receive each captured chunk as 16 kHz mono float32 samples"""
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
 
     def start_recording(self):
         """Start audio recording in a separate thread"""
         if self.is_recording:
             return False
 
-        self.frames = []
-        self.is_recording = True
-
         # Configure audio stream
         self.stream = self.audio.open(
             format=pyaudio.paInt16,
@@ -30,6 +45,34 @@ class AudioRecorder:
             frames_per_buffer=Config.CHUNK_SIZE
         )
 
+        # Generate filename with timestamp and configured format
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"recording_{timestamp}.{Config.AUDIO_FORMAT}"
+        self.filepath = f"{Config.AUDIO_DIR}/{filename}"
+
+        # Chunks are streamed to a WAV spool file as they arrive, so memory
+        # use stays flat regardless of how long the recording runs
+        self.spool_path = self._get_spool_path(self.filepath)
+        self.wave_file = self._open_wave_file(self.spool_path)
+
+        # MP3 is encoded while recording so it is ready right after stop
+        self.encoder = None
+        if Config.AUDIO_FORMAT.lower() == 'mp3':
+            self.encoder = StreamingEncoder(
+                self.filepath, Config.SAMPLE_RATE, Config.CHANNELS, Config.MP3_BITRATE,
+                max_pending=int(Config.MP3_ENCODER_BUFFER_SECONDS * Config.SAMPLE_RATE / Config.CHUNK_SIZE)
+            )
+            if not self.encoder.start():
+                print(f"MP3 encoder unavailable, recording will be saved as WAV: {self.encoder.error}")
+
+        # Whisper-ready 16 kHz mono copy for listeners and the analysis file
+        self.resampler = StreamingResampler(Config.SAMPLE_RATE, Config.CHANNELS)
+        self.analysis_file = None
+        if Config.ANALYSIS_STREAM:
+            self.analysis_file = open(get_analysis_path(self.filepath), 'wb')
+
+        self.is_recording = True
+
         # Start recording in separate thread
         self.recording_thread = threading.Thread(target=self._record_audio)
         self.recording_thread.start()
@@ -52,107 +95,96 @@ class AudioRecorder:
             self.stream.stop_stream()
             self.stream.close()
 
-        # Generate filename with timestamp and configured format
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"recording_{timestamp}.{Config.AUDIO_FORMAT}"
-        filepath = f"{Config.AUDIO_DIR}/{filename}"
+        # Closing the spool file patches the WAV header with the final length
+        if self.wave_file:
+            self.wave_file.close()
+            self.wave_file = None
+
+        if self.analysis_file:
+            self.analysis_file.close()
+            self.analysis_file = None
 
         # Save the recording and get the actual filepath
-        actual_filepath = self._save_recording(filepath)
+        actual_filepath = self._save_recording(self.filepath)
 
-        return actual_filepath or filepath
+        return actual_filepath or self.filepath
 
     def _record_audio(self):
         """Internal method to continuously record audio"""
         while self.is_recording:
             try:
                 data = self.stream.read(Config.CHUNK_SIZE, exception_on_overflow=False)
-                self.frames.append(data)
+                # writeframesraw skips the per-chunk header patch; the header
+                # is fixed up once when the spool file is closed
+                self.wave_file.writeframesraw(data)
+
+                if self.analysis_file or self.listeners:
+                    samples = self.resampler.process(data)
+                    if self.analysis_file:
+                        self.analysis_file.write(samples.tobytes())
+                    for listener in list(self.listeners):
+                        listener(samples)
+
+                if self.encoder and not self.encoder.failed:
+                    if not self.encoder.write(data):
+                        print(f"MP3 encoder failed, recording will be saved as WAV: {self.encoder.error}")
             except Exception as e:
                 print(f"Error during recording: {e}")
                 break
 
+    def _get_spool_path(self, filepath):
+        """Get the WAV file that chunks are streamed to during recording"""
+        if Config.AUDIO_FORMAT.lower() == 'wav':
+            return filepath
+        elif Config.AUDIO_FORMAT.lower() == 'mp3':
+            return filepath.replace('.mp3', '_temp.wav')
+        else:
+            return filepath.replace(f'.{Config.AUDIO_FORMAT}', '.wav')
+
+    def _open_wave_file(self, filepath):
+        """Open a WAV file for streaming writes"""
+        wf = wave.open(filepath, 'wb')
+        wf.setnchannels(Config.CHANNELS)
+        wf.setsampwidth(self.audio.get_sample_size(pyaudio.paInt16))
+        wf.setframerate(Config.SAMPLE_RATE)
+        return wf
+
     def _save_recording(self, filepath):
-        """Save recorded frames to audio file in configured format"""
+        """Finalize the spooled recording in the configured format"""
         try:
             if Config.AUDIO_FORMAT.lower() == 'wav':
-                # Save directly as WAV
-                with wave.open(filepath, 'wb') as wf:
-                    wf.setnchannels(Config.CHANNELS)
-                    wf.setsampwidth(self.audio.get_sample_size(pyaudio.paInt16))
-                    wf.setframerate(Config.SAMPLE_RATE)
-                    wf.writeframes(b''.join(self.frames))
+                # Spool file is already the final WAV
                 print(f"Recording saved to: {filepath}")
                 return filepath
 
             elif Config.AUDIO_FORMAT.lower() == 'mp3':
-                # Save as WAV first, then convert to MP3 using FFmpeg directly
-                temp_wav_path = filepath.replace('.mp3', '_temp.wav')
-
-                # Save temporary WAV file
-                with wave.open(temp_wav_path, 'wb') as wf:
-                    wf.setnchannels(Config.CHANNELS)
-                    wf.setsampwidth(self.audio.get_sample_size(pyaudio.paInt16))
-                    wf.setframerate(Config.SAMPLE_RATE)
-                    wf.writeframes(b''.join(self.frames))
-
-                # Convert WAV to MP3 using FFmpeg directly
-                try:
-                    import subprocess
-                    import os
-
-                    # Use FFmpeg to convert WAV to MP3
-                    result = subprocess.run([
-                        'ffmpeg', '-i', temp_wav_path,
-                        '-codec:a', 'libmp3lame',
-                        '-b:a', '128k',
-                        '-y',  # Overwrite output file
-                        filepath
-                    ], capture_output=True, text=True, check=True)
-
-                    # Clean up temporary WAV file
-                    os.remove(temp_wav_path)
+                # The encoder has been fed during recording; the WAV spool is
+                # kept until it finishes so no frames are lost if it failed
+                temp_wav_path = self.spool_path
+                encoder, self.encoder = self.encoder, None
 
+                if encoder and encoder.finish():
+                    os.remove(temp_wav_path)
                     print(f"Recording saved to: {filepath}")
                     return filepath
 
-                except subprocess.CalledProcessError as e:
-                    # FFmpeg conversion failed
-                    import os
-                    wav_filepath = filepath.replace('.mp3', '.wav')
-                    if os.path.exists(temp_wav_path):
-                        os.rename(temp_wav_path, wav_filepath)
-                    print(f"MP3 conversion failed - saved as WAV: {wav_filepath}")
-                    print(f"FFmpeg error: {e.stderr}")
-                    return wav_filepath
-
-                except FileNotFoundError:
-                    # FFmpeg not found in PATH
-                    import os
-                    wav_filepath = filepath.replace('.mp3', '.wav')
-                    os.rename(temp_wav_path, wav_filepath)
-                    print(f"FFmpeg not found - saved as WAV: {wav_filepath}")
-                    print(f"To enable MP3 support, install FFmpeg: brew install ffmpeg")
-                    return wav_filepath
-
-                except Exception as e:
-                    # Other conversion error
-                    import os
-                    wav_filepath = filepath.replace('.mp3', '.wav')
-                    if os.path.exists(temp_wav_path):
-                        os.rename(temp_wav_path, wav_filepath)
-                    print(f"MP3 conversion failed - saved as WAV: {wav_filepath}")
-                    print(f"Error details: {e}")
-                    return wav_filepath
+                # Encoding failed - keep the complete WAV spool instead
+                if encoder:
+                    encoder.abort()
+                    if os.path.exists(filepath):
+                        os.remove(filepath)
+                wav_filepath = filepath.replace('.mp3', '.wav')
+                os.rename(temp_wav_path, wav_filepath)
+                print(f"MP3 encoding failed - saved as WAV: {wav_filepath}")
+                if encoder and encoder.error:
+                    print(f"FFmpeg error: {encoder.error}")
+                    if encoder.error.startswith("FFmpeg not found"):
+                        print("To enable MP3 support, install FFmpeg: brew install ffmpeg")
+                return wav_filepath
             else:
                 # Default to WAV for unsupported formats
                 print(f"Unsupported format '{Config.AUDIO_FORMAT}', saving as WAV")
-                wav_filepath = filepath.replace(f'.{Config.AUDIO_FORMAT}', '.wav')
-                with wave.open(wav_filepath, 'wb') as wf:
-                    wf.setnchannels(Config.CHANNELS)
-                    wf.setsampwidth(self.audio.get_sample_size(pyaudio.paInt16))
-                    wf.setframerate(Config.SAMPLE_RATE)
-                    wf.writeframes(b''.join(self.frames))
+                wav_filepath = self.spool_path
                 print(f"Recording saved to: {wav_filepath}")
                 return wav_filepath
 
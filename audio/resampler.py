@@ -0,0 +1,58 @@
+import numpy as np
+
+# Whisper expects 16 kHz mono float32 input
+WHISPER_SAMPLE_RATE = 16000
+
+class StreamingResampler:
+    """Convert int16 PCM chunks to 16 kHz mono float32 as they are captured
+
+    Each chunk is low-passed with a windowed-sinc FIR filter and then
+    linearly interpolated onto the output grid. Filter history and the
+    output position are carried between chunks, so feeding a recording in
+    pieces gives the same result as resampling it in one go.
+    """
+
+    def __init__(self, input_rate, channels=1, output_rate=WHISPER_SAMPLE_RATE, num_taps=63):
+        self.input_rate = input_rate
+        self.channels = channels
+        self.output_rate = output_rate
+        self.step = input_rate / output_rate  # input samples per output sample
+
+        # Anti-aliasing filter with its cutoff just below the output Nyquist
+        cutoff = 0.45 * min(1.0, output_rate / input_rate)
+        n = np.arange(num_taps) - (num_taps - 1) / 2
+        taps = np.sinc(2 * cutoff * n) * np.hamming(num_taps)
+        self.taps = (taps / taps.sum()).astype(np.float32)
+
+        self._history = np.zeros(num_taps - 1, dtype=np.float32)
+        self._last_sample = np.float32(0.0)
+        self._consumed = 0  # filtered input samples seen so far
+        self._next_output = 0  # index of the next output sample
+
+    def process(self, data):
+        """Resample a chunk of raw int16 PCM bytes, returning float32 samples"""
+        samples = np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels).mean(axis=1)
+        if samples.size == 0:
+            return np.zeros(0, dtype=np.float32)
+
+        padded = np.concatenate((self._history, samples))
+        filtered = np.convolve(padded, self.taps, mode='valid').astype(np.float32)
+        self._history = padded[-(len(self.taps) - 1):]
+
+        # buffer[i] holds filtered input sample (consumed - 1 + i)
+        buffer = np.concatenate(([self._last_sample], filtered))
+        limit = self._consumed + len(filtered) - 1
+        end_output = max(self._next_output, int(np.ceil(limit / self.step)))
+
+        positions = np.arange(self._next_output, end_output) * self.step - (self._consumed - 1)
+        index = positions.astype(np.int64)
+        frac = (positions - index).astype(np.float32)
+        output = buffer[index] * (1.0 - frac) + buffer[index + 1] * frac
+
+        self._consumed += len(filtered)
+        self._last_sample = filtered[-1]
+        self._next_output = end_output
+
+        return output.astype(np.float32, copy=False)
@@ -1,5 +1,6 @@
 import os
 import wave
+import numpy as np
 
 def get_audio_duration(filepath):
     """Get duration of audio file in seconds"""
@@ -30,4 +31,29 @@ def format_duration(seconds):
     """Format duration in seconds to MM:SS format"""
     minutes = int(seconds // 60)
     seconds = int(seconds % 60)
-    return f"{minutes:02d}:{seconds:02d}"
\ No newline at end of file
+    return f"{minutes:02d}:{seconds:02d}"
+
+def get_analysis_path(audio_filepath):
+    """Get the path of the 16 kHz analysis stream recorded alongside an audio file"""
+    return os.path.splitext(audio_filepath)[0] + '.16k.f32'
+
+def remove_analysis_audio(audio_filepath):
+    """Delete the analysis stream of an audio file, if there is one"""
+    try:
+        os.remove(get_analysis_path(audio_filepath))
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"Error deleting analysis stream: {e}")
+
+def load_analysis_audio(audio_filepath):
+    """Load the 16 kHz mono float32 analysis stream for an audio file, if one exists"""
+    analysis_path = get_analysis_path(audio_filepath)
+    if not os.path.exists(analysis_path) or os.path.getsize(analysis_path) == 0:
+        return None
+
+    try:
+        return np.fromfile(analysis_path, dtype=np.float32)
+    except Exception as e:
+        print(f"Error loading analysis stream: {e}")
+        return None
\ No newline at end of file
@@ -0,0 +1,147 @@
+import numpy as np
+from config.settings import Config
+from audio.resampler import WHISPER_SAMPLE_RATE
+
+class TimeMap:
+    """Map times in silence-stripped audio back to times in the original audio"""
+
+    def __init__(self, regions, sample_rate=WHISPER_SAMPLE_RATE, original_samples=0):
+        self.sample_rate = sample_rate
+        self.original_samples = original_samples
+        self.original_starts = np.array([start for start, _ in regions], dtype=np.int64)
+        lengths = np.array([end - start for start, end in regions], dtype=np.int64)
+        self.lengths = lengths
+        self.compact_starts = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.int64)
+
+    @property
+    def original_duration(self):
+        return self.original_samples / self.sample_rate
+
+    @property
+    def speech_duration(self):
+        return int(self.lengths.sum()) / self.sample_rate
+
+    @property
+    def skipped_fraction(self):
+        if not self.original_samples:
+            return 0.0
+        return 1.0 - self.lengths.sum() / self.original_samples
+
+    def to_original(self, times, is_end=False):
+        """Convert compact times (seconds) to original times (seconds)
+
+        A time that falls exactly on the join between two regions is placed
+        at the end of the earlier region when it is a segment end, and at the
+        start of the later region otherwise.
+        """
+        times = np.asarray(times, dtype=np.float64)
+        if len(self.lengths) == 0:
+            return times
+
+        samples = times * self.sample_rate
+        side = 'left' if is_end else 'right'
+        region = np.searchsorted(self.compact_starts, samples, side=side) - 1
+        region = np.clip(region, 0, len(self.lengths) - 1)
+        offset = samples - self.compact_starts[region]
+        return (self.original_starts[region] + offset) / self.sample_rate
+
+    def map_segments(self, segments):
+        """Rewrite Whisper segment (and word) timestamps in place"""
+        if not segments:
+            return segments
+
+        starts = self.to_original([seg["start"] for seg in segments])
+        ends = self.to_original([seg["end"] for seg in segments], is_end=True)
+        for seg, start, end in zip(segments, starts, ends):
+            seg["start"] = float(start)
+            seg["end"] = float(end)
+            for word in seg.get("words") or []:
+                word["start"] = float(self.to_original(word["start"]))
+                word["end"] = float(self.to_original(word["end"], is_end=True))
+        return segments
+
+class VoiceActivityDetector:
+    """Frame energy / zero-crossing voice activity detection on 16 kHz float32 audio"""
+
+    def __init__(self, sample_rate=WHISPER_SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.frame_size = int(sample_rate * Config.VAD_FRAME_MS / 1000)
+        self.energy_margin_db = Config.VAD_ENERGY_MARGIN_DB
+        self.speech_range_db = Config.VAD_SPEECH_RANGE_DB
+        self.min_speech_frames = max(1, Config.VAD_MIN_SPEECH_MS // Config.VAD_FRAME_MS)
+        self.min_silence_frames = max(1, Config.VAD_MIN_SILENCE_MS // Config.VAD_FRAME_MS)
+        self.padding = int(sample_rate * Config.VAD_PADDING_MS / 1000)
+
+    def detect(self, audio):
+        """Return speech regions as a list of (start_sample, end_sample)"""
+        num_frames = len(audio) // self.frame_size
+        if num_frames == 0:
+            return []
+
+        frames = audio[:num_frames * self.frame_size].reshape(num_frames, self.frame_size)
+
+        energy_db = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / self.frame_size
+
+        # Threshold relative to the noise floor of this recording, so quiet
+        # microphones and noisy rooms are treated alike
+        noise_floor = np.percentile(energy_db, 10)
+        threshold = noise_floor + self.energy_margin_db
+        # Without real pauses the "floor" is a quiet speaker; never cut that far into the speech range
+        loudest = np.percentile(energy_db, 99)
+        threshold = min(threshold, loudest - self.speech_range_db)
+        threshold = max(threshold, Config.VAD_MIN_ENERGY_DB)
+
+        # Voiced speech is loud; unvoiced consonants are quieter but have a
+        # high zero-crossing rate. Very high rates are broadband hiss.
+        voiced = energy_db > threshold
+        unvoiced = (energy_db > threshold - self.energy_margin_db / 2) & (zcr > 0.1) & (zcr < 0.5)
+        speech = voiced | unvoiced
+
+        # Bridge short pauses, then drop blips too short to be speech
+        speech = self._fill_runs(speech, False, self.min_silence_frames)
+        speech = self._fill_runs(speech, True, self.min_speech_frames)
+
+        starts, ends = self._runs(speech, True)
+        starts = np.maximum(starts * self.frame_size - self.padding, 0)
+        ends = np.minimum(ends * self.frame_size + self.padding, len(audio))
+
+        # Merge regions that overlap after padding
+        regions = []
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            if regions and start <= regions[-1][1]:
+                regions[-1] = (regions[-1][0], max(regions[-1][1], end))
+            else:
+                regions.append((start, end))
+        return regions
+
+    def strip_silence(self, audio):
+        """Return (speech_audio, TimeMap) with non-speech regions removed"""
+        regions = self.detect(audio)
+        time_map = TimeMap(regions, self.sample_rate, len(audio))
+        if not regions:
+            return np.zeros(0, dtype=audio.dtype), time_map
+
+        speech_audio = np.concatenate([audio[start:end] for start, end in regions])
+        return speech_audio, time_map
+
+    @staticmethod
+    def _runs(mask, value):
+        """Start and end indices of runs where mask == value"""
+        padded = np.concatenate(([False], mask == value, [False])).astype(np.int8)
+        edges = np.flatnonzero(np.diff(padded))
+        return edges[0::2], edges[1::2]
+
+    @classmethod
+    def _fill_runs(cls, mask, value, min_length):
+        """Flip interior runs of `value` shorter than min_length"""
+        mask = mask.copy()
+        starts, ends = cls._runs(mask, value)
+        short = (ends - starts) < min_length
+        if not value:
+            # Leading and trailing silence is not a pause between speech
+            short &= (starts > 0) & (ends < len(mask))
+        for start, end in zip(starts[short], ends[short]):
+            mask[start:end] = not value
+        return mask
@@ -6,25 +6,87 @@ load_dotenv()
 class Config:
     # API Keys
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
+    OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL') or None  # Proxy or local stand-in server; None uses api.openai.com
 
     # Audio Recording Settings
     SAMPLE_RATE = 44100
     CHANNELS = 1
     CHUNK_SIZE = 1024
     AUDIO_FORMAT = 'mp3'
+    MP3_BITRATE = '128k'
+    MP3_ENCODER_BUFFER_SECONDS = 10  # Audio the encoder may fall behind by before recording falls back to WAV
+    ANALYSIS_STREAM = True  # Also record a 16 kHz copy that Whisper can use directly
 
     # File Paths
     OUTPUT_DIR = 'outputs'
     AUDIO_DIR = os.path.join(OUTPUT_DIR, 'audio')
     TRANSCRIPT_DIR = os.path.join(OUTPUT_DIR, 'transcripts')
     SUMMARY_DIR = os.path.join(OUTPUT_DIR, 'summaries')
+    CACHE_DIR = os.path.join(OUTPUT_DIR, 'cache')
+    JOBS_DIR = os.path.join(OUTPUT_DIR, 'jobs')
+
+    # Cache Settings
+    TRANSCRIPTION_CACHE_MAX_BYTES = 200 * 1024 ** 2
+    SUMMARY_CACHE_MAX_BYTES = 20 * 1024 ** 2
+
+    # Related meetings: hashed word features per meeting (100k meetings x 1024 take 400 MB on disk)
+    SIMILARITY_DIMENSIONS = 1024
 
     # Whisper Settings (Local Only)
     WHISPER_MODEL = 'base'  # tiny, base, small, medium, large
+    WHISPER_DECODE_OPTIONS = {}  # Extra keyword arguments for model.transcribe
+    WHISPER_DEVICE = None  # None uses the backend's default (CUDA when available for 'whisper')
+    TRANSCRIPTION_BACKEND = 'whisper'  # whisper, whisper-int8 (quantized CPU), faster-whisper
+    MODEL_CACHE_IDLE_TIMEOUT = 15 * 60  # Seconds before an unused model is unloaded
+    MODEL_CACHE_MAX_BYTES = 2 * 1024 ** 3  # Evict least recently used models above this
+
+    # Two-pass transcription: fast draft, then refine with WHISPER_MODEL
+    TWO_PASS_TRANSCRIPTION = False
+    DRAFT_WHISPER_MODEL = 'tiny'
+    REFINE_WINDOW_SECONDS = 30
+    RESUMMARIZE_SIMILARITY_THRESHOLD = 0.9  # Re-run a draft summary if the refined text is less similar
+
+    # Live transcription while recording
+    LIVE_TRANSCRIPTION = False
+    LIVE_WINDOW_SECONDS = 30  # Whisper's native window length
+    LIVE_CUT_SEARCH_SECONDS = 10  # Look this far back from the window end for a pause
+
+    # Parallel chunked transcription of long recordings (1 worker disables it)
+    PARALLEL_WORKERS = 1
+    PARALLEL_MIN_SECONDS = 10 * 60  # Shorter recordings are transcribed in one pass
+    PARALLEL_CHUNK_SECONDS = 5 * 60
+    PARALLEL_CHUNK_OVERLAP_SECONDS = 5  # Only used when a chunk has to be cut mid-speech
+
+    # Checkpointed transcription: finished chunks survive a crash or close and are resumed
+    CHECKPOINT_CHUNK_SECONDS = 2 * 60  # Also bounds how long cancellation takes
+
+    # Voice Activity Detection (strip silence before transcription)
+    VAD_ENABLED = True
+    VAD_FRAME_MS = 30
+    VAD_ENERGY_MARGIN_DB = 10  # Speech must be this far above the noise floor
+    VAD_MIN_ENERGY_DB = -55  # Absolute floor for near-silent recordings
+    VAD_SPEECH_RANGE_DB = 20  # Speakers this much quieter than the loudest speech are still kept
+    VAD_MIN_SPEECH_MS = 240
+    VAD_MIN_SILENCE_MS = 900  # Shorter pauses are kept
+    VAD_PADDING_MS = 200
 
     # OpenAI Settings
     OPENAI_MODEL = 'gpt-4o-mini'  # or 'gpt-4' for better quality
 
+    # Long transcripts are summarized part by part (map), then merged (reduce)
+    SUMMARY_SINGLE_PASS_MAX_TOKENS = 12000  # Longer transcripts use map-reduce
+    SUMMARY_CHUNK_TOKENS = 4000
+    SUMMARY_CONCURRENCY = 4  # Parallel requests per stage
+    SUMMARY_API_DEADLINE_SECONDS = 8.0  # Show the local summary if OpenAI hasn't started answering by then
+
+    # Async client for batch summarization jobs
+    OPENAI_MAX_CONCURRENCY = 8  # Requests in flight at once
+    OPENAI_REQUESTS_PER_MINUTE = 500  # Match your account's rate limits; 0 disables a limit
+    OPENAI_TOKENS_PER_MINUTE = 200000
+    OPENAI_MAX_RETRIES = 6  # Retries on 429, 5xx and connection errors
+    OPENAI_BACKOFF_BASE_SECONDS = 1.0
+    OPENAI_BACKOFF_MAX_SECONDS = 60.0
+
     @classmethod
     def create_directories(cls):
         """Create necessary output directories"""
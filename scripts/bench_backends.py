@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Compare transcription backends on a corpus: real-time factor, peak memory and WER
+
+The corpus is a directory of audio files, each with a reference
+transcript next to it under the same name with a .txt extension
+(meeting.wav + meeting.txt). Every backend runs in a fresh process, so
+its peak resident memory (model load plus transcription) is measured on
+its own. Each process loads the model once, then transcribes every file
+with Config.WHISPER_DECODE_OPTIONS and reports:
+
+- RTF: transcription seconds per second of audio (below 1 is faster than real time)
+- peak RSS of the process, in MB
+- WER: word edit distance to the references over the whole corpus, after
+  lowercasing and dropping punctuation
+
+Backends that can't load (e.g. faster-whisper not installed) are reported and skipped.
+
+Usage: python scripts/bench_backends.py corpus_dir [model] [backends ...]
+       (default: Config.WHISPER_MODEL, whisper whisper-int8 faster-whisper)
+"""
+
+import multiprocessing
+import os
+import re
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import Config
+from audio.resampler import WHISPER_SAMPLE_RATE
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+AUDIO_EXTENSIONS = ('.wav', '.mp3', '.m4a', '.flac', '.ogg')
+
+def load_corpus(directory):
+    """[(audio path, reference text)] for every audio file that has a reference transcript"""
+    corpus = []
+    for name in sorted(os.listdir(directory)):
+        base, extension = os.path.splitext(name)
+        reference_path = os.path.join(directory, base + '.txt')
+        if extension.lower() in AUDIO_EXTENSIONS and os.path.exists(reference_path):
+            with open(reference_path, 'r', encoding='utf-8') as f:
+                corpus.append((os.path.join(directory, name), f.read()))
+    return corpus
+
+def words(text):
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+def edit_distance(reference, hypothesis):
+    """Word-level Levenshtein distance"""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1]
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+def run_backend(backend, model_name, corpus):
+    """Runs in a fresh process; returns a dict of measurements or {"error": ...}"""
+    import whisper
+    from audio.utils import load_analysis_audio
+    from transcription.backends import get_backend
+    warnings.filterwarnings("ignore", message="FP16 is not supported on CPU; using FP32 instead")
+
+    try:
+        start_time = time.perf_counter()
+        model = get_backend(backend).load_model(model_name, get_backend(backend).default_device())
+        load_seconds = time.perf_counter() - start_time
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+    audio_seconds = transcribe_seconds = 0.0
+    errors = reference_words = 0
+    for audio_path, reference in corpus:
+        audio = load_analysis_audio(audio_path)
+        if audio is None:
+            audio = whisper.load_audio(audio_path)
+        audio_seconds += len(audio) / WHISPER_SAMPLE_RATE
+
+        start_time = time.perf_counter()
+        result = model.transcribe(audio, **Config.WHISPER_DECODE_OPTIONS)
+        transcribe_seconds += time.perf_counter() - start_time
+
+        reference_words += len(words(reference))
+        errors += edit_distance(words(reference), words(result["text"]))
+
+    return {
+        "load_seconds": load_seconds,
+        "rtf": transcribe_seconds / max(audio_seconds, 1e-9),
+        "peak_rss_mb": peak_rss_mb(),
+        "wer": errors / max(reference_words, 1),
+        "audio_seconds": audio_seconds,
+    }
+
+def main():
+    if len(sys.argv) < 2:
+        raise SystemExit(__doc__.strip().splitlines()[-2])
+    corpus = load_corpus(sys.argv[1])
+    if not corpus:
+        raise SystemExit(f"No audio files with reference transcripts in {sys.argv[1]}")
+    model_name = sys.argv[2] if len(sys.argv) > 2 else Config.WHISPER_MODEL
+    backends = sys.argv[3:] or ['whisper', 'whisper-int8', 'faster-whisper']
+
+    print(f"{len(corpus)} files, Whisper-{model_name}")
+    print(f"{'backend':>15} {'load':>7} {'RTF':>7} {'peak RSS':>10} {'WER':>7}")
+    # Spawn gives every backend a clean process, so peak RSS is its own
+    context = multiprocessing.get_context('spawn')
+    for backend in backends:
+        with context.Pool(1) as pool:
+            result = pool.apply(run_backend, (backend, model_name, corpus))
+        if "error" in result:
+            print(f"{backend:>15} skipped: {result['error']}")
+            continue
+        rss = f"{result['peak_rss_mb']:.0f} MB" if result['peak_rss_mb'] is not None else "n/a"
+        print(f"{backend:>15} {result['load_seconds']:6.1f}s {result['rtf']:7.3f} {rss:>10} {result['wer']:7.1%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Time LocalMeetingSummarizer against the extraction it replaced
+
+Builds synthetic transcripts from indicator phrases and filler words at
+several sizes. For each size it times, best of 3:
+
+- old: the previous extraction, one pass over the sentences per section
+  with a substring check for every indicator, keeping the first matches
+- new: the current pipeline (split, one-pass tagging, TF-IDF ranking and
+  section extraction), with the split, tag and rank steps timed
+  separately
+
+Nothing is cached or saved, so repeated runs measure the same work.
+
+Usage: python scripts/bench_local_summarizer.py [sentences ...]   (default: 1000 10000 50000)
+"""
+
+import os
+import random
+import re
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from summarization.local_summarizer import CATEGORY_BITS, INDICATORS, LocalMeetingSummarizer
+
+FILLER = ['the', 'team', 'budget', 'release', 'customer', 'roadmap', 'numbers', 'we', 'it', 'next',
+          'quarter', 'design', 'review', 'okay', 'so', 'data', 'launch', 'plan', 'hiring', 'sales']
+# Same minimum lengths and section sizes as LocalMeetingSummarizer
+SECTIONS = (('key_points', 20, 5), ('decisions', 15, 3), ('action_items', 15, 5), ('questions', 15, 3))
+
+def make_transcript(count, rng):
+    phrases = [indicator for indicators in INDICATORS.values() for indicator in indicators]
+    sentences = []
+    for _ in range(count):
+        words = [rng.choice(FILLER) for _ in range(rng.randint(6, 16))]
+        if rng.random() < 0.4:
+            words.insert(rng.randint(0, len(words)), rng.choice(phrases))
+        words[0] = words[0].capitalize()
+        sentences.append(" ".join(words) + rng.choice(['.', '.', '.', '?', '!']))
+    return " ".join(sentences)
+
+def old_extract(transcript):
+    """The extraction before one-pass tagging and ranking"""
+    sentences = [s.strip() for s in re.split(r'[.!?]+', re.sub(r'\s+', ' ', transcript)) if s.strip()]
+    sections = {}
+    for category, min_length, limit in SECTIONS:
+        found = []
+        if category == 'questions':
+            found = [s for s in sentences if '?' in s and len(s) > 10]
+        for sentence in sentences:
+            lowered = sentence.lower()
+            if any(indicator in lowered for indicator in INDICATORS[category]) and len(sentence) > min_length:
+                found.append(sentence)
+        sections[category] = found[:limit]
+    return sections
+
+def new_extract(summarizer, transcript, timings):
+    """The current pipeline without the cache, keeping each step's fastest time in timings"""
+    start_time = time.perf_counter()
+    sentences, asked = summarizer._clean_text(transcript)
+    split_at = time.perf_counter()
+    tags = summarizer._tag_sentences(sentences)
+    tagged_at = time.perf_counter()
+    scores = summarizer._rank_sentences(sentences)
+    ranked_at = time.perf_counter()
+
+    lengths = np.array([len(sentence) for sentence in sentences], dtype=np.int64)
+    sections = {}
+    for category, min_length, limit in SECTIONS:
+        candidates = ((tags & CATEGORY_BITS[category]) != 0) & (lengths > min_length)
+        if category == 'questions':
+            candidates |= asked & (lengths > 10)
+        sections[category] = summarizer._extract(sentences, candidates, scores, limit, "")
+    summarizer._format_summary(*sections.values())
+
+    for step, seconds in (("split", split_at - start_time), ("tag", tagged_at - split_at),
+                          ("rank", ranked_at - tagged_at)):
+        timings[step] = min(timings.get(step, seconds), seconds)
+    return sections
+
+def best_of(runs, function):
+    best = None
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start_time
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 50000]
+    summarizer = LocalMeetingSummarizer()
+    rng = random.Random(0)
+    print("Old vs new (new includes ranking), best of 3:")
+    for count in counts:
+        transcript = make_transcript(count, rng)
+        old_seconds = best_of(3, lambda: old_extract(transcript))
+        timings = {}
+        new_seconds = best_of(3, lambda: new_extract(summarizer, transcript, timings))
+        print(f"  {count // 1000:>3}k sentences ({len(transcript.encode('utf-8')) / 1e6:.2f} MB): "
+              f"{old_seconds:.3f}s vs {new_seconds:.3f}s "
+              f"(split {timings['split']:.3f}s, tag {timings['tag']:.3f}s, rank {timings['rank']:.3f}s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Per-call cost of MeetingDatabase operations, meetings.json vs SQLite
+
+For each size n, writes a meetings.json holding n meetings in the format
+of the JSON store that MeetingDatabase replaced (kept below as
+JsonMeetingDatabase). It then times the one-time import into SQLite, and
+the same calls against both stores with n meetings already in them:
+open, add_meeting, update_meeting_title, get_meeting and
+get_all_meetings. Times are averaged per call.
+
+Usage: python scripts/bench_meeting_db.py [n ...]   (default: 10000 100000)
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage.db import MeetingDatabase
+
+class JsonMeetingDatabase:
+    """The meetings.json store before the move to SQLite, reduced to the calls timed here"""
+
+    def __init__(self, db_file):
+        self.db_file = db_file
+        with open(self.db_file, 'r', encoding='utf-8') as f:
+            self.meetings = json.load(f)
+
+    def _save_database(self):
+        with open(self.db_file, 'w', encoding='utf-8') as f:
+            json.dump(self.meetings, f, indent=2, ensure_ascii=False)
+
+    def add_meeting(self, audio_file, transcript_file, summary_file, duration=None):
+        meeting_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.meetings["meetings"].append({
+            "id": meeting_id,
+            "timestamp": datetime.now().isoformat(),
+            "audio_file": audio_file,
+            "transcript_file": transcript_file,
+            "summary_file": summary_file,
+            "duration": duration,
+            "title": f"Meeting {meeting_id}"
+        })
+        self._save_database()
+        return meeting_id
+
+    def get_meeting(self, meeting_id):
+        for meeting in self.meetings["meetings"]:
+            if meeting["id"] == meeting_id:
+                return meeting
+        return None
+
+    def get_all_meetings(self):
+        return sorted(self.meetings["meetings"], key=lambda x: x["timestamp"], reverse=True)
+
+    def update_meeting_title(self, meeting_id, title):
+        for meeting in self.meetings["meetings"]:
+            if meeting["id"] == meeting_id:
+                meeting["title"] = title
+                self._save_database()
+                return True
+        return False
+
+def write_json(path, n):
+    """meetings.json with n meetings a minute apart; returns their ids"""
+    start = datetime(2020, 1, 1)
+    meetings = []
+    for i in range(n):
+        when = start + timedelta(minutes=i)
+        meeting_id = f"{when:%Y%m%d_%H%M%S}"
+        meetings.append({
+            "id": meeting_id,
+            "timestamp": when.isoformat(),
+            "audio_file": f"outputs/audio/recording_{meeting_id}.wav",
+            "transcript_file": f"outputs/transcripts/transcript_{meeting_id}.txt",
+            "summary_file": f"outputs/summaries/summary_{meeting_id}.md",
+            "duration": 1800.0,
+            "title": f"Meeting {meeting_id}",
+        })
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"meetings": meetings}, f, indent=2, ensure_ascii=False)
+    return [meeting["id"] for meeting in meetings]
+
+def per_call(calls, function):
+    """Mean seconds per call over calls calls of function(i)"""
+    start_time = time.perf_counter()
+    for i in range(calls):
+        function(i)
+    return (time.perf_counter() - start_time) / calls
+
+def measure(store, ids, slow):
+    """Per-call seconds of each operation; slow stores get fewer repetitions"""
+    rng = random.Random(0)
+    few, many = (3, 20) if slow else (200, 2000)
+    return {
+        "add_meeting": per_call(few, lambda i: store.add_meeting("a.wav", "t.txt", None, 60.0)),
+        "update_meeting_title": per_call(few, lambda i: store.update_meeting_title(rng.choice(ids), f"Title {i}")),
+        "get_meeting": per_call(many, lambda i: store.get_meeting(rng.choice(ids))),
+        "get_all_meetings": per_call(3, lambda i: store.get_all_meetings()),
+    }
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+    results = {}
+    migrations = {}
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            json_file = os.path.join(directory, 'meetings.json')
+            ids = write_json(json_file, n)
+
+            json_open = per_call(3, lambda i: JsonMeetingDatabase(json_file))
+            json_times = measure(JsonMeetingDatabase(json_file), ids, slow=True)
+            # The JSON store above kept writing; start the import from the original n meetings
+            ids = write_json(json_file, n)
+
+            db_file = os.path.join(directory, 'meetings.db')
+            start_time = time.perf_counter()
+            MeetingDatabase(db_file).close()
+            migrations[n] = time.perf_counter() - start_time
+
+            sqlite_open = per_call(3, lambda i: MeetingDatabase(db_file).close())
+            db = MeetingDatabase(db_file)
+            sqlite_times = measure(db, ids, slow=False)
+            db.close()
+
+            results[n] = {"open": (json_open, sqlite_open)}
+            for operation in json_times:
+                results[n][operation] = (json_times[operation], sqlite_times[operation])
+
+    print("Per call, with n meetings already stored (json / sqlite):")
+    print(f"{'':>22}" + "".join(f"{f'n={n}':>26}" for n in sizes))
+    for operation in results[sizes[0]]:
+        cells = "".join(f"{results[n][operation][0] * 1000:>11.3f} / {results[n][operation][1] * 1000:8.3f} ms"
+                        for n in sizes)
+        print(f"{operation:>22}{cells}")
+    print(f"{'one-time migration':>22}" + "".join(f"{migrations[n]:>23.2f} s" for n in sizes))
+
+if __name__ == "__main__":
+    main()
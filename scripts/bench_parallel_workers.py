@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Wall time of chunked pool transcription at different worker counts
+
+Plans chunks for one recording with plan_chunks (cut at the pauses found
+by VAD) and transcribes them with ParallelTranscriber at each worker
+count. Each run reports its wall time, including pool start-up and one
+model load per worker. It also reports the speedup over the first run,
+the real-time factor and the word similarity of the stitched transcript
+to the first run's, which shows words lost or doubled at chunk joins.
+
+Usage: python scripts/bench_parallel_workers.py audio_file [workers ...]   (default: 1 2 4 8)
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import Config
+from audio.resampler import WHISPER_SAMPLE_RATE
+from audio.utils import load_analysis_audio
+from transcription.parallel import ParallelTranscriber, find_cut_points, plan_chunks, stitch_segments
+from transcription.two_pass import transcript_similarity
+
+def load_audio(audio_filepath):
+    """16 kHz float32 audio, from the app's analysis stream when the recording has one"""
+    audio = load_analysis_audio(audio_filepath)
+    if audio is None:
+        import whisper
+        audio = whisper.load_audio(audio_filepath)
+    return audio
+
+def run(audio, chunks, workers):
+    """Transcribe the planned chunks with a pool of workers; returns (seconds, transcript)"""
+    transcriber = ParallelTranscriber(workers=workers)
+    start_time = time.perf_counter()
+    chunk_segments = [None] * len(chunks)
+    for index, segments, _ in transcriber.map_chunks(audio, chunks, **Config.WHISPER_DECODE_OPTIONS):
+        chunk_segments[index] = segments
+    elapsed = time.perf_counter() - start_time
+    segments = stitch_segments(chunks, chunk_segments)
+    return elapsed, "".join(seg["text"] for seg in segments).strip()
+
+def main():
+    if len(sys.argv) < 2:
+        raise SystemExit(__doc__.strip().splitlines()[-1])
+    worker_counts = [int(arg) for arg in sys.argv[2:]] or [1, 2, 4, 8]
+
+    audio = load_audio(sys.argv[1])
+    duration = len(audio) / WHISPER_SAMPLE_RATE
+
+    start_time = time.perf_counter()
+    chunks = plan_chunks(len(audio), find_cut_points(audio))
+    plan_seconds = time.perf_counter() - start_time
+    mid_speech = sum(1 for (start, _, _), (_, previous_end, _) in zip(chunks[1:], chunks) if start < previous_end)
+    print(f"{duration / 60:.1f} min of audio, Whisper-{Config.WHISPER_MODEL} ({Config.TRANSCRIPTION_BACKEND}), "
+          f"{os.cpu_count()} CPUs")
+    print(f"Planned {len(chunks)} chunks of ~{Config.PARALLEL_CHUNK_SECONDS}s in {plan_seconds:.2f}s "
+          f"({mid_speech} cut mid-speech with overlap)")
+
+    baseline = None
+    for workers in worker_counts:
+        elapsed, transcript = run(audio, chunks, workers)
+        if baseline is None:
+            baseline = (elapsed, transcript)
+        print(f"{workers:2d} workers: {elapsed:7.1f}s wall, {baseline[0] / elapsed:4.2f}x, "
+              f"RTF {elapsed / duration:.3f}, transcript similarity {transcript_similarity(baseline[1], transcript):.3f}")
+
+if __name__ == "__main__":
+    main()
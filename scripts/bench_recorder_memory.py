@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Peak memory of AudioRecorder over long recordings
+
+The microphone stream is replaced by a synthetic one that returns chunks
+as fast as they are read, so an hour of audio takes seconds. Peak Python
+memory (tracemalloc) should stay flat however long the recording runs.
+
+Usage: python scripts/bench_recorder_memory.py [hours ...]   (default: 1 3)
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import Config
+from audio.recorder import AudioRecorder
+
+class SyntheticStream:
+    """Stands in for a PyAudio input stream, delivering a fixed number of chunks"""
+
+    def __init__(self, recorder, chunks):
+        self.recorder = recorder
+        self.remaining = chunks
+        self.done = threading.Event()
+        self.chunk = os.urandom(Config.CHUNK_SIZE * Config.CHANNELS * 2)
+
+    def read(self, frames, exception_on_overflow=True):
+        self.remaining -= 1
+        if self.remaining < 0:
+            # Hold the recording thread until stop_recording() ends the loop
+            self.done.set()
+            while self.recorder.is_recording:
+                time.sleep(0.001)
+        return self.chunk
+
+    def stop_stream(self):
+        pass
+
+    def close(self):
+        pass
+
+def measure(hours, directory):
+    """Record hours of synthetic audio; returns (peak MB, seconds taken)"""
+    recorder = AudioRecorder()
+    chunks = int(hours * 3600 * Config.SAMPLE_RATE / Config.CHUNK_SIZE)
+    stream = SyntheticStream(recorder, chunks)
+    recorder.audio.open = lambda **kwargs: stream
+
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    recorder.start_recording()
+    stream.done.wait()
+    filepath = recorder.stop_recording()
+    elapsed = time.perf_counter() - start_time
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    recorder.cleanup()
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+    print(f"{hours:g}h recording: peak {peak / 2 ** 20:.3f} MB in {elapsed:.1f}s ({os.path.basename(filepath)})")
+    return peak, elapsed
+
+def main():
+    hours = [float(arg) for arg in sys.argv[1:]] or [1, 3]
+    with tempfile.TemporaryDirectory() as directory:
+        # WAV keeps FFmpeg out of the measurement; the analysis stream stays on
+        Config.AUDIO_FORMAT = 'wav'
+        Config.AUDIO_DIR = directory
+        for duration in hours:
+            measure(duration, directory)
+
+if __name__ == "__main__":
+    main()
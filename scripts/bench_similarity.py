@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Query, add and open times of SimilarityIndex as the number of meetings grows
+
+For each size, fills a fresh index with synthetic meeting transcripts,
+each drawn from a few topic vocabularies so related meetings exist. It
+then times:
+
+- related(meeting_id, k=10), averaged over 50 random meetings
+- adding a 3000-word transcript, averaged over 20
+- opening the index, which maps the matrix and recounts document frequencies
+
+It also reports the size of the matrix file on disk.
+
+Usage: python scripts/bench_similarity.py [meetings ...]   (default: 1000 10000 100000)
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import Config
+from storage.similarity import SimilarityIndex
+
+TOPICS = [[f"topic{topic}word{i}" for i in range(300)] for topic in range(50)]
+COMMON = [f"common{i}" for i in range(2000)]
+
+def transcript(rng, words):
+    vocabulary = rng.choice(TOPICS) + COMMON
+    return " ".join(rng.choice(vocabulary) for _ in range(words))
+
+def matrix_bytes(directory):
+    return sum(os.path.getsize(os.path.join(directory, name))
+               for name in os.listdir(directory) if name.endswith('.f32'))
+
+def measure(count, directory, rng):
+    index = SimilarityIndex(directory)
+    start_time = time.perf_counter()
+    for i in range(count):
+        # Short transcripts keep filling quick; a row costs the same whatever the length
+        index.add(f"meeting_{i}", transcript(rng, 60))
+    fill_seconds = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    for _ in range(50):
+        index.related(f"meeting_{rng.randrange(count)}", k=10)
+    related_ms = (time.perf_counter() - start_time) / 50 * 1000
+
+    long_transcripts = [transcript(rng, 3000) for _ in range(20)]
+    start_time = time.perf_counter()
+    for i, text in enumerate(long_transcripts):
+        index.add(f"long_{i}", text)
+    add_ms = (time.perf_counter() - start_time) / 20 * 1000
+    index.close()
+
+    start_time = time.perf_counter()
+    SimilarityIndex(directory).close()
+    open_ms = (time.perf_counter() - start_time) * 1000
+
+    print(f"{count:>7} meetings ({matrix_bytes(directory) / 2 ** 20:4.0f} MB): related {related_ms:6.2f} ms, "
+          f"add 3000 words {add_ms:5.1f} ms, open {open_ms:6.1f} ms (filled in {fill_seconds:.0f}s)")
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]
+    rng = random.Random(0)
+    print(f"dim {Config.SIMILARITY_DIMENSIONS}, top-10 related() averaged over 50 queries:")
+    for count in counts:
+        with tempfile.TemporaryDirectory() as directory:
+            measure(count, directory, rng)
+
+if __name__ == "__main__":
+    main()
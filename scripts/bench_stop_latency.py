@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Stop-to-transcript latency of a recording, with and without the analysis stream
+
+Plays a speech WAV file (16-bit PCM) through AudioRecorder as fast as it
+is read, then times stop_recording() plus WhisperTranscriber.transcribe_audio,
+which is what the user waits for after pressing Stop. Each recording is
+made twice: once with the 16 kHz analysis stream Whisper reads directly,
+and once without it, so the recording is decoded by FFmpeg. The model is
+loaded before timing starts, and the transcription cache starts empty for
+every run. The script also checks that no analysis file is left behind.
+
+Usage: python scripts/bench_stop_latency.py speech.wav [model]   (default model: Config.WHISPER_MODEL)
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import Config
+
+class WavStream:
+    """Stands in for a PyAudio input stream, delivering the frames of a WAV file"""
+
+    def __init__(self, recorder, wav_path):
+        self.recorder = recorder
+        self.wav = wave.open(wav_path, 'rb')
+        self.done = threading.Event()
+
+    def read(self, frames, exception_on_overflow=True):
+        data = self.wav.readframes(frames)
+        if not data:
+            # Hold the recording thread until stop_recording() ends the loop
+            self.done.set()
+            while self.recorder.is_recording:
+                time.sleep(0.001)
+        return data.ljust(frames * self.wav.getnchannels() * 2, b'\0')
+
+    def stop_stream(self):
+        pass
+
+    def close(self):
+        self.wav.close()
+
+def measure(wav_path, model_name, analysis_stream):
+    """Record wav_path and transcribe it; returns (stop seconds, transcription seconds, analysis file left)"""
+    from audio.recorder import AudioRecorder
+    from audio.utils import get_analysis_path
+    from transcription.cache import transcription_cache
+    from transcription.whisper_client import WhisperTranscriber
+
+    Config.ANALYSIS_STREAM = analysis_stream
+    shutil.rmtree(transcription_cache.directory, ignore_errors=True)
+    transcriber = WhisperTranscriber(model_name)
+
+    recorder = AudioRecorder()
+    stream = WavStream(recorder, wav_path)
+    recorder.audio.open = lambda **kwargs: stream
+    recorder.start_recording()
+    stream.done.wait()
+
+    start_time = time.perf_counter()
+    filepath = recorder.stop_recording()
+    stopped_at = time.perf_counter()
+    transcript, _ = transcriber.transcribe_audio(filepath)
+    finished_at = time.perf_counter()
+    recorder.cleanup()
+
+    if not transcript:
+        raise SystemExit("Transcription failed")
+    return stopped_at - start_time, finished_at - stopped_at, os.path.exists(get_analysis_path(filepath))
+
+def main():
+    if len(sys.argv) < 2:
+        raise SystemExit(__doc__.strip().splitlines()[-1])
+    wav_path = sys.argv[1]
+    model_name = sys.argv[2] if len(sys.argv) > 2 else Config.WHISPER_MODEL
+
+    with wave.open(wav_path, 'rb') as wf:
+        if wf.getsampwidth() != 2:
+            raise SystemExit("The WAV file must be 16-bit PCM")
+        Config.SAMPLE_RATE = wf.getframerate()
+        Config.CHANNELS = wf.getnchannels()
+        duration = wf.getnframes() / wf.getframerate()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Set before the transcription modules are imported, so the cache lives here too
+        Config.OUTPUT_DIR = directory
+        Config.AUDIO_DIR = os.path.join(directory, 'audio')
+        Config.TRANSCRIPT_DIR = os.path.join(directory, 'transcripts')
+        Config.SUMMARY_DIR = os.path.join(directory, 'summaries')
+        Config.CACHE_DIR = os.path.join(directory, 'cache')
+        Config.JOBS_DIR = os.path.join(directory, 'jobs')
+        Config.create_directories()
+        # WAV keeps the MP3 encoder out of the measurement
+        Config.AUDIO_FORMAT = 'wav'
+
+        from transcription.model_cache import model_cache
+        start_time = time.perf_counter()
+        model_cache.get(model_name)
+        print(f"Loaded Whisper-{model_name} in {time.perf_counter() - start_time:.1f}s (not counted below)")
+
+        print(f"{duration:.0f}s recording, Stop-to-transcript:")
+        for analysis_stream, label in ((True, "analysis stream"), (False, "FFmpeg decode")):
+            stop_seconds, transcribe_seconds, left = measure(wav_path, model_name, analysis_stream)
+            print(f"  {label:>15}: {stop_seconds + transcribe_seconds:6.2f}s "
+                  f"(stop {stop_seconds:.2f}s, transcription {transcribe_seconds:.2f}s)"
+                  f"{', analysis file LEFT BEHIND' if left else ''}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Throughput of TranscriptCleaner on a large synthetic transcript
+
+Builds a Whisper-like transcript of short segments with fillers in mixed
+case, "you know" split across lines and runs of punctuation. It then
+times, best of 3:
+
+- the previous implementation (one re.sub per filler word plus five more
+  passes, kept below for comparison)
+- clean_transcript on the whole text
+- clean_segments on the segments, consumed as they are yielded
+
+The outputs of all three must be identical.
+
+Usage: python scripts/bench_transcript_cleaner.py [segments]   (default: 120000)
+"""
+
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transcription.cleaner import TranscriptCleaner
+
+WORDS = ['we', 'should', 'ship', 'the', 'release', 'budget', 'review', 'team', 'next', 'week',
+         'customer', 'feedback', 'roadmap', 'numbers', 'okay', 'so', 'I', 'think', 'you', 'it']
+FILLERS = ['um', 'Uh', 'er', 'AH', 'like', 'you know', 'you\n know']
+
+def previous_clean_transcript(text):
+    """TranscriptCleaner.clean_transcript before the single-pass rewrite"""
+    if not text:
+        return ""
+    text = re.sub(r'\s+', ' ', text)
+    for filler in ['um', 'uh', 'er', 'ah', 'like', 'you know']:
+        text = re.sub(rf'\b{filler}\b', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'\s+([,.!?])', r'\1', text)
+    text = re.sub(r'([,.!?])\s*', r'\1 ', text)
+    text = re.sub(r'(^|[.!?]\s+)([a-z])', lambda m: m.group(1) + m.group(2).upper(), text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+def make_segments(count, rng):
+    segments = []
+    for _ in range(count):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(6, 14))]
+        for _ in range(rng.randint(0, 2)):
+            words.insert(rng.randint(0, len(words)), rng.choice(FILLERS))
+        if rng.random() < 0.3:
+            words.insert(rng.randint(1, len(words)), rng.choice([',', ' ,', '...', '?!']))
+        segments.append(" " + " ".join(words) + rng.choice(['.', '?', '!', ',', '']))
+    return segments
+
+def best_of(runs, function):
+    """(best seconds, result) over runs calls"""
+    best = None
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start_time
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 120000
+    segments = make_segments(count, random.Random(0))
+    text = "".join(segments)
+    megabytes = len(text.encode('utf-8')) / 1e6
+    print(f"{megabytes:.1f} MB synthetic transcript, {count} segments, best of 3:")
+
+    outputs = []
+    for label, function in (
+        ("previous implementation", lambda: previous_clean_transcript(text)),
+        ("clean_transcript", lambda: TranscriptCleaner.clean_transcript(text)),
+        ("clean_segments", lambda: "".join(TranscriptCleaner.clean_segments(segments))),
+    ):
+        seconds, output = best_of(3, function)
+        outputs.append(output)
+        print(f"  {label:>24}: {megabytes / seconds:5.1f} MB/s ({seconds:.2f}s)")
+
+    identical = all(output == outputs[0] for output in outputs)
+    print("Outputs identical" if identical else "OUTPUTS DIFFER")
+    sys.exit(0 if identical else 1)
+
+if __name__ == "__main__":
+    main()
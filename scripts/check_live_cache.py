@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Check that reopening a live-transcribed recording reuses its transcript
+
+Feeds a synthetic recording through LiveTranscriber as the recorder
+would and records the meeting the way the main window does. It then
+opens the saved recording again with CheckpointedTranscriber, which is
+what "Open audio file" uses. The second transcription must come from the
+cache without running the model. It must return the same transcript file
+and find the existing meeting rather than add a second one. The analysis
+stream must be gone once the transcript is stored.
+
+A stand-in model replaces Whisper: only the bookkeeping around the model
+is checked, so no weights are needed.
+
+Usage: python scripts/check_live_cache.py
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import Config
+from audio.resampler import WHISPER_SAMPLE_RATE
+
+SECONDS = 75
+
+class StandInModel:
+    """Answers like model.transcribe, one segment per call, and counts the calls"""
+
+    calls = 0
+
+    def transcribe(self, audio, **options):
+        StandInModel.calls += 1
+        duration = len(audio) / WHISPER_SAMPLE_RATE
+        text = f" Window {StandInModel.calls} was transcribed."
+        return {"text": text, "language": "en",
+                "segments": [{"id": 0, "start": 0.0, "end": duration, "text": text}]}
+
+def make_recording(directory):
+    """Write a WAV recording with its analysis stream; returns (path, 16 kHz samples)"""
+    rng = np.random.default_rng(0)
+    samples = np.zeros(SECONDS * WHISPER_SAMPLE_RATE, dtype=np.float32)
+    # Bursts of noise for speech, with pauses between them
+    for start in range(0, SECONDS - 4, 5):
+        samples[start * WHISPER_SAMPLE_RATE:(start + 3) * WHISPER_SAMPLE_RATE] = \
+            rng.standard_normal(3 * WHISPER_SAMPLE_RATE).astype(np.float32) * 0.1
+
+    from audio.utils import get_analysis_path
+    path = os.path.join(Config.AUDIO_DIR, 'recording_live.wav')
+    with wave.open(path, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(WHISPER_SAMPLE_RATE)
+        wf.writeframes((samples * 32767).astype(np.int16).tobytes())
+    samples.tofile(get_analysis_path(path))
+    return path, samples
+
+def save_meeting(db, audio_file, transcript_file, segments):
+    """What MainWindow.on_transcript_saved does with a transcript; returns the meeting id"""
+    meeting = db.get_meeting_by_transcript(transcript_file) if transcript_file else None
+    if meeting:
+        if segments:
+            db.index_transcript(meeting["id"], segments)
+        return meeting["id"]
+    duration = segments[-1]["end"] if segments else None
+    return db.add_meeting(audio_file, transcript_file or None, None, duration, segments=segments)
+
+def check(name, ok, detail):
+    print(f"{'ok  ' if ok else 'FAIL'} {name}: {detail}")
+    return ok
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        # Set before the transcription modules are imported, so the cache lives here too
+        Config.OUTPUT_DIR = directory
+        Config.AUDIO_DIR = os.path.join(directory, 'audio')
+        Config.TRANSCRIPT_DIR = os.path.join(directory, 'transcripts')
+        Config.SUMMARY_DIR = os.path.join(directory, 'summaries')
+        Config.CACHE_DIR = os.path.join(directory, 'cache')
+        Config.JOBS_DIR = os.path.join(directory, 'jobs')
+        Config.create_directories()
+
+        from audio.utils import get_analysis_path
+        from storage.db import MeetingDatabase
+        from transcription.cache import transcription_cache
+        from transcription.checkpoint import CheckpointedTranscriber
+        from transcription.live import LiveTranscriber
+        from transcription.model_cache import model_cache
+        model_cache.get = lambda *args, **kwargs: StandInModel()
+
+        audio_file, samples = make_recording(directory)
+        db = MeetingDatabase(os.path.join(directory, 'meetings.db'))
+
+        live = LiveTranscriber()
+        results = []
+        runner = threading.Thread(target=lambda: results.append(live.run()))
+        runner.start()
+        for start in range(0, len(samples), Config.CHUNK_SIZE):
+            live.feed(samples[start:start + Config.CHUNK_SIZE])
+        live.finish(audio_file)
+        runner.join()
+        transcript, transcript_file = results[0]
+        first_meeting = save_meeting(db, audio_file, transcript_file, live.segments)
+        live_calls = StandInModel.calls
+
+        hits = transcription_cache.hits
+        reopened = CheckpointedTranscriber()
+        reopened_transcript, reopened_file = reopened.transcribe_audio(audio_file)
+        second_meeting = save_meeting(db, audio_file, reopened_file, reopened.segments)
+        meetings = len(db.get_all_meetings())
+        db.close()
+
+        results = [
+            check("live transcript", bool(transcript) and transcript_file is not None,
+                  f"{live_calls} windows, saved as {os.path.basename(transcript_file or '')}"),
+            check("reopen hits the cache",
+                  transcription_cache.hits == hits + 1 and StandInModel.calls == live_calls,
+                  f"{transcription_cache.hits - hits} cache hits, {StandInModel.calls - live_calls} model calls"),
+            check("same transcript", reopened_transcript == transcript and reopened_file == transcript_file,
+                  f"{os.path.basename(reopened_file or '')}"),
+            check("one meeting", meetings == 1 and first_meeting == second_meeting,
+                  f"{meetings} meetings (ids {first_meeting}, {second_meeting})"),
+            check("analysis stream removed", not os.path.exists(get_analysis_path(audio_file)),
+                  os.path.basename(get_analysis_path(audio_file))),
+        ]
+
+    sys.exit(0 if all(results) else 1)
+
+if __name__ == "__main__":
+    main()
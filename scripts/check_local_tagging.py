@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Differential check of LocalMeetingSummarizer's one-pass sentence tagging
+
+Compares _tag_sentences against checking every indicator in every
+lowercased sentence separately, on fixed edge cases and random texts
+built from indicator phrases, filler words and case-changing characters.
+
+Usage: python scripts/check_local_tagging.py [random texts]   (default: 300)
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from summarization.local_summarizer import CATEGORY_BITS, INDICATORS, LocalMeetingSummarizer
+
+# Sentences that have tripped up offset bookkeeping before
+EDGE_CASES = [
+    ['İİİİİİİİİİ hello', 'we decided x', 'nothing'],  # 'İ'.lower() is two code points
+    ['ẞ STRASSE We Will', 'ǅ key'],
+    ['', 'decided', ''],
+    ['need to find out', 'NEED TO'],
+]
+FILLER = ['the', 'team', 'budget', 'release', 'İstanbul', 'ǅemal', 'STRASSE', 'x', 'meeting', 'okay']
+
+def expected_tags(sentences):
+    """Bitmask per sentence from checking each indicator on its own"""
+    tags = []
+    for sentence in sentences:
+        lowered = sentence.lower()
+        mask = 0
+        for category, indicators in INDICATORS.items():
+            if any(indicator in lowered for indicator in indicators):
+                mask |= CATEGORY_BITS[category]
+        tags.append(mask)
+    return tags
+
+def random_sentences(rng):
+    phrases = [indicator for indicators in INDICATORS.values() for indicator in indicators]
+    sentences = []
+    for _ in range(rng.randint(1, 30)):
+        words = [rng.choice(FILLER) for _ in range(rng.randint(0, 8))]
+        for _ in range(rng.randint(0, 2)):
+            phrase = rng.choice(phrases)
+            words.insert(rng.randint(0, len(words)), phrase.upper() if rng.random() < 0.2 else phrase)
+        sentences.append(" ".join(words))
+    return sentences
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    rng = random.Random(0)
+    summarizer = LocalMeetingSummarizer()
+    cases = EDGE_CASES + [random_sentences(rng) for _ in range(count)]
+
+    failures = 0
+    for sentences in cases:
+        got = summarizer._tag_sentences(sentences).tolist()
+        want = expected_tags(sentences)
+        if got != want:
+            failures += 1
+            if failures <= 5:
+                print(f"Mismatch for {sentences!r}: got {got}, expected {want}")
+
+    print(f"{len(cases) - failures} of {len(cases)} cases match")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
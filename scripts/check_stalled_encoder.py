@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Check that a slow or stalled MP3 encoder never blocks audio capture
+
+Puts fake `ffmpeg` executables first on PATH (POSIX shell scripts): one
+that never reads its input, one that exits straight away and one that
+copies its input. For each it checks that StreamingEncoder.write()
+returns immediately, that the encoder gives up once its queue is full
+and that finish() returns promptly. With PyAudio installed it also
+records through AudioRecorder and checks that the stalled encoder leaves
+a complete WAV recording behind.
+
+Usage: python scripts/check_stalled_encoder.py
+"""
+
+import os
+import stat
+import sys
+import tempfile
+import threading
+import time
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import Config
+from audio.encoder import StreamingEncoder
+
+FAKE_FFMPEG = {
+    # Never reads stdin, so the pipe fills and every further write would block
+    'stalled': 'sleep 600\n',
+    'crashing': 'exit 1\n',
+    'working': 'for arg; do out="$arg"; done\ncat > "$out"\n',
+}
+CHUNK = b'\0' * (Config.CHUNK_SIZE * 2)
+CHUNKS = 2000  # ~46 s of 44.1 kHz mono audio
+
+def install_fake_ffmpeg(directory, behaviour):
+    path = os.path.join(directory, 'ffmpeg')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('#!/bin/sh\n' + FAKE_FFMPEG[behaviour])
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+
+def check_encoder(directory, behaviour):
+    """(ok, detail) for feeding CHUNKS chunks to an encoder backed by a fake FFmpeg"""
+    install_fake_ffmpeg(directory, behaviour)
+    output = os.path.join(directory, f'{behaviour}.mp3')
+    encoder = StreamingEncoder(output, Config.SAMPLE_RATE, Config.CHANNELS, max_pending=64)
+    if not encoder.start():
+        return False, f"did not start: {encoder.error}"
+
+    slowest = 0.0
+    accepted = 0
+    for _ in range(CHUNKS):
+        start_time = time.perf_counter()
+        accepted += encoder.write(CHUNK)
+        slowest = max(slowest, time.perf_counter() - start_time)
+        if behaviour != 'stalled':
+            # Still ~20x faster than a microphone delivers chunks
+            time.sleep(0.001)
+
+    start_time = time.perf_counter()
+    finished = encoder.finish(timeout=5)
+    finish_seconds = time.perf_counter() - start_time
+
+    detail = (f"slowest write {slowest * 1000:.2f} ms, {accepted} of {CHUNKS} chunks accepted, "
+              f"finish() -> {finished} in {finish_seconds:.2f}s")
+    if behaviour == 'working':
+        ok = finished and accepted == CHUNKS and os.path.getsize(output) == CHUNKS * len(CHUNK)
+    else:
+        ok = not finished and encoder.failed and finish_seconds < 2
+    return ok and slowest < 0.05, detail
+
+def check_recorder(directory):
+    """(ok, detail) for a whole MP3 recording made while the encoder is stalled"""
+    try:
+        from audio.recorder import AudioRecorder
+    except ImportError as e:
+        return None, f"skipped ({e})"
+
+    install_fake_ffmpeg(directory, 'stalled')
+    Config.AUDIO_FORMAT = 'mp3'
+    Config.AUDIO_DIR = directory
+    Config.MP3_ENCODER_BUFFER_SECONDS = 1
+
+    recorder = AudioRecorder()
+    done = threading.Event()
+    reads = []
+
+    class Stream:
+        def read(self, frames, exception_on_overflow=True):
+            reads.append(time.perf_counter())
+            if len(reads) > CHUNKS:
+                done.set()
+                while recorder.is_recording:
+                    time.sleep(0.001)
+            return CHUNK
+
+        def stop_stream(self):
+            pass
+
+        def close(self):
+            pass
+
+    recorder.audio.open = lambda **kwargs: Stream()
+    recorder.start_recording()
+    if not done.wait(30):
+        return False, "capture stalled"
+    start_time = time.perf_counter()
+    filepath = recorder.stop_recording()
+    stop_seconds = time.perf_counter() - start_time
+    recorder.cleanup()
+
+    gaps = [b - a for a, b in zip(reads, reads[1:CHUNKS + 1])]
+    with wave.open(filepath, 'rb') as wf:
+        frames = wf.getnframes()
+    ok = filepath.endswith('.wav') and frames >= CHUNKS * Config.CHUNK_SIZE and max(gaps) < 0.05 and stop_seconds < 5
+    return ok, (f"saved {os.path.basename(filepath)} with {frames} frames, longest capture gap "
+                f"{max(gaps) * 1000:.1f} ms, stop took {stop_seconds:.2f}s")
+
+def main():
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ['PATH'] = directory + os.pathsep + os.environ.get('PATH', '')
+        for behaviour in FAKE_FFMPEG:
+            ok, detail = check_encoder(directory, behaviour)
+            print(f"{'ok  ' if ok else 'FAIL'} {behaviour} encoder: {detail}")
+            results.append(ok)
+
+        ok, detail = check_recorder(directory)
+        print(f"{'ok  ' if ok else 'FAIL' if ok is False else 'skip'} recorder with stalled encoder: {detail}")
+        if ok is not None:
+            results.append(ok)
+
+    sys.exit(0 if all(results) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Stress test for several worker processes sharing one outputs tree
+
+Starts N writer processes against a temporary outputs directory and
+checks that nothing is lost or torn:
+
+- summaries: every process saves M summaries through write_new_file; all
+  N*M files must exist and be complete, even when many land in the same
+  second
+- shared file: processes keep replacing one file with atomic_write while
+  another process reads it; no read may see a partial file
+- counter: read-modify-write of one file under FileLock must count every
+  increment (run without the lock as well, for comparison)
+- database: every process adds M meetings with segments and a summary to
+  one MeetingDatabase; every meeting must get a distinct id, its search
+  rows and its similarity row
+
+Usage: python scripts/stress_outputs.py [processes] [operations per process]   (default: 8 200)
+"""
+
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage.atomic import FileLock, atomic_write, write_new_file
+
+SHARED_LINES = 5000
+
+def save_summaries(root, worker, count):
+    for i in range(count):
+        write_new_file(root, "summary", ".md", f"worker {worker} summary {i}\n{'x' * 2000}\nEND\n")
+
+def replace_shared(path, worker, count):
+    for i in range(count):
+        atomic_write(path, f"{worker}:{i}\n" * SHARED_LINES)
+
+def read_shared(path, seconds):
+    """(reads, torn reads) of path over seconds"""
+    reads = torn = 0
+    stop_at = time.monotonic() + seconds
+    while time.monotonic() < stop_at:
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        reads += 1
+        if len(lines) != SHARED_LINES or len(set(lines)) != 1:
+            torn += 1
+    return reads, torn
+
+def increment(path, count, locked):
+    lock = FileLock(f"{path}.lock")
+    for _ in range(count):
+        if locked:
+            lock.acquire()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                value = int(f.read() or 0)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(str(value + 1))
+        finally:
+            if locked:
+                lock.release()
+
+def add_meetings(db_file, worker, count):
+    from storage.db import MeetingDatabase
+    db = MeetingDatabase(db_file)
+    meeting_ids = []
+    for i in range(count):
+        segments = [{"start": 0.0, "end": 5.0, "text": f"Worker {worker} reviewed the roadmap and budget item {i}."}]
+        meeting_ids.append(db.add_meeting(f"audio_{worker}_{i}.wav", None, None, 5.0, segments=segments,
+                                          summary="### Action Items\n- Follow up on the budget\n"))
+        if i % 10 == 9:
+            db.related_meetings(meeting_ids[-1])
+    db.close()
+    return meeting_ids
+
+def check(name, ok, detail):
+    print(f"{'ok  ' if ok else 'FAIL'} {name}: {detail}")
+    return ok
+
+def main():
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    operations = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    total = processes * operations
+    root = tempfile.mkdtemp(prefix='stress_outputs_')
+    results = []
+
+    try:
+        with multiprocessing.Pool(processes) as pool:
+            summaries = os.path.join(root, 'summaries')
+            os.makedirs(summaries)
+            start_time = time.perf_counter()
+            pool.starmap(save_summaries, [(summaries, worker, operations) for worker in range(processes)])
+            elapsed = time.perf_counter() - start_time
+            names = [name for name in os.listdir(summaries) if name.endswith('.md')]
+            complete = 0
+            for name in names:
+                with open(os.path.join(summaries, name), 'r', encoding='utf-8') as f:
+                    complete += f.read().endswith("END\n")
+            results.append(check("summaries", len(names) == total and complete == total,
+                                 f"{total} saved, {len(names)} files, {complete} complete ({elapsed:.2f}s)"))
+
+            shared = os.path.join(root, 'shared.txt')
+            atomic_write(shared, "0:0\n" * SHARED_LINES)
+            reader = pool.apply_async(read_shared, (shared, 3))
+            pool.starmap(replace_shared, [(shared, worker, operations) for worker in range(max(1, processes - 1))])
+            reads, torn = reader.get()
+            results.append(check("shared file", torn == 0, f"{reads} reads during writes, {torn} torn"))
+
+            counter = os.path.join(root, 'counter')
+            for locked in (False, True):
+                atomic_write(counter, "0")
+                start_time = time.perf_counter()
+                pool.starmap(increment, [(counter, operations, locked)] * processes)
+                elapsed = time.perf_counter() - start_time
+                with open(counter, 'r', encoding='utf-8') as f:
+                    value = int(f.read())
+                detail = f"{value} of {total} increments counted ({elapsed:.2f}s)"
+                if locked:
+                    results.append(check("counter with FileLock", value == total, detail))
+                else:
+                    print(f"     counter without a lock (for comparison): {detail}")
+
+            db_file = os.path.join(root, 'db', 'meetings.db')
+            os.makedirs(os.path.dirname(db_file))
+            start_time = time.perf_counter()
+            meeting_ids = [meeting_id for ids in pool.starmap(add_meetings, [(db_file, worker, operations)
+                                                                               for worker in range(processes)])
+                           for meeting_id in ids]
+            elapsed = time.perf_counter() - start_time
+
+        from storage.db import MeetingDatabase
+        db = MeetingDatabase(db_file)
+        rows = len(db.get_all_meetings())
+        segments = db.conn.execute("SELECT count(*) FROM transcript_segments").fetchone()[0]
+        similarity = len(db.similarity)
+        db.close()
+        results.append(check(
+            "database",
+            len(set(meeting_ids)) == rows == segments == similarity == total,
+            f"{total} added, {len(set(meeting_ids))} distinct ids, {rows} rows, {segments} indexed segments, "
+            f"{similarity} similarity rows ({elapsed:.2f}s)"
+        ))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    sys.exit(0 if all(results) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import json
+import os
+import secrets
+import threading
+import time
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+def new_id(now=None):
+    """Timestamp id that sorts by time and doesn't collide between threads or processes
+
+    The random suffix keeps jobs finishing in the same second apart;
+    write_new_file additionally refuses to overwrite, so a collision can
+    never lose a file.
+    """
+    now = now or datetime.now()
+    return f"{now:%Y%m%d_%H%M%S}_{secrets.token_hex(4)}"
+
+def atomic_write(path, data, fsync=True, overwrite=True):
+    """Write str or bytes to path so readers see the old file or the new one, never a mix
+
+    The data goes to a uniquely named temp file in the same directory,
+    which is then renamed over path. With fsync the data and the rename
+    are flushed to disk first, so a crash can't leave an empty or torn
+    file behind either. Without overwrite an existing file is left alone
+    and FileExistsError is raised.
+    """
+    directory = os.path.dirname(path) or '.'
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+
+    fd, temp_path = _create_temp(directory, os.path.basename(path))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        if overwrite:
+            os.replace(temp_path, path)
+        else:
+            _rename_no_replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+    if fsync:
+        _fsync_directory(directory)
+
+def atomic_write_json(path, value, fsync=True):
+    """atomic_write for a JSON-serializable value"""
+    atomic_write(path, json.dumps(value, ensure_ascii=False), fsync=fsync)
+
+def write_new_file(directory, prefix, extension, data, fsync=True):
+    """Atomically write data to a new file named prefix_<new_id()>extension; returns its path"""
+    while True:
+        path = os.path.join(directory, f"{prefix}_{new_id()}{extension}")
+        try:
+            atomic_write(path, data, fsync=fsync, overwrite=False)
+            return path
+        except FileExistsError:
+            continue
+
+def _create_temp(directory, name):
+    # Unlike tempfile.mkstemp this honours the umask, so the final file gets the usual permissions
+    while True:
+        temp_path = os.path.join(directory, f".{name}.{secrets.token_hex(4)}.tmp")
+        try:
+            return os.open(temp_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, 'O_BINARY', 0), 0o666), temp_path
+        except FileExistsError:
+            continue
+
+def _rename_no_replace(source, destination):
+    try:
+        # A hard link fails if destination exists, where a rename would silently replace it
+        os.link(source, destination)
+    except FileExistsError:
+        raise
+    except OSError:
+        # No hard links on this filesystem: claim the name first, then rename over the claim
+        os.close(os.open(destination, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        os.replace(source, destination)
+        return
+    os.remove(source)
+
+def _fsync_directory(directory):
+    # Makes the rename itself durable; directories can't be opened for fsync on Windows
+    if os.name != 'posix':
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+class FileLock:
+    """Advisory lock on a file, shared by every process that locks the same path
+
+    Uses flock on POSIX and msvcrt.locking on Windows. Only cooperating
+    code that takes the same lock is kept out. The lock file is created on
+    first use; release(unlink=True) removes it, and a process that was
+    waiting on the removed file notices and locks the path's new file
+    instead. One instance can be shared between threads, which then take
+    turns as well. Use as a context manager, or call acquire() and
+    release().
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.Lock()
+        self._fd = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def acquire(self, blocking=True):
+        """Take the lock, waiting for it unless blocking is False; returns whether it was taken"""
+        if not self._thread_lock.acquire(blocking):
+            return False
+
+        locked = False
+        try:
+            while not locked:
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    if not _lock_fd(fd, blocking):
+                        return False
+                    # The previous holder may have removed the file while we waited for it
+                    locked = _is_file_at(fd, self.path)
+                finally:
+                    if not locked:
+                        os.close(fd)
+        finally:
+            if not locked:
+                self._thread_lock.release()
+        self._fd = fd
+        return True
+
+    def release(self, unlink=False):
+        """Release the lock; with unlink, remove the lock file first"""
+        fd, self._fd = self._fd, None
+        try:
+            if unlink:
+                try:
+                    os.remove(self.path)
+                except OSError:
+                    # Windows can't remove a file that is open; it is reused next time
+                    pass
+            _unlock_fd(fd)
+        finally:
+            os.close(fd)
+            self._thread_lock.release()
+
+def _is_file_at(fd, path):
+    try:
+        at_path = os.stat(path)
+    except FileNotFoundError:
+        return False
+    locked = os.fstat(fd)
+    return (at_path.st_dev, at_path.st_ino) == (locked.st_dev, locked.st_ino)
+
+def _lock_fd(fd, blocking):
+    if fcntl is not None:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        return True
+
+    os.lseek(fd, 0, os.SEEK_SET)
+    while True:
+        try:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            if not blocking:
+                return False
+            time.sleep(0.05)
+
+def _unlock_fd(fd):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
@@ -1,84 +1,461 @@
+import base64
 import json
 import os
+import re
+import sqlite3
+import threading
 from datetime import datetime
 from config.settings import Config
+from .similarity import SimilarityIndex
+
+# Bump and extend _migrate_schema when the table layout changes
+SCHEMA_VERSION = 4
+# How long a write waits for another process's transaction to finish
+BUSY_TIMEOUT_SECONDS = 30
+
+MEETING_COLUMNS = ("id", "timestamp", "audio_file", "transcript_file", "summary_file", "duration", "title")
+_SELECT_MEETINGS = f"SELECT {', '.join(MEETING_COLUMNS)} FROM meetings"
+
+def _meeting(row):
+    return dict(zip(MEETING_COLUMNS, row))
+
+# Segments and sections live in ordinary tables indexed by meeting; FTS5
+# indexes mirror them through triggers, so re-indexing or deleting one
+# meeting only touches that meeting's rows
+_SEARCH_SCHEMA = (
+    """
+        CREATE TABLE transcript_segments (
+            id INTEGER PRIMARY KEY,
+            meeting_id TEXT NOT NULL,
+            start REAL,
+            end REAL,
+            text TEXT NOT NULL
+        )
+    """,
+    """
+        CREATE INDEX transcript_segments_meeting ON transcript_segments (meeting_id)
+    """,
+    """
+        CREATE VIRTUAL TABLE transcript_index USING fts5(
+            text, content='transcript_segments', content_rowid='id', tokenize='porter unicode61'
+        )
+    """,
+    """
+        CREATE TRIGGER transcript_segments_insert AFTER INSERT ON transcript_segments BEGIN
+            INSERT INTO transcript_index (rowid, text) VALUES (new.id, new.text);
+        END
+    """,
+    """
+        CREATE TRIGGER transcript_segments_delete AFTER DELETE ON transcript_segments BEGIN
+            INSERT INTO transcript_index (transcript_index, rowid, text) VALUES ('delete', old.id, old.text);
+        END
+    """,
+    """
+        CREATE TABLE summary_sections (
+            id INTEGER PRIMARY KEY,
+            meeting_id TEXT NOT NULL,
+            section TEXT NOT NULL,
+            text TEXT NOT NULL
+        )
+    """,
+    """
+        CREATE INDEX summary_sections_meeting ON summary_sections (meeting_id)
+    """,
+    """
+        CREATE VIRTUAL TABLE summary_index USING fts5(
+            section, text, content='summary_sections', content_rowid='id', tokenize='porter unicode61'
+        )
+    """,
+    """
+        CREATE TRIGGER summary_sections_insert AFTER INSERT ON summary_sections BEGIN
+            INSERT INTO summary_index (rowid, section, text) VALUES (new.id, new.section, new.text);
+        END
+    """,
+    """
+        CREATE TRIGGER summary_sections_delete AFTER DELETE ON summary_sections BEGIN
+            INSERT INTO summary_index (summary_index, rowid, section, text)
+            VALUES ('delete', old.id, old.section, old.text);
+        END
+    """,
+)
+
+# BM25 scores every match, so a very common term is ranked among its most recent matches only
+MAX_SCORED_MATCHES = 5000
+
+def _encode_cursor(timestamp, meeting_id):
+    return base64.urlsafe_b64encode(json.dumps([timestamp, meeting_id]).encode('utf-8')).decode('ascii')
+
+def _decode_cursor(cursor):
+    try:
+        timestamp, meeting_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid history cursor: {cursor!r}") from e
+    return timestamp, meeting_id
+
+_QUERY_TERM = re.compile(r'"([^"]*)"|(\S+)')
+_HEADING = re.compile(r'^#+\s*(.*?)\s*$')
+
+def fts_query(query):
+    """Translate a search box query into an FTS5 MATCH expression
+
+    "quoted text" is a phrase, a trailing * matches a prefix and OR between
+    terms matches either; all other terms must appear. Everything else is
+    quoted, so punctuation in the query can't cause a syntax error.
+    """
+    terms = []
+    for match in _QUERY_TERM.finditer(query):
+        phrase, word = match.groups()
+        if word == 'OR' and terms and terms[-1] != 'OR':
+            terms.append('OR')
+            continue
+        text = phrase if phrase is not None else word
+        prefix = phrase is None and text.endswith('*') and len(text) > 1
+        text = text.rstrip('*') if prefix else text
+        if text.strip():
+            terms.append('"' + text.replace('"', '""') + '"' + ('*' if prefix else ''))
+    if terms and terms[-1] == 'OR':
+        terms.pop()
+    return " ".join(terms)
+
+def split_summary_sections(summary):
+    """(heading, text) for each non-empty section of a Markdown summary"""
+    sections = []
+    heading, lines = "", []
+    for line in summary.splitlines() + ["#"]:
+        match = _HEADING.match(line)
+        if not match:
+            lines.append(line)
+            continue
+        text = "\n".join(lines).strip()
+        if text:
+            sections.append((heading, text))
+        heading, lines = match.group(1), []
+    return sections
 
 class MeetingDatabase:
-    def __init__(self):
-        self.db_file = os.path.join(Config.OUTPUT_DIR, 'meetings.json')
-        self.meetings = self._load_database()
+    """Meeting records in a SQLite database
+
+    Uses WAL mode, so readers never block the writer and a crash mid-write
+    loses at most the last transaction rather than the whole file. Meetings
+    are indexed by id (primary key) and timestamp. A meetings.json left by
+    older versions is imported once, on first open. Transcripts are also
+    kept in a SimilarityIndex next to the database for related_meetings.
+
+    The connection is shared between threads, so every statement runs
+    under a lock. Several processes can share one database: SQLite locks
+    the file, and writers wait up to BUSY_TIMEOUT_SECONDS for each other.
+    """
+
+    def __init__(self, db_file=None):
+        self.db_file = db_file or os.path.join(Config.OUTPUT_DIR, 'meetings.db')
+        self.json_file = os.path.join(os.path.dirname(self.db_file), 'meetings.json')
+        self._lock = threading.RLock()
+
+        os.makedirs(os.path.dirname(self.db_file) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(self.db_file, timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # Durable at every checkpoint; in WAL mode a power cut can only lose the latest commits
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate_schema()
+        self._import_json()
+
+        self.similarity = SimilarityIndex(os.path.join(os.path.dirname(self.db_file) or '.', 'similarity'))
+        if not len(self.similarity):
+            self._backfill_similarity()
+
+    def close(self):
+        with self._lock:
+            self.similarity.close()
+            self.conn.close()
+
+    def _migrate_schema(self):
+        """Create the tables, or upgrade those made by an older SCHEMA_VERSION"""
+        with self._lock, self.conn:
+            # DDL doesn't open a transaction by itself; make the whole upgrade atomic, and
+            # take the write lock up front so a second process waits and then sees the new version
+            self.conn.execute("BEGIN IMMEDIATE")
+            version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < 1:
+                self.conn.execute("""
+                    CREATE TABLE IF NOT EXISTS meetings (
+                        id TEXT PRIMARY KEY,
+                        timestamp TEXT NOT NULL,
+                        audio_file TEXT,
+                        transcript_file TEXT,
+                        summary_file TEXT,
+                        duration REAL,
+                        title TEXT NOT NULL
+                    )
+                """)
+                self.conn.execute("CREATE INDEX IF NOT EXISTS meetings_timestamp ON meetings (timestamp)")
+            if version < 2:
+                self._create_search_index()
+            if version < 3:
+                # History pages are ordered by (timestamp, id), so ties on timestamp page stably
+                self.conn.execute("DROP INDEX IF EXISTS meetings_timestamp")
+                self.conn.execute("CREATE INDEX meetings_history ON meetings (timestamp, id)")
+            if version < 4:
+                # Reopening a recording finds its meeting by transcript instead of adding another
+                self.conn.execute("CREATE INDEX meetings_transcript ON meetings (transcript_file)")
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _create_search_index(self):
+        """Full-text indexes over transcript segments and summary sections"""
+        for statement in _SEARCH_SCHEMA:
+            self.conn.execute(statement)
+
+    def _import_json(self):
+        """One-time migration of the meetings.json database used by older versions"""
+        if not os.path.exists(self.json_file):
+            return
 
-    def _load_database(self):
-        """Load meetings database from JSON file"""
-        if os.path.exists(self.db_file):
-            try:
-                with open(self.db_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Error loading database: {e}")
-                return {"meetings": []}
-        return {"meetings": []}
-
-    def _save_database(self):
-        """Save meetings database to JSON file"""
         try:
-            with open(self.db_file, 'w', encoding='utf-8') as f:
-                json.dump(self.meetings, f, indent=2, ensure_ascii=False)
+            with open(self.json_file, 'r', encoding='utf-8') as f:
+                meetings = json.load(f).get("meetings", [])
         except Exception as e:
-            print(f"Error saving database: {e}")
-
-    def add_meeting(self, audio_file, transcript_file, summary_file, duration=None):
-        """Add a new meeting record to the database"""
-        meeting_id = datetime.now().strftime("%Y%m%d_%H%M%S")
-        meeting = {
-            "id": meeting_id,
-            "timestamp": datetime.now().isoformat(),
-            "audio_file": audio_file,
-            "transcript_file": transcript_file,
-            "summary_file": summary_file,
-            "duration": duration,
-            "title": f"Meeting {meeting_id}"
-        }
-
-        self.meetings["meetings"].append(meeting)
-        self._save_database()
+            print(f"Error loading database: {e}")
+            return
+
+        with self._lock, self.conn:
+            cursor = self.conn.executemany(
+                f"INSERT OR IGNORE INTO meetings ({', '.join(MEETING_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(MEETING_COLUMNS))})",
+                ([meeting.get(column) for column in MEETING_COLUMNS] for meeting in meetings)
+            )
+        # Keep the old file around, but never import it twice
+        try:
+            os.replace(self.json_file, f"{self.json_file}.migrated")
+        except FileNotFoundError:
+            # Another process imported it at the same time; INSERT OR IGNORE made that harmless
+            return
+        print(f"Imported {cursor.rowcount} of {len(meetings)} meetings from {self.json_file}")
+
+    def _backfill_similarity(self):
+        """Index transcripts stored before the similarity index existed"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT meeting_id, group_concat(text, ' ') FROM transcript_segments GROUP BY meeting_id"
+            ).fetchall()
+        for meeting_id, text in rows:
+            self.similarity.add(meeting_id, text)
+        if rows:
+            print(f"Indexed {len(rows)} meetings for related meeting lookup")
+
+    def add_meeting(self, audio_file, transcript_file, summary_file, duration=None, segments=None, summary=None):
+        """Add a new meeting record to the database
+
+        Transcript segments (dicts with start, end and text) and the summary
+        text, when given, are indexed for search in the same transaction.
+        """
+        now = datetime.now()
+        base_id = now.strftime("%Y%m%d_%H%M%S")
+        meeting_id = base_id
+        suffix = 1
+
+        with self._lock, self.conn:
+            while True:
+                try:
+                    self.conn.execute(
+                        f"INSERT INTO meetings ({', '.join(MEETING_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (meeting_id, now.isoformat(), audio_file, transcript_file, summary_file,
+                         duration, f"Meeting {meeting_id}")
+                    )
+                    break
+                except sqlite3.IntegrityError:
+                    # Another meeting was added within the same second
+                    suffix += 1
+                    meeting_id = f"{base_id}_{suffix}"
+
+            if segments:
+                self._index_segments(meeting_id, segments)
+            if summary:
+                self._index_summary(meeting_id, summary)
+
+        if segments:
+            self.similarity.add(meeting_id, " ".join(seg["text"] for seg in segments))
         return meeting_id
 
+    def index_transcript(self, meeting_id, segments):
+        """Replace the indexed transcript segments of a meeting"""
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM transcript_segments WHERE meeting_id = ?", (meeting_id,))
+            self._index_segments(meeting_id, segments)
+        self.similarity.add(meeting_id, " ".join(seg["text"] for seg in segments))
+
+    def set_summary(self, meeting_id, summary_file, summary):
+        """Attach a summary to a meeting and replace its indexed summary sections"""
+        with self._lock, self.conn:
+            cursor = self.conn.execute("UPDATE meetings SET summary_file = ? WHERE id = ?",
+                                       (summary_file, meeting_id))
+            if not cursor.rowcount:
+                return False
+            self.conn.execute("DELETE FROM summary_sections WHERE meeting_id = ?", (meeting_id,))
+            self._index_summary(meeting_id, summary)
+        return True
+
+    def _index_segments(self, meeting_id, segments):
+        self.conn.executemany(
+            "INSERT INTO transcript_segments (meeting_id, start, end, text) VALUES (?, ?, ?, ?)",
+            ((meeting_id, seg.get("start"), seg.get("end"), seg["text"].strip())
+             for seg in segments if seg["text"].strip())
+        )
+
+    def _index_summary(self, meeting_id, summary):
+        self.conn.executemany(
+            "INSERT INTO summary_sections (meeting_id, section, text) VALUES (?, ?, ?)",
+            ((meeting_id, section, text) for section, text in split_summary_sections(summary))
+        )
+
     def get_meeting(self, meeting_id):
         """Get a specific meeting by ID"""
-        for meeting in self.meetings["meetings"]:
-            if meeting["id"] == meeting_id:
-                return meeting
-        return None
+        with self._lock:
+            row = self.conn.execute(f"{_SELECT_MEETINGS} WHERE id = ?", (meeting_id,)).fetchone()
+        return _meeting(row) if row else None
+
+    def get_meeting_by_transcript(self, transcript_file):
+        """The newest meeting recorded with transcript_file, or None"""
+        with self._lock:
+            row = self.conn.execute(
+                f"{_SELECT_MEETINGS} WHERE transcript_file = ? ORDER BY timestamp DESC LIMIT 1", (transcript_file,)
+            ).fetchone()
+        return _meeting(row) if row else None
 
     def get_all_meetings(self):
         """Get all meetings sorted by timestamp (newest first)"""
-        meetings = self.meetings["meetings"]
-        return sorted(meetings, key=lambda x: x["timestamp"], reverse=True)
+        with self._lock:
+            rows = self.conn.execute(f"{_SELECT_MEETINGS} ORDER BY timestamp DESC, id DESC").fetchall()
+        return [_meeting(row) for row in rows]
+
+    def get_meetings_page(self, limit=50, cursor=None):
+        """One page of meeting history, newest first
+
+        Returns (meetings, next_cursor); pass next_cursor back to get the
+        following page, which is None after the last one. The cursor marks
+        a position rather than an offset, so each page is a single index
+        seek and meetings added or deleted meanwhile don't shift or repeat
+        entries on later pages.
+        """
+        with self._lock:
+            if cursor:
+                timestamp, meeting_id = _decode_cursor(cursor)
+                rows = self.conn.execute(
+                    f"{_SELECT_MEETINGS} WHERE (timestamp, id) < (?, ?) ORDER BY timestamp DESC, id DESC LIMIT ?",
+                    (timestamp, meeting_id, limit + 1)
+                ).fetchall()
+            else:
+                rows = self.conn.execute(
+                    f"{_SELECT_MEETINGS} ORDER BY timestamp DESC, id DESC LIMIT ?", (limit + 1,)
+                ).fetchall()
+
+        meetings = [_meeting(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = meetings[-1]
+            next_cursor = _encode_cursor(last["timestamp"], last["id"])
+        return meetings, next_cursor
 
     def update_meeting_title(self, meeting_id, title):
         """Update the title of a meeting"""
-        for meeting in self.meetings["meetings"]:
-            if meeting["id"] == meeting_id:
-                meeting["title"] = title
-                self._save_database()
-                return True
-        return False
+        with self._lock, self.conn:
+            cursor = self.conn.execute("UPDATE meetings SET title = ? WHERE id = ?", (title, meeting_id))
+        return cursor.rowcount > 0
 
     def delete_meeting(self, meeting_id):
         """Delete a meeting record"""
-        self.meetings["meetings"] = [
-            m for m in self.meetings["meetings"] if m["id"] != meeting_id
-        ]
-        self._save_database()
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM meetings WHERE id = ?", (meeting_id,))
+            self.conn.execute("DELETE FROM transcript_segments WHERE meeting_id = ?", (meeting_id,))
+            self.conn.execute("DELETE FROM summary_sections WHERE meeting_id = ?", (meeting_id,))
+        self.similarity.remove(meeting_id)
+
+    def related_meetings(self, meeting_id, k=5):
+        """The k meetings whose transcripts are most similar to this one's, most similar first
+
+        Each meeting dict gains a "similarity" score between 0 and 1.
+        """
+        related = []
+        for other_id, score in self.similarity.related(meeting_id, k):
+            meeting = self.get_meeting(other_id)
+            if meeting:
+                meeting["similarity"] = score
+                related.append(meeting)
+        return related
 
     def search_meetings(self, query):
-        """Search meetings by title or content"""
-        results = []
-        query_lower = query.lower()
+        """Search meetings by title or content
+
+        Meetings whose title contains the query come first, then meetings
+        whose transcript or summary matches, best match first.
+        """
+        pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        with self._lock:
+            rows = self.conn.execute(
+                f"{_SELECT_MEETINGS} WHERE title LIKE ? ESCAPE '\\' ORDER BY rowid", (pattern,)
+            ).fetchall()
+        results = [_meeting(row) for row in rows]
+
+        seen = {meeting["id"] for meeting in results}
+        for hit in self.search(query, limit=200):
+            if hit["meeting_id"] not in seen:
+                seen.add(hit["meeting_id"])
+                meeting = self.get_meeting(hit["meeting_id"])
+                if meeting:
+                    results.append(meeting)
+        return results
+
+    def search(self, query, limit=20):
+        """Ranked full-text hits in transcripts and summaries
+
+        Each hit has meeting_id, title, timestamp, source ("transcript" or
+        "summary"), a snippet with the matched terms in [brackets], the
+        segment's start and end seconds for transcript hits and the section
+        heading for summary hits. Lower scores (BM25) are better. See
+        fts_query for the query syntax. Terms matching more than
+        MAX_SCORED_MATCHES segments or sections are ranked among the most
+        recent ones.
+        """
+        match = fts_query(query)
+        if not match:
+            return []
+
+        with self._lock:
+            try:
+                transcript_rows = self._ranked_matches("transcript_index", """
+                    SELECT s.meeting_id, m.title, m.timestamp, s.start, s.end,
+                           snippet(transcript_index, 0, '[', ']', '...', 16), bm25(transcript_index)
+                    FROM transcript_index
+                    JOIN transcript_segments s ON s.id = transcript_index.rowid
+                    JOIN meetings m ON m.id = s.meeting_id
+                    WHERE transcript_index MATCH ? AND transcript_index.rowid >= ?
+                    ORDER BY bm25(transcript_index) LIMIT ?
+                """, match, limit)
+                summary_rows = self._ranked_matches("summary_index", """
+                    SELECT s.meeting_id, m.title, m.timestamp, s.section,
+                           snippet(summary_index, 1, '[', ']', '...', 16), bm25(summary_index)
+                    FROM summary_index
+                    JOIN summary_sections s ON s.id = summary_index.rowid
+                    JOIN meetings m ON m.id = s.meeting_id
+                    WHERE summary_index MATCH ? AND summary_index.rowid >= ?
+                    ORDER BY bm25(summary_index) LIMIT ?
+                """, match, limit)
+            except sqlite3.OperationalError as e:
+                print(f"Search failed for {match!r}: {e}")
+                return []
 
-        for meeting in self.meetings["meetings"]:
-            if query_lower in meeting["title"].lower():
-                results.append(meeting)
+        hits = [{"meeting_id": meeting_id, "title": title, "timestamp": timestamp, "source": "transcript",
+                 "start": start, "end": end, "snippet": snippet, "score": score}
+                for meeting_id, title, timestamp, start, end, snippet, score in transcript_rows]
+        hits += [{"meeting_id": meeting_id, "title": title, "timestamp": timestamp, "source": "summary",
+                  "section": section, "snippet": snippet, "score": score}
+                 for meeting_id, title, timestamp, section, snippet, score in summary_rows]
+        hits.sort(key=lambda hit: hit["score"])
+        return hits[:limit]
 
-        return results
\ No newline at end of file
+    def _ranked_matches(self, index, query, match, limit):
+        """Run a ranked query limited to the newest MAX_SCORED_MATCHES matches of index"""
+        # Walking the match list newest-first is cheap; scoring all of it isn't
+        cutoff = self.conn.execute(
+            f"SELECT rowid FROM {index} WHERE {index} MATCH ? ORDER BY rowid DESC LIMIT 1 OFFSET ?",
+            (match, MAX_SCORED_MATCHES - 1)
+        ).fetchone()
+        return self.conn.execute(query, (match, cutoff[0] if cutoff else 0, limit)).fetchall()
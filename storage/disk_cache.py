@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import threading
+from .atomic import atomic_write_json
+
+def file_sha256(filepath, block_size=1024 * 1024):
+    """Hash a file in fixed-size blocks so large recordings are never fully loaded"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def make_cache_key(**parts):
+    """Stable SHA-256 key for a dict of JSON-serializable parts"""
+    payload = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class DiskCache:
+    """Size-bounded on-disk JSON cache with least-recently-used eviction
+
+    Each entry is one JSON file named after its key. Reads bump the file's
+    modification time, which is what eviction orders by, so the cache needs
+    no separate index and survives restarts and crashes.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value for key, or None"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                value = json.load(f)
+            os.utime(path)
+        except FileNotFoundError:
+            value = None
+        except (ValueError, OSError) as e:
+            print(f"Discarding unreadable cache entry {path}: {e}")
+            self._remove(path)
+            value = None
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Store a JSON-serializable value under key"""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # A cache entry lost in a crash is only a miss, so skip the fsync
+            atomic_write_json(self._path(key), value, fsync=False)
+        except Exception as e:
+            print(f"Error writing cache entry: {e}")
+            return False
+
+        self._evict()
+        return True
+
+    def get_stats(self):
+        """Return hit/miss counters and the current cache size"""
+        entries = self._entries()
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "entries": len(entries),
+                "bytes": sum(size for _, size, _ in entries),
+            }
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _entries(self):
+        """(path, size, mtime) for every entry in the cache directory"""
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.endswith('.json'):
+                        try:
+                            stat = entry.stat()
+                        except FileNotFoundError:
+                            continue
+                        entries.append((entry.path, stat.st_size, stat.st_mtime))
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes"""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+
+        for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+            if total <= self.max_bytes:
+                break
+            if self._remove(path):
+                total -= size
+                with self._lock:
+                    self.evictions += 1
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
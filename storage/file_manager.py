@@ -1,55 +1,52 @@
+import heapq
+import itertools
 import os
 import json
-from datetime import datetime
+import time
 from config.settings import Config
+from audio.utils import remove_analysis_audio
+from .atomic import atomic_write, write_new_file
+
+# Coarsest directory mtime resolution we expect (FAT and some network filesystems use 2s)
+_MTIME_GRANULARITY_NS = 2 * 10 ** 9
+# Infix of the files SegmentStore keeps next to each transcript
+_SEGMENT_SIDE_FILE = '.segments.'
 
 class FileManager:
     def __init__(self):
         # Ensure directories exist
         Config.create_directories()
+        self._listings = {}  # directory -> (directory mtime, [(mtime, path, name)] newest first)
 
     def save_summary_as_markdown(self, summary, custom_filename=None):
         """Save summary as markdown file with custom filename"""
-        if custom_filename:
-            # Ensure .md extension
-            if not custom_filename.endswith('.md'):
-                custom_filename += '.md'
-            filepath = os.path.join(Config.SUMMARY_DIR, custom_filename)
-        else:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"summary_{timestamp}.md"
-            filepath = os.path.join(Config.SUMMARY_DIR, filename)
-
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(summary)
-            return filepath
+            return self._save_summary_file(summary, custom_filename, '.md')
         except Exception as e:
             print(f"Error saving markdown file: {e}")
             return None
 
     def save_summary_as_text(self, summary, custom_filename=None):
         """Save summary as text file with custom filename"""
-        if custom_filename:
-            # Ensure .txt extension
-            if not custom_filename.endswith('.txt'):
-                custom_filename += '.txt'
-            filepath = os.path.join(Config.SUMMARY_DIR, custom_filename)
-        else:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"summary_{timestamp}.txt"
-            filepath = os.path.join(Config.SUMMARY_DIR, filename)
-
         try:
             # Remove markdown formatting for text file
-            text_content = self._strip_markdown(summary)
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(text_content)
-            return filepath
+            return self._save_summary_file(self._strip_markdown(summary), custom_filename, '.txt')
         except Exception as e:
             print(f"Error saving text file: {e}")
             return None
 
+    def _save_summary_file(self, content, custom_filename, extension):
+        """Atomically write content to custom_filename, or to a new uniquely named summary file"""
+        if not custom_filename:
+            return write_new_file(Config.SUMMARY_DIR, "summary", extension, content)
+
+        # Ensure the extension
+        if not custom_filename.endswith(extension):
+            custom_filename += extension
+        filepath = os.path.join(Config.SUMMARY_DIR, custom_filename)
+        atomic_write(filepath, content)
+        return filepath
+
     def _strip_markdown(self, text):
         """Remove basic markdown formatting"""
         import re
@@ -64,36 +61,65 @@ class FileManager:
 
     def get_recent_files(self, file_type='all', limit=10):
         """Get list of recent files by type"""
-        files = []
+        sources = []
 
         if file_type in ['all', 'audio']:
-            files.extend(self._get_files_from_dir(Config.AUDIO_DIR, '.wav'))
+            sources.append(self._get_files_from_dir(Config.AUDIO_DIR, '.wav'))
 
         if file_type in ['all', 'transcript']:
-            files.extend(self._get_files_from_dir(Config.TRANSCRIPT_DIR, '.txt'))
+            sources.append(self._get_files_from_dir(Config.TRANSCRIPT_DIR, '.txt'))
 
         if file_type in ['all', 'summary']:
-            files.extend(self._get_files_from_dir(Config.SUMMARY_DIR, ['.md', '.txt']))
+            sources.append(self._get_files_from_dir(Config.SUMMARY_DIR, ['.md', '.txt']))
 
-        # Sort by modification time (newest first)
-        files.sort(key=lambda x: os.path.getmtime(x), reverse=True)
-
-        return files[:limit]
+        # Each source is already newest first, so merging stops after limit files
+        newest = heapq.merge(*sources, reverse=True)
+        return [path for _, path in itertools.islice(newest, limit)]
 
     def _get_files_from_dir(self, directory, extensions):
-        """Get files with specific extensions from directory"""
-        if not os.path.exists(directory):
-            return []
-
-        files = []
+        """Lazily yield (mtime, path) of files with specific extensions in directory, newest first"""
         if isinstance(extensions, str):
             extensions = [extensions]
+        extensions = tuple(extensions)
+
+        for mtime, path, name in self._list_dir(directory):
+            # Segment side files (<transcript>.segments.txt) sit next to the transcripts
+            if name.endswith(extensions) and _SEGMENT_SIDE_FILE not in name:
+                yield mtime, path
+
+    def _list_dir(self, directory):
+        """(mtime, path, name) for every file in directory, newest first, cached until the directory changes
 
-        for filename in os.listdir(directory):
-            filepath = os.path.join(directory, filename)
-            if os.path.isfile(filepath) and any(filename.endswith(ext) for ext in extensions):
-                files.append(filepath)
+        Creating, deleting or renaming a file updates the directory's own
+        mtime, which is all that is checked on a cache hit. Rewriting an
+        existing file in place doesn't, so its position may lag until the
+        next change to the directory.
+        """
+        try:
+            dir_mtime = os.stat(directory).st_mtime_ns
+        except FileNotFoundError:
+            self._listings.pop(directory, None)
+            return []
 
+        cached = self._listings.get(directory)
+        if cached and cached[0] == dir_mtime:
+            return cached[1]
+
+        listed_at = time.time_ns()
+        files = []
+        with os.scandir(directory) as it:
+            for entry in it:
+                try:
+                    if entry.is_file():
+                        files.append((entry.stat().st_mtime, entry.path, entry.name))
+                except FileNotFoundError:
+                    continue
+        files.sort(reverse=True)
+
+        # A change within the filesystem's timestamp granularity of the listing might not move
+        # the directory mtime, so only trust listings of directories that have been quiet since
+        if listed_at - dir_mtime > _MTIME_GRANULARITY_NS:
+            self._listings[directory] = (dir_mtime, files)
         return files
 
     def read_file(self, filepath):
@@ -106,10 +132,11 @@ class FileManager:
             return None
 
     def delete_file(self, filepath):
-        """Delete a file"""
+        """Delete a file, along with the analysis stream recorded next to an audio file"""
         try:
             if os.path.exists(filepath):
                 os.remove(filepath)
+                remove_analysis_audio(filepath)
                 return True
             return False
         except Exception as e:
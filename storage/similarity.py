@@ -0,0 +1,264 @@
+import math
+import os
+import re
+import threading
+import zlib
+from collections import Counter
+import numpy as np
+from config.settings import Config
+from .atomic import FileLock, atomic_write
+
+_WORD = re.compile(r'\w\w+')
+CURRENT_NAME = 'CURRENT'
+LOCK_NAME = 'LOCK'
+VERSION_NAME = 'VERSION'
+INITIAL_CAPACITY = 256
+# Rows scanned per block when recounting document frequencies on open
+_BLOCK_ROWS = 8192
+
+def hashed_vector(text, dimensions):
+    """Unit-length vector of log term frequencies, words hashed into dimensions buckets
+
+    Each word also gets a sign from its hash, so collisions tend to cancel
+    instead of piling up.
+    """
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for word, count in Counter(_WORD.findall(text.lower())).items():
+        digest = zlib.crc32(word.encode('utf-8'))
+        vector[digest % dimensions] += (1 + math.log(count)) * (1 if digest & 0x80000000 else -1)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+class SimilarityIndex:
+    """Related-meeting lookup over hashed term vectors in a memory-mapped matrix
+
+    Each meeting is one row of a float32 matrix on disk, weighted as log
+    term frequency and normalized (lnc); queries are weighted by inverse
+    document frequency as well (ltc), so rows never need recomputing as
+    the collection grows. Finding related meetings is one matrix-vector
+    product over the whole matrix.
+
+    Rows are appended in place; meeting ids are appended to a text file
+    next to the matrix. Removing a meeting zeroes its row, and compact()
+    rewrites the live rows into a new generation of files once enough of
+    the matrix is dead. CURRENT names the generation in use and is
+    replaced atomically, so a crash never leaves ids and rows mismatched.
+
+    Processes sharing the directory take turns through an advisory lock on
+    LOCK. VERSION counts changes, so a process that finds it moved since
+    its own last change reloads the index before going on.
+    """
+
+    def __init__(self, directory=None, dimensions=None):
+        self.directory = directory or os.path.join(Config.OUTPUT_DIR, 'similarity')
+        self.dimensions = dimensions or Config.SIMILARITY_DIMENSIONS
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self._file_lock = FileLock(os.path.join(self.directory, LOCK_NAME))
+        with self._file_lock:
+            self._version = self._read_version()
+            self._open()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def add(self, meeting_id, text):
+        """Index a meeting's text, replacing any earlier version of it"""
+        vector = hashed_vector(text, self.dimensions)
+        with self._lock, self._file_lock:
+            self._refresh()
+            self._bump_version()
+            self._clear_row(meeting_id)
+            if not vector.any():
+                return
+            if self._count == len(self._vectors):
+                self._grow()
+
+            row = self._count
+            self._vectors[row] = vector
+            self._vectors.flush()
+            # The id is written after its row, so a crash in between leaves an unused row, not a wrong one
+            self._ids_file.write(f"{meeting_id}\n")
+            self._ids_file.flush()
+
+            self._ids.append(meeting_id)
+            self._rows[meeting_id] = row
+            self._count += 1
+            self._df += vector != 0
+
+    def remove(self, meeting_id):
+        """Drop a meeting from the index; compacts once a quarter of the rows are dead"""
+        with self._lock, self._file_lock:
+            self._refresh()
+            self._bump_version()
+            self._clear_row(meeting_id)
+            self._vectors.flush()
+            dead = self._count - len(self._rows)
+            if dead >= INITIAL_CAPACITY and dead * 4 >= self._count:
+                self._compact()
+
+    def related(self, meeting_id, k=5):
+        """[(meeting_id, score)] of the k meetings most similar to an indexed meeting"""
+        with self._lock, self._file_lock:
+            self._refresh()
+            row = self._rows.get(meeting_id)
+            if row is None:
+                return []
+            query = np.array(self._vectors[row])
+        return self._top_k(query, k, exclude=meeting_id)
+
+    def search(self, text, k=5):
+        """[(meeting_id, score)] of the k meetings most similar to text"""
+        return self._top_k(hashed_vector(text, self.dimensions), k)
+
+    def compact(self):
+        """Rewrite the index without the rows of removed meetings"""
+        with self._lock, self._file_lock:
+            self._refresh()
+            self._bump_version()
+            self._compact()
+
+    def close(self):
+        with self._lock:
+            self._vectors.flush()
+            self._ids_file.close()
+
+    def _top_k(self, query, k, exclude=None):
+        with self._lock, self._file_lock:
+            self._refresh()
+            count = self._count
+            if not count:
+                return []
+            idf = np.log((1 + len(self._rows)) / (1 + self._df)).astype(np.float32) + 1
+            query = query * idf
+            norm = np.linalg.norm(query)
+            if not norm:
+                return []
+            scores = np.asarray(self._vectors[:count] @ (query / norm))
+            if exclude is not None and exclude in self._rows:
+                scores[self._rows[exclude]] = -np.inf
+            ids = self._ids
+
+        k = min(k, count)
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        # Removed meetings have all-zero rows and score exactly 0
+        return [(ids[row], float(scores[row])) for row in best if scores[row] > 0]
+
+    def _clear_row(self, meeting_id):
+        row = self._rows.pop(meeting_id, None)
+        if row is not None:
+            self._df -= self._vectors[row] != 0
+            self._vectors[row] = 0
+
+    def _read_version(self):
+        """The change counter; call with the file lock held"""
+        try:
+            with open(os.path.join(self.directory, VERSION_NAME), 'rb') as f:
+                return int.from_bytes(f.read(8), 'little')
+        except FileNotFoundError:
+            return 0
+
+    def _bump_version(self):
+        # Bumped before the change, so a crash half way still makes other processes reload
+        self._version = (self._version + 1) % 2 ** 64
+        with open(os.path.join(self.directory, VERSION_NAME), 'wb') as f:
+            f.write(self._version.to_bytes(8, 'little'))
+
+    def _refresh(self):
+        """Reload the index if another process changed it; call with both locks held"""
+        version = self._read_version()
+        if version != self._version:
+            self._vectors.flush()
+            del self._vectors
+            self._ids_file.close()
+            self._open()
+            self._version = version
+
+    def _paths(self, generation):
+        return (os.path.join(self.directory, f"vectors.{generation}.f32"),
+                os.path.join(self.directory, f"ids.{generation}.txt"))
+
+    def _open(self):
+        try:
+            with open(os.path.join(self.directory, CURRENT_NAME), 'r', encoding='utf-8') as f:
+                self._generation = int(f.read().strip())
+        except (FileNotFoundError, ValueError):
+            self._write_generation(0, INITIAL_CAPACITY, [])
+            self._set_current(0)
+
+        vectors_path, ids_path = self._paths(self._generation)
+        capacity = os.path.getsize(vectors_path) // (4 * self.dimensions)
+        with open(ids_path, 'r+', encoding='utf-8') as f:
+            content = f.read()
+            if not content.endswith('\n') and content:
+                # Drop an id cut short by a crash; its row is reused by the next add
+                content = content[:content.rfind('\n') + 1]
+                f.seek(0)
+                f.write(content)
+                f.truncate()
+        self._ids = content.splitlines()[:capacity]
+        self._count = len(self._ids)
+        self._vectors = np.memmap(vectors_path, dtype=np.float32, mode='r+', shape=(capacity, self.dimensions))
+        self._ids_file = open(ids_path, 'a', encoding='utf-8')
+
+        # A meeting re-added later supersedes its earlier rows; all-zero rows were removed
+        self._rows = {}
+        self._df = np.zeros(self.dimensions, dtype=np.int64)
+        live = np.zeros(self._count, dtype=bool)
+        for start in range(0, self._count, _BLOCK_ROWS):
+            nonzero = self._vectors[start:min(start + _BLOCK_ROWS, self._count)] != 0
+            live[start:start + len(nonzero)] = nonzero.any(axis=1)
+            self._df += nonzero.sum(axis=0)
+        for row in np.flatnonzero(live):
+            meeting_id = self._ids[row]
+            if meeting_id in self._rows:
+                self._df -= self._vectors[self._rows[meeting_id]] != 0
+            self._rows[meeting_id] = int(row)
+
+    def _grow(self):
+        """Double the matrix file's capacity"""
+        vectors_path, _ = self._paths(self._generation)
+        capacity = 2 * len(self._vectors)
+        self._vectors.flush()
+        del self._vectors
+        with open(vectors_path, 'r+b') as f:
+            f.truncate(capacity * self.dimensions * 4)
+        self._vectors = np.memmap(vectors_path, dtype=np.float32, mode='r+', shape=(capacity, self.dimensions))
+
+    def _compact(self):
+        rows = sorted(self._rows.values())
+        ids = [self._ids[row] for row in rows]
+        old_paths = self._paths(self._generation)
+        capacity = max(INITIAL_CAPACITY, 2 * len(rows))
+        self._write_generation(self._generation + 1, capacity, ids)
+        vectors = np.memmap(self._paths(self._generation + 1)[0], dtype=np.float32, mode='r+',
+                            shape=(capacity, self.dimensions))
+        for start in range(0, len(rows), _BLOCK_ROWS):
+            block = rows[start:start + _BLOCK_ROWS]
+            vectors[start:start + len(block)] = self._vectors[block]
+        vectors.flush()
+        del vectors
+        self._set_current(self._generation + 1)
+
+        self._vectors.flush()
+        del self._vectors
+        self._ids_file.close()
+        for path in old_paths:
+            os.remove(path)
+        self._open()
+        print(f"Compacted similarity index to {len(ids)} meetings")
+
+    def _write_generation(self, generation, capacity, ids):
+        """Create the files of a generation holding ids, with a zeroed matrix of capacity rows"""
+        vectors_path, ids_path = self._paths(generation)
+        with open(vectors_path, 'wb') as f:
+            f.truncate(capacity * self.dimensions * 4)
+        with open(ids_path, 'w', encoding='utf-8') as f:
+            f.writelines(f"{meeting_id}\n" for meeting_id in ids)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _set_current(self, generation):
+        atomic_write(os.path.join(self.directory, CURRENT_NAME), str(generation))
+        self._generation = generation
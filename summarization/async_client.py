@@ -0,0 +1,212 @@
+import asyncio
+import random
+import time
+import httpx
+from openai import AsyncOpenAI, APIConnectionError, APIStatusError
+from config.settings import Config
+from .cache import summary_cache
+from .chunking import batch_texts, content_defined_chunks, count_tokens
+from .prompts import MEETING_SUMMARY_PROMPT, CHUNK_SUMMARY_PROMPT, MERGE_SUMMARY_PROMPT
+from .openai_summarizer import SAMPLING_PARAMS, SYSTEM_PROMPT, make_chunk_cache_key
+
+class TokenBucket:
+    """Async token bucket refilling continuously at rate_per_minute
+
+    Holds at most one minute's worth of tokens. Waiters are served in
+    arrival order, so a large request is not starved by small ones. The
+    bucket can be created outside a running event loop; it belongs to the
+    loop it is first used in.
+    """
+
+    def __init__(self, rate_per_minute):
+        self.capacity = float(rate_per_minute)
+        self.tokens = self.capacity
+        self.rate = self.capacity / 60
+        self.updated = time.monotonic()
+        self._lock = None
+
+    async def acquire(self, amount=1):
+        """Wait until amount tokens are available and take them"""
+        # A request bigger than the whole bucket still has to go through eventually
+        amount = min(amount, self.capacity)
+        # Created here rather than in __init__: before Python 3.10 it would bind to the wrong loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def refund(self, amount):
+        """Return tokens that were reserved but not used"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+class AsyncSummarizationClient:
+    """asyncio OpenAI client for batch summarization jobs
+
+    All requests share one pooled HTTP connection, wait for the
+    requests-per-minute and tokens-per-minute buckets, run at most
+    max_concurrency at a time and are retried with jittered exponential
+    backoff on 429, 5xx and connection errors. Point base_url at a local
+    server to run against a stand-in for the API. Long transcripts are
+    split with content_defined_chunks and their per-part notes are shared
+    with OpenAISummarizer through the summary cache.
+
+    Use as an async context manager, or call aclose() when done.
+    """
+
+    def __init__(self, api_key=None, base_url=None, model=None, max_concurrency=None,
+                 requests_per_minute=None, tokens_per_minute=None, max_retries=None):
+        api_key = api_key or Config.OPENAI_API_KEY
+        if not api_key:
+            raise ValueError("OpenAI API key is required. Please set OPENAI_API_KEY in your .env file.")
+
+        self.model = model or Config.OPENAI_MODEL
+        self.max_concurrency = max_concurrency or Config.OPENAI_MAX_CONCURRENCY
+        self.max_retries = max_retries if max_retries is not None else Config.OPENAI_MAX_RETRIES
+        requests_per_minute = requests_per_minute if requests_per_minute is not None else Config.OPENAI_REQUESTS_PER_MINUTE
+        tokens_per_minute = tokens_per_minute if tokens_per_minute is not None else Config.OPENAI_TOKENS_PER_MINUTE
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+        self._http_client = httpx.AsyncClient(limits=httpx.Limits(
+            max_connections=self.max_concurrency,
+            max_keepalive_connections=self.max_concurrency,
+        ), timeout=httpx.Timeout(120.0, connect=10.0))
+        # Retries are handled here so they respect the rate limit buckets
+        self.client = AsyncOpenAI(api_key=api_key, base_url=base_url or Config.OPENAI_BASE_URL,
+                                  http_client=self._http_client, max_retries=0)
+        self._semaphore = None  # Created in the event loop, see TokenBucket.acquire
+
+        self.requests = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        await self.client.close()
+
+    async def complete(self, prompt, max_tokens=SAMPLING_PARAMS["max_tokens"]):
+        """Send one chat completion request and return its text"""
+        reserved = count_tokens(prompt, self.model) + max_tokens
+        attempt = 0
+        while True:
+            if self.request_bucket:
+                await self.request_bucket.acquire(1)
+            if self.token_bucket:
+                await self.token_bucket.acquire(reserved)
+
+            if self._semaphore is None:
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            try:
+                async with self._semaphore:
+                    self.requests += 1
+                    response = await self.client.chat.completions.create(
+                        model=self.model,
+                        messages=[
+                            {"role": "system", "content": SYSTEM_PROMPT},
+                            {"role": "user", "content": prompt}
+                        ],
+                        max_tokens=max_tokens,
+                        temperature=SAMPLING_PARAMS["temperature"]
+                    )
+            except (APIStatusError, APIConnectionError) as e:
+                # A failed request used no tokens; the retry reserves its own
+                if self.token_bucket:
+                    self.token_bucket.refund(reserved)
+                if attempt >= self.max_retries or not self._is_retryable(e):
+                    raise
+                delay = self._backoff(attempt, e)
+                attempt += 1
+                self.retries += 1
+                print(f"OpenAI request failed ({e.__class__.__name__}), retry {attempt} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            usage = response.usage
+            if usage:
+                self.prompt_tokens += usage.prompt_tokens
+                self.completion_tokens += usage.completion_tokens
+                if self.token_bucket:
+                    self.token_bucket.refund(reserved - usage.total_tokens)
+            return response.choices[0].message.content.strip()
+
+    async def summarize(self, transcript):
+        """Summarize one transcript, using map-reduce when it is too long for one request"""
+        if count_tokens(transcript, self.model) <= Config.SUMMARY_SINGLE_PASS_MAX_TOKENS:
+            return await self.complete(MEETING_SUMMARY_PROMPT.format(transcript=transcript))
+
+        # Same parts and notes cache as OpenAISummarizer._map_reduce, so only changed parts are sent
+        chunks = content_defined_chunks(transcript, Config.SUMMARY_CHUNK_TOKENS, self.model)
+        keys = [make_chunk_cache_key(chunk, self.model) for chunk in chunks]
+        notes = [(summary_cache.get(key) or {}).get("notes") for key in keys]
+        missing = [i for i, note in enumerate(notes) if note is None]
+        if missing:
+            fresh = await asyncio.gather(*[
+                self.complete(CHUNK_SUMMARY_PROMPT.format(part=i + 1, parts=len(chunks), transcript=chunks[i]))
+                for i in missing
+            ])
+            for i, note in zip(missing, fresh):
+                notes[i] = note
+                summary_cache.put(keys[i], {"notes": note})
+
+        while True:
+            batches = batch_texts(notes, Config.SUMMARY_SINGLE_PASS_MAX_TOKENS, self.model)
+            notes = await asyncio.gather(*[
+                self.complete(MERGE_SUMMARY_PROMPT.format(notes="\n\n".join(batch))) for batch in batches
+            ])
+            if len(notes) == 1:
+                return notes[0]
+
+    async def summarize_many(self, transcripts):
+        """Summarize transcripts concurrently, returning (summary, error) pairs in input order"""
+        async def summarize_one(transcript):
+            try:
+                return await self.summarize(transcript), None
+            except Exception as e:
+                return None, f"Error generating summary with OpenAI: {e}"
+
+        return await asyncio.gather(*[summarize_one(transcript) for transcript in transcripts])
+
+    def get_stats(self):
+        """Return request, retry and token counters"""
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+        }
+
+    @staticmethod
+    def _is_retryable(error):
+        if isinstance(error, APIConnectionError):
+            return True
+        return error.status_code == 429 or error.status_code >= 500
+
+    @staticmethod
+    def _backoff(attempt, error):
+        """Full-jitter exponential backoff, honouring the server's Retry-After hint"""
+        delay = random.uniform(0, min(Config.OPENAI_BACKOFF_MAX_SECONDS,
+                                      Config.OPENAI_BACKOFF_BASE_SECONDS * 2 ** attempt))
+        response = getattr(error, "response", None)
+        if response is not None:
+            try:
+                delay = max(delay, float(response.headers.get("retry-after", 0)))
+            except ValueError:
+                pass
+        return delay
@@ -0,0 +1,46 @@
+import hashlib
+import os
+from config.settings import Config
+from storage.disk_cache import DiskCache, make_cache_key
+
+def text_sha256(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def prompt_version(*prompts):
+    """Short fingerprint of prompt templates, so editing a prompt invalidates its summaries"""
+    return text_sha256("\0".join(prompts))[:16]
+
+class SummaryCache(DiskCache):
+    """Summaries keyed by transcript content, summarizer settings and prompt version"""
+
+    def __init__(self, directory=None, max_bytes=None):
+        super().__init__(
+            directory or os.path.join(Config.CACHE_DIR, 'summaries'),
+            max_bytes if max_bytes is not None else Config.SUMMARY_CACHE_MAX_BYTES
+        )
+
+    def make_key(self, transcript, summarizer, **settings):
+        """Key a transcript by its content plus whatever else shapes the summary"""
+        return make_cache_key(transcript=text_sha256(transcript), summarizer=summarizer, **settings)
+
+    def get_summary(self, key, save_summary):
+        """Return (summary, summary_filepath) for key, or (None, None)
+
+        If the cached summary's file was deleted, save_summary(summary) writes
+        a new one; otherwise the existing file is reused.
+        """
+        cached = self.get(key)
+        if not cached:
+            return None, None
+
+        summary_filepath = cached.get("summary_file")
+        if not summary_filepath or not os.path.exists(summary_filepath):
+            summary_filepath = save_summary(cached["summary"])
+            self.put_summary(key, cached["summary"], summary_filepath)
+        return cached["summary"], summary_filepath
+
+    def put_summary(self, key, summary, summary_filepath):
+        self.put(key, {"summary": summary, "summary_file": summary_filepath})
+
+# Shared by every summarizer in the process
+summary_cache = SummaryCache()
@@ -0,0 +1,161 @@
+import hashlib
+import re
+from config.settings import Config
+from transcription.cleaner import TranscriptCleaner
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Rough size of an English token, used when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+_WORD = re.compile(r'\w+')
+_encodings = {}
+
+def get_encoding(model=None):
+    """Return the tiktoken encoding for a model, or None if it can't be loaded"""
+    model = model or Config.OPENAI_MODEL
+    if model not in _encodings:
+        encoding = None
+        if tiktoken is not None:
+            try:
+                try:
+                    encoding = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    encoding = tiktoken.get_encoding('o200k_base')
+            except Exception as e:
+                # tiktoken downloads its vocabularies on first use, so this fails offline
+                print(f"Tokenizer unavailable, estimating token counts: {e}")
+        _encodings[model] = encoding
+    return _encodings[model]
+
+def count_tokens(text, model=None):
+    """Number of tokens text takes up for model (estimated without tiktoken)"""
+    encoding = get_encoding(model)
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+def split_sentences(text):
+    """Split text after sentence-ending punctuation"""
+    return [sentence for sentence in _SENTENCE_BOUNDARY.split(text.strip()) if sentence]
+
+def chunk_text(text, max_tokens, model=None):
+    """Split text into chunks of at most max_tokens, breaking between sentences
+
+    A single sentence longer than max_tokens is split between words.
+    """
+    chunks = []
+    current = []
+    current_tokens = 0
+
+    for piece, piece_tokens in _sentence_pieces(text, max_tokens, model):
+        if current and current_tokens + piece_tokens > max_tokens:
+            chunks.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += piece_tokens
+
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+def content_words(text):
+    """Lowercased words of text with filler words removed
+
+    Cleaning a transcript (fillers, capitalization, spacing) leaves this
+    unchanged, so it identifies content across such edits.
+    """
+    return _WORD.findall(TranscriptCleaner.clean_transcript(text).lower())
+
+def content_hash(text):
+    """Hash of text's content words (see content_words)"""
+    return hashlib.sha256(" ".join(content_words(text)).encode('utf-8')).hexdigest()
+
+def content_defined_chunks(text, target_tokens, model=None):
+    """Split text between sentences at boundaries chosen by the sentences themselves
+
+    A chunk ends after a sentence when a hash of that sentence's content
+    words falls in a window proportional to its length, so boundaries
+    land about every target_tokens. Because the decision depends only on
+    the sentence, editing part of a transcript moves only the boundaries
+    near the edit and every other chunk keeps its content. Chunks hold
+    roughly a quarter to twice target_tokens, and never more than three
+    times.
+    """
+    # Content word counts rather than tokens drive the boundaries, so cleaning the text doesn't move them
+    target_words = max(1, target_tokens * 3 // 4)
+    max_tokens = 3 * target_tokens
+    chunks = []
+    current = []
+    current_tokens = current_words = 0
+
+    for sentence, sentence_tokens in _sentence_pieces(text, max_tokens, model):
+        words = content_words(sentence)
+        if current and (current_words + len(words) > 2 * target_words
+                        or current_tokens + sentence_tokens > max_tokens):
+            chunks.append(" ".join(current))
+            current, current_tokens, current_words = [], 0, 0
+
+        current.append(sentence)
+        current_tokens += sentence_tokens
+        current_words += len(words)
+
+        if words and current_words >= target_words // 4:
+            digest = hashlib.sha256(" ".join(words).encode('utf-8')).digest()
+            if int.from_bytes(digest[:8], 'big') % target_words < len(words):
+                chunks.append(" ".join(current))
+                current, current_tokens, current_words = [], 0, 0
+
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+def _sentence_pieces(text, max_tokens, model):
+    """(sentence, tokens) pairs, with sentences over max_tokens split between words"""
+    for sentence in split_sentences(text):
+        sentence_tokens = count_tokens(sentence, model) + 1  # the joining space
+        if sentence_tokens > max_tokens:
+            yield from _split_long(sentence, max_tokens, model)
+        else:
+            yield sentence, sentence_tokens
+
+def _split_long(sentence, max_tokens, model):
+    """Break an overlong sentence into (piece, tokens) runs of whole words"""
+    pieces = []
+    words = []
+    words_tokens = 0
+    for word in sentence.split():
+        word_tokens = count_tokens(word, model) + 1
+        if words and words_tokens + word_tokens > max_tokens:
+            pieces.append((" ".join(words), words_tokens))
+            words, words_tokens = [], 0
+        words.append(word)
+        words_tokens += word_tokens
+    if words:
+        pieces.append((" ".join(words), words_tokens))
+    return pieces
+
+def batch_texts(texts, max_tokens, model=None):
+    """Group consecutive texts into batches of roughly max_tokens for merging
+
+    Every batch takes at least two texts (when there are two), so repeatedly
+    merging batches always converges on a single text.
+    """
+    batches = []
+    batch, batch_tokens = [], 0
+    for text in texts:
+        text_tokens = count_tokens(text, model)
+        if len(batch) >= 2 and batch_tokens + text_tokens > max_tokens:
+            batches.append(batch)
+            batch, batch_tokens = [], 0
+        batch.append(text)
+        batch_tokens += text_tokens
+    if len(batch) == 1 and batches:
+        batches[-1].append(batch[0])
+    elif batch:
+        batches.append(batch)
+    return batches
@@ -0,0 +1,137 @@
+import threading
+import time
+from config.settings import Config
+from .local_summarizer import LocalMeetingSummarizer
+from .openai_summarizer import OpenAISummarizer, SummaryCancelled
+
+class HedgedSummarizer:
+    """Race the local extractor against the OpenAI API under a latency budget
+
+    The local summary is produced straight away while the API request runs
+    in the background. If the API starts answering within the deadline its
+    result is used (and streamed); if it misses the deadline or fails, the
+    local summary is returned instead and on_replace(summary, filepath) is
+    called once the API result does arrive. Without an API key only the
+    local summarizer is used.
+    """
+
+    def __init__(self, deadline=None):
+        self.deadline = deadline if deadline is not None else Config.SUMMARY_API_DEADLINE_SECONDS
+        self.local = LocalMeetingSummarizer()
+        self.api = None
+        self.api_unavailable = None
+        try:
+            self.api = OpenAISummarizer()
+        except ValueError as e:
+            self.api_unavailable = str(e)
+        # winner, local_seconds, api_seconds, api_error and api_pending for the last summary
+        self.report = {}
+
+    def summarize_transcript(self, transcript, on_delta=None, cancel_event=None, on_replace=None):
+        """Generate meeting summary, returning whichever result wins the race"""
+        if not transcript:
+            return None, "No transcript provided"
+
+        self.report = {"api_pending": False}
+        start_time = time.perf_counter()
+
+        if self.api is None:
+            summary, summary_filepath = self._summarize_locally(transcript, start_time)
+            self.report["winner"] = "local"
+            self.report["api_error"] = self.api_unavailable
+            self._print_report()
+            return summary, summary_filepath
+
+        lock = threading.Lock()
+        decision = {}  # "winner" is set once, by the first token, the deadline or a finished request
+        api_answered = threading.Event()
+        api_result = {}
+
+        def forward_delta(text):
+            with lock:
+                # Text arriving before the deadline commits us to the API
+                winner = decision.setdefault("winner", "api")
+            api_answered.set()
+            if winner == "api" and on_delta:
+                on_delta(text)
+
+        def run_api():
+            api_start = time.perf_counter()
+            try:
+                api_result["value"] = self.api.summarize_transcript(
+                    transcript, on_delta=forward_delta, cancel_event=cancel_event
+                )
+            except Exception as e:
+                api_result["error"] = e
+            self.report["api_seconds"] = time.perf_counter() - api_start
+            api_answered.set()
+
+            with lock:
+                late = decision.setdefault("winner", "api" if self._succeeded(api_result) else "local") == "local"
+            if late and self._succeeded(api_result):
+                print(f"OpenAI summary arrived after {self.report['api_seconds']:.2f}s, replacing the local summary")
+                if on_replace:
+                    on_replace(*api_result["value"])
+
+        api_thread = threading.Thread(target=run_api, daemon=True)
+        api_thread.start()
+
+        # Not saved yet: an orphan summary file would be left behind whenever the API wins
+        local_summary, local_error = self._summarize_locally(transcript, start_time, save=False)
+
+        api_answered.wait(max(0.0, self.deadline - (time.perf_counter() - start_time)))
+        with lock:
+            winner = decision.setdefault("winner", "api" if self._succeeded(api_result) else "local")
+
+        if winner == "api":
+            api_thread.join()
+            if self._succeeded(api_result):
+                self.report["winner"] = "api"
+                self._print_report()
+                return api_result["value"]
+            if isinstance(api_result.get("error"), SummaryCancelled):
+                raise api_result["error"]
+
+        if cancel_event is not None and cancel_event.is_set():
+            raise SummaryCancelled()
+
+        # The API missed the deadline or failed; it may still replace this later
+        self.report["winner"] = "local"
+        if not api_answered.is_set():
+            self.report["api_error"] = f"no response within {self.deadline:.1f}s"
+            # Only a request still running can replace the local summary later
+            self.report["api_pending"] = True
+        else:
+            self.report["api_error"] = self._error_message(api_result)
+        self._print_report()
+        if local_summary is None:
+            return None, local_error
+        # Cached by the first call, so this only writes the file
+        return self.local.summarize_transcript(transcript)
+
+    def _summarize_locally(self, transcript, start_time, save=True):
+        summary, summary_filepath = self.local.summarize_transcript(transcript, save=save)
+        self.report["local_seconds"] = time.perf_counter() - start_time
+        return summary, summary_filepath
+
+    @staticmethod
+    def _succeeded(api_result):
+        value = api_result.get("value")
+        return value is not None and value[0] is not None
+
+    @staticmethod
+    def _error_message(api_result):
+        if "error" in api_result:
+            return str(api_result["error"])
+        value = api_result.get("value")
+        # OpenAISummarizer reports failures as (None, error message)
+        return value[1] if value else None
+
+    def _print_report(self):
+        timings = [f"local {self.report['local_seconds']:.2f}s"]
+        if "api_seconds" in self.report:
+            timings.append(f"OpenAI {self.report['api_seconds']:.2f}s")
+        message = f"Summary from {self.report['winner']} ({', '.join(timings)})"
+        if self.report.get("api_error"):
+            message += f"; OpenAI: {self.report['api_error']}"
+        print(message)
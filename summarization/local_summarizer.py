@@ -1,33 +1,135 @@
 import re
-from datetime import datetime
+import numpy as np
 from config.settings import Config
+from storage.atomic import write_new_file
+from .cache import summary_cache
+
+# Bump when the extraction rules change so cached summaries are regenerated
+RULES_VERSION = 2
+
+# Phrases marking a sentence as belonging to each summary section
+INDICATORS = {
+    'key_points': [
+        'discuss', 'talk about', 'mentioned', 'important', 'focus on',
+        'main point', 'key', 'primary', 'significant', 'noted that',
+        'explained', 'described', 'overview', 'summary', 'highlighted'
+    ],
+    'decisions': [
+        'decided', 'agreed', 'concluded', 'determined', 'resolved',
+        'settled on', 'chose to', 'will go with', 'final decision',
+        'approved', 'accepted', 'confirmed'
+    ],
+    'action_items': [
+        'will', 'should', 'need to', 'must', 'have to', 'going to',
+        'action item', 'task', 'todo', 'follow up', 'next step',
+        'assign', 'responsible for', 'deadline', 'by next', 'complete'
+    ],
+    'questions': [
+        'question', 'unclear', 'unsure', 'not sure', 'wonder',
+        'need to find out', 'follow up on', 'investigate',
+        'what about', 'how do we', 'should we', 'what if'
+    ],
+}
+CATEGORY_BITS = {category: 1 << i for i, category in enumerate(INDICATORS)}
+
+def _indicator_bits():
+    """Category bits per indicator, including those of every indicator it contains
+
+    A match on "need to find out" hides the "need to" inside it, so the
+    longer phrase carries both categories.
+    """
+    bits = {}
+    for category, indicators in INDICATORS.items():
+        for indicator in indicators:
+            bits[indicator] = bits.get(indicator, 0) | CATEGORY_BITS[category]
+
+    closed = {}
+    for indicator in bits:
+        closed[indicator] = 0
+        for other, other_bits in bits.items():
+            if other in indicator:
+                closed[indicator] |= other_bits
+    return closed
+
+def _trie_pattern(phrases):
+    """Regex matching any of phrases, factored into a trie so shared prefixes are tested once
+
+    Optional tails are greedy, so the longest phrase at a position wins.
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if '' in node else body
+
+    return build(trie)
+
+_INDICATOR_BITS = _indicator_bits()
+# Zero-width, so every position reports the longest indicator starting there
+_INDICATOR_PATTERN = re.compile('(?=(' + _trie_pattern(_INDICATOR_BITS) + '))')
+_SENTENCE_END = re.compile(r'([.!?]+)')
+# Words, plus the newlines separating sentences in the joined text
+_WORD_OR_BREAK = re.compile(r"\w+|\n")
 
 class LocalMeetingSummarizer:
     def __init__(self):
         pass
 
-    def summarize_transcript(self, transcript):
-        """Generate meeting summary from transcript using rule-based approach"""
+    def summarize_transcript(self, transcript, save=True):
+        """Generate meeting summary from transcript using rule-based approach
+
+        With save=False no summary file is written and the returned path is
+        None unless a cached summary already has one; calling again with
+        save=True then saves the cached summary.
+        """
         if not transcript:
             return None, "No transcript provided"
 
         try:
+            cache_key = summary_cache.make_key(transcript, "local", rules_version=RULES_VERSION)
+            summary, summary_filepath = summary_cache.get_summary(
+                cache_key, self._save_summary if save else lambda summary: None
+            )
+            if summary:
+                print("Using cached summary")
+                return summary, summary_filepath
+
             print("Generating summary using local text processing...")
 
             # Clean and process the transcript
-            cleaned_text = self._clean_text(transcript)
+            sentences, asked = self._clean_text(transcript)
+            lengths = np.array([len(sentence) for sentence in sentences], dtype=np.int64)
+
+            # Tag every sentence for all sections at once, then keep the most central ones
+            tags = self._tag_sentences(sentences)
+            scores = self._rank_sentences(sentences)
 
-            # Extract key information
-            key_points = self._extract_key_points(cleaned_text)
-            decisions = self._extract_decisions(cleaned_text)
-            action_items = self._extract_action_items(cleaned_text)
-            questions = self._extract_questions(cleaned_text)
+            def tagged(category):
+                return (tags & CATEGORY_BITS[category]) != 0
+
+            key_points = self._extract(sentences, tagged('key_points') & (lengths > 20), scores, 5,
+                                       "No specific key points identified")
+            decisions = self._extract(sentences, tagged('decisions') & (lengths > 15), scores, 3,
+                                      "No specific decisions identified")
+            action_items = self._extract(sentences, tagged('action_items') & (lengths > 15), scores, 5,
+                                         "No specific action items identified")
+            questions = self._extract(sentences, (asked & (lengths > 10)) | (tagged('questions') & (lengths > 15)),
+                                      scores, 3, "No open questions identified")
 
             # Generate structured summary
             summary = self._format_summary(key_points, decisions, action_items, questions)
 
             # Save summary to file
-            summary_filepath = self._save_summary(summary)
+            summary_filepath = self._save_summary(summary) if save else None
+            summary_cache.put_summary(cache_key, summary, summary_filepath)
 
             return summary, summary_filepath
 
@@ -37,91 +139,90 @@ class LocalMeetingSummarizer:
             return None, error_msg
 
     def _clean_text(self, text):
-        """Clean and normalize the text"""
+        """Split normalized text into sentences, noting which ones end with a question mark"""
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
-
-        # Split into sentences
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
-
-        return sentences
-
-    def _extract_key_points(self, sentences):
-        """Extract key discussion points"""
-        key_indicators = [
-            'discuss', 'talk about', 'mentioned', 'important', 'focus on',
-            'main point', 'key', 'primary', 'significant', 'noted that',
-            'explained', 'described', 'overview', 'summary', 'highlighted'
-        ]
-
-        key_points = []
-        for sentence in sentences:
-            sentence_lower = sentence.lower()
-            if any(indicator in sentence_lower for indicator in key_indicators):
-                if len(sentence) > 20:  # Filter out very short sentences
-                    key_points.append(sentence.strip())
-
-        # Limit to most relevant points
-        return key_points[:5] if key_points else ["No specific key points identified"]
-
-    def _extract_decisions(self, sentences):
-        """Extract decisions made during the meeting"""
-        decision_indicators = [
-            'decided', 'agreed', 'concluded', 'determined', 'resolved',
-            'settled on', 'chose to', 'will go with', 'final decision',
-            'approved', 'accepted', 'confirmed'
-        ]
-
-        decisions = []
-        for sentence in sentences:
-            sentence_lower = sentence.lower()
-            if any(indicator in sentence_lower for indicator in decision_indicators):
-                if len(sentence) > 15:
-                    decisions.append(sentence.strip())
-
-        return decisions[:3] if decisions else ["No specific decisions identified"]
-
-    def _extract_action_items(self, sentences):
-        """Extract action items and tasks"""
-        action_indicators = [
-            'will', 'should', 'need to', 'must', 'have to', 'going to',
-            'action item', 'task', 'todo', 'follow up', 'next step',
-            'assign', 'responsible for', 'deadline', 'by next', 'complete'
-        ]
-
-        action_items = []
-        for sentence in sentences:
-            sentence_lower = sentence.lower()
-            if any(indicator in sentence_lower for indicator in action_indicators):
-                if len(sentence) > 15:
-                    action_items.append(sentence.strip())
-
-        return action_items[:5] if action_items else ["No specific action items identified"]
-
-    def _extract_questions(self, sentences):
-        """Extract open questions"""
-        questions = []
-
-        # Look for actual question marks
-        for sentence in sentences:
-            if '?' in sentence and len(sentence) > 10:
-                questions.append(sentence.strip())
-
-        # Look for question indicators
-        question_indicators = [
-            'question', 'unclear', 'unsure', 'not sure', 'wonder',
-            'need to find out', 'follow up on', 'investigate',
-            'what about', 'how do we', 'should we', 'what if'
-        ]
-
-        for sentence in sentences:
-            sentence_lower = sentence.lower()
-            if any(indicator in sentence_lower for indicator in question_indicators):
-                if len(sentence) > 15:
-                    questions.append(sentence.strip())
-
-        return questions[:3] if questions else ["No open questions identified"]
+        text = " ".join(text.split())
+
+        # Split into sentences, keeping the punctuation that ended each one
+        parts = _SENTENCE_END.split(text)
+        sentences = []
+        asked = []
+        for i in range(0, len(parts), 2):
+            sentence = parts[i].strip()
+            if sentence:
+                sentences.append(sentence)
+                asked.append(i + 1 < len(parts) and '?' in parts[i + 1])
+
+        return sentences, np.array(asked, dtype=bool)
+
+    def _tag_sentences(self, sentences):
+        """Bitmask of the categories each sentence's indicators point to, in one scan
+
+        All sentences are joined and searched once for every indicator. The
+        lookahead finds the longest indicator starting at each position, and
+        _INDICATOR_BITS also carries the categories of shorter indicators it
+        contains, so the result matches checking every indicator separately.
+        """
+        # Lowercase before measuring: some characters change length (İ becomes i + a combining dot)
+        lowered = [sentence.lower() for sentence in sentences]
+        joined = "\n".join(lowered)
+        # Offset at which each sentence starts in the joined text
+        starts = np.zeros(len(sentences), dtype=np.int64)
+        np.cumsum([len(sentence) + 1 for sentence in lowered[:-1]], out=starts[1:])
+
+        positions = []
+        bits = []
+        for match in _INDICATOR_PATTERN.finditer(joined):
+            positions.append(match.start())
+            bits.append(_INDICATOR_BITS[match.group(1)])
+
+        tags = np.zeros(len(sentences), dtype=np.int64)
+        if positions:
+            owners = np.searchsorted(starts, positions, side='right') - 1
+            np.bitwise_or.at(tags, owners, np.array(bits, dtype=np.int64))
+        return tags
+
+    def _rank_sentences(self, sentences):
+        """Score each sentence by TF-IDF cosine similarity to the whole transcript
+
+        Sentences close to the transcript's overall content rank highest.
+        Computed over (sentence, term) pairs with bincount, so the cost is
+        linear in the number of words.
+        """
+        # Term 0 marks a sentence break, so a running count of them gives each word's sentence
+        vocabulary = {"\n": 0}
+        tokens = np.array([vocabulary.setdefault(token, len(vocabulary))
+                           for token in _WORD_OR_BREAK.findall("\n".join(sentences).lower())], dtype=np.int64)
+        owners = np.cumsum(tokens == 0)
+        words = tokens != 0
+        owners, terms = owners[words], tokens[words]
+        if not len(terms):
+            return np.zeros(len(sentences))
+
+        # Collapse repeated words into (sentence, term) counts
+        pairs, counts = np.unique(owners * len(vocabulary) + terms, return_counts=True)
+        owners, terms = np.divmod(pairs, len(vocabulary))
+
+        document_frequency = np.bincount(terms, minlength=len(vocabulary))
+        idf = np.log((1 + len(sentences)) / (1 + document_frequency)) + 1
+        weights = (1 + np.log(counts)) * idf[terms]
+
+        centroid = np.bincount(terms, weights=weights, minlength=len(vocabulary))
+        dot = np.bincount(owners, weights=weights * centroid[terms], minlength=len(sentences))
+        norms = np.sqrt(np.bincount(owners, weights=weights ** 2, minlength=len(sentences)))
+        norms *= np.linalg.norm(centroid)
+        return np.divide(dot, norms, out=np.zeros(len(sentences)), where=norms > 0)
+
+    def _extract(self, sentences, candidates, scores, limit, fallback):
+        """The limit best-scoring candidate sentences, in transcript order"""
+        indices = np.flatnonzero(candidates)
+        if not len(indices):
+            return [fallback]
+        if len(indices) > limit:
+            # Highest score first, earlier sentence on ties
+            best = np.lexsort((indices, -scores[indices]))[:limit]
+            indices = np.sort(indices[best])
+        return [sentences[i] for i in indices]
 
     def _format_summary(self, key_points, decisions, action_items, questions):
         """Format the extracted information into a structured summary"""
@@ -150,13 +251,8 @@ class LocalMeetingSummarizer:
 
     def _save_summary(self, summary):
         """Save summary to markdown file"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"summary_{timestamp}.md"
-        filepath = f"{Config.SUMMARY_DIR}/{filename}"
-
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(summary)
+            filepath = write_new_file(Config.SUMMARY_DIR, "summary", ".md", summary)
             print(f"Summary saved to: {filepath}")
             return filepath
         except Exception as e:
@@ -1,7 +1,29 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
 from openai import OpenAI
-from datetime import datetime
 from config.settings import Config
-from .prompts import MEETING_SUMMARY_PROMPT
+from storage.atomic import write_new_file
+from .cache import prompt_version, summary_cache
+from .chunking import batch_texts, content_defined_chunks, content_hash, count_tokens
+from .prompts import MEETING_SUMMARY_PROMPT, CHUNK_SUMMARY_PROMPT, MERGE_SUMMARY_PROMPT
+
+class SummaryCancelled(Exception):
+    """Raised when a summary is cancelled before it completes"""
+
+SYSTEM_PROMPT = "You are a helpful assistant that creates structured meeting summaries. Focus on extracting key information and organizing it clearly."
+# Lower temperature for more focused, consistent outputs
+SAMPLING_PARAMS = {"max_tokens": 2000, "temperature": 0.3}
+PROMPT_VERSION = prompt_version(SYSTEM_PROMPT, MEETING_SUMMARY_PROMPT, CHUNK_SUMMARY_PROMPT, MERGE_SUMMARY_PROMPT)
+
+def make_chunk_cache_key(chunk, model=None):
+    """Summary cache key for the notes on one transcript part"""
+    # Content words, so a part that was only cleaned up keeps its notes
+    return summary_cache.make_key(
+        content_hash(chunk), "openai-part",
+        model=model or Config.OPENAI_MODEL,
+        params=SAMPLING_PARAMS,
+        prompt_version=PROMPT_VERSION,
+    )
 
 class OpenAISummarizer:
     def __init__(self):
@@ -9,35 +31,53 @@ class OpenAISummarizer:
             raise ValueError("OpenAI API key is required. Please set OPENAI_API_KEY in your .env file.")
 
         # Set up OpenAI client (modern API)
-        self.client = OpenAI(api_key=Config.OPENAI_API_KEY)
+        self.client = OpenAI(api_key=Config.OPENAI_API_KEY, base_url=Config.OPENAI_BASE_URL)
+        self.metrics = {}  # stage -> calls, seconds, prompt/completion tokens for the last summary
+        self.latency = {}  # time_to_first_token and total seconds for the last summary
+        self._cancel_event = None
+        self._start_time = None
 
-    def summarize_transcript(self, transcript):
-        """Generate meeting summary from transcript using OpenAI"""
+    def summarize_transcript(self, transcript, on_delta=None, cancel_event=None):
+        """Generate meeting summary from transcript using OpenAI
+
+        With on_delta, the final request is streamed and on_delta(text) is
+        called with each piece as it arrives. Setting cancel_event stops the
+        summary and raises SummaryCancelled.
+        """
         if not transcript:
             return None, "No transcript provided"
 
         try:
-            print("Generating summary with OpenAI...")
-            prompt = MEETING_SUMMARY_PROMPT.format(transcript=transcript)
-
-            # Use the modern OpenAI API format
-            response = self.client.chat.completions.create(
-                model=Config.OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that creates structured meeting summaries. Focus on extracting key information and organizing it clearly."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=2000,
-                temperature=0.3  # Lower temperature for more focused, consistent outputs
-            )
-
-            summary = response.choices[0].message.content.strip()
+            self.metrics = {}
+            self.latency = {}
+            self._cancel_event = cancel_event
+            self._start_time = time.perf_counter()
+
+            # An unchanged transcript with unchanged settings needs no API call
+            cache_key = self._make_cache_key(transcript)
+            summary, summary_filepath = summary_cache.get_summary(cache_key, self._save_summary)
+            if summary:
+                print("Using cached summary")
+                return summary, summary_filepath
+
+            if count_tokens(transcript) <= Config.SUMMARY_SINGLE_PASS_MAX_TOKENS:
+                print("Generating summary with OpenAI...")
+                prompt = MEETING_SUMMARY_PROMPT.format(transcript=transcript)
+                summary = self._run_stage("summary", [prompt], on_delta)[0]
+            else:
+                summary = self._map_reduce(transcript, on_delta)
+            self.latency["total"] = time.perf_counter() - self._start_time
+            self._print_metrics()
 
             # Save summary to file
             summary_filepath = self._save_summary(summary)
+            summary_cache.put_summary(cache_key, summary, summary_filepath)
 
             return summary, summary_filepath
 
+        except SummaryCancelled:
+            print("Summary cancelled")
+            raise
         except Exception as e:
             # Handle various OpenAI API errors
             error_msg = f"Error generating summary with OpenAI: {e}"
@@ -53,15 +93,126 @@ class OpenAISummarizer:
 
             return None, error_msg
 
+    def _map_reduce(self, transcript, on_delta=None):
+        """Summarize parts of a long transcript concurrently, then merge the notes
+
+        Notes for each part are cached by the part's content, and parts are
+        cut at content-defined boundaries, so after an edit only the parts
+        that changed are summarized again before the merge.
+        """
+        chunks = content_defined_chunks(transcript, Config.SUMMARY_CHUNK_TOKENS)
+        keys = [make_chunk_cache_key(chunk) for chunk in chunks]
+        notes = [(summary_cache.get(key) or {}).get("notes") for key in keys]
+        missing = [i for i, note in enumerate(notes) if note is None]
+        print(f"Generating summary with OpenAI from {len(chunks)} transcript parts "
+              f"({len(chunks) - len(missing)} unchanged)...")
+
+        if missing:
+            fresh = self._run_stage("map", [
+                CHUNK_SUMMARY_PROMPT.format(part=i + 1, parts=len(chunks), transcript=chunks[i])
+                for i in missing
+            ])
+            for i, note in zip(missing, fresh):
+                notes[i] = note
+                summary_cache.put(keys[i], {"notes": note})
+
+        # Very long meetings produce more notes than fit in one request, so merge in rounds
+        while True:
+            batches = batch_texts(notes, Config.SUMMARY_SINGLE_PASS_MAX_TOKENS)
+            notes = self._run_stage("reduce", [
+                MERGE_SUMMARY_PROMPT.format(notes="\n\n".join(batch)) for batch in batches
+            ], on_delta if len(batches) == 1 else None)
+            if len(notes) == 1:
+                return notes[0]
+
+    def _run_stage(self, stage, prompts, on_delta=None):
+        """Run prompts concurrently and record the stage's latency and token usage
+
+        on_delta streams the response when the stage is a single request.
+        """
+        start_time = time.perf_counter()
+        if on_delta and len(prompts) == 1:
+            results = [self._complete(prompts[0], on_delta)]
+        else:
+            workers = max(1, min(Config.SUMMARY_CONCURRENCY, len(prompts)))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(self._complete, prompts))
+
+        metrics = self.metrics.setdefault(stage, {
+            "calls": 0, "seconds": 0.0, "prompt_tokens": 0, "completion_tokens": 0
+        })
+        metrics["calls"] += len(results)
+        metrics["seconds"] += time.perf_counter() - start_time
+        for _, usage in results:
+            if usage:
+                metrics["prompt_tokens"] += usage.prompt_tokens
+                metrics["completion_tokens"] += usage.completion_tokens
+        return [text for text, _ in results]
+
+    def _complete(self, prompt, on_delta=None):
+        """Send one chat completion request, returning (text, usage)"""
+        self._check_cancelled()
+        request = dict(
+            model=Config.OPENAI_MODEL,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            **SAMPLING_PARAMS
+        )
+        if on_delta is None:
+            response = self.client.chat.completions.create(**request)
+            return response.choices[0].message.content.strip(), response.usage
+
+        stream = self.client.chat.completions.create(stream=True, stream_options={"include_usage": True}, **request)
+        parts = []
+        usage = None
+        try:
+            for chunk in stream:
+                self._check_cancelled()
+                if chunk.usage:
+                    usage = chunk.usage
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    if not parts:
+                        self.latency["time_to_first_token"] = time.perf_counter() - self._start_time
+                    parts.append(delta)
+                    on_delta(delta)
+        finally:
+            # Closing the connection mid-stream also stops generation on the server
+            stream.close()
+        return "".join(parts).strip(), usage
+
+    @staticmethod
+    def _make_cache_key(transcript):
+        return summary_cache.make_key(
+            transcript, "openai",
+            model=Config.OPENAI_MODEL,
+            params=SAMPLING_PARAMS,
+            prompt_version=PROMPT_VERSION,
+            # Long transcripts are summarized differently depending on how they are split
+            single_pass_max_tokens=Config.SUMMARY_SINGLE_PASS_MAX_TOKENS,
+            chunk_tokens=Config.SUMMARY_CHUNK_TOKENS,
+        )
+
+    def _check_cancelled(self):
+        if self._cancel_event is not None and self._cancel_event.is_set():
+            raise SummaryCancelled()
+
+    def _print_metrics(self):
+        for stage, metrics in self.metrics.items():
+            print(f"Summary {stage}: {metrics['calls']} requests in {metrics['seconds']:.1f}s, "
+                  f"{metrics['prompt_tokens']} prompt + {metrics['completion_tokens']} completion tokens")
+        if "time_to_first_token" in self.latency:
+            print(f"Summary latency: first token after {self.latency['time_to_first_token']:.2f}s, "
+                  f"complete after {self.latency['total']:.2f}s")
+        else:
+            print(f"Summary latency: complete after {self.latency['total']:.2f}s")
+
     def _save_summary(self, summary):
         """Save summary to markdown file"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"summary_{timestamp}.md"
-        filepath = f"{Config.SUMMARY_DIR}/{filename}"
-
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(summary)
+            filepath = write_new_file(Config.SUMMARY_DIR, "summary", ".md", summary)
             print(f"Summary saved to: {filepath}")
             return filepath
         except Exception as e:
@@ -1,8 +1,4 @@
-MEETING_SUMMARY_PROMPT = """Please analyze the following meeting transcript and create a structured summary using the format below.
-
-Focus on extracting the most important information and organizing it clearly:
-
-## Meeting Summary
+SUMMARY_FORMAT = """## Meeting Summary
 
 ### Key Points
 - [List the main topics discussed and important information shared]
@@ -14,13 +10,35 @@ Focus on extracting the most important information and organizing it clearly:
 - [List specific tasks assigned to individuals with deadlines if mentioned]
 
 ### Open Questions
-- [List any unresolved questions or topics that need follow-up]
+- [List any unresolved questions or topics that need follow-up]"""
+
+MEETING_SUMMARY_PROMPT = """Please analyze the following meeting transcript and create a structured summary using the format below.
+
+Focus on extracting the most important information and organizing it clearly:
+
+""" + SUMMARY_FORMAT + """
 
 Transcript:
 {transcript}
 
 Please provide a concise but comprehensive summary following the format above."""
 
+CHUNK_SUMMARY_PROMPT = """The following is part {part} of {parts} of a long meeting transcript. Extract the information from this part only, using the format below. Leave a section empty if this part has nothing for it.
+
+""" + SUMMARY_FORMAT + """
+
+Transcript (part {part} of {parts}):
+{transcript}"""
+
+MERGE_SUMMARY_PROMPT = """Below are notes taken from consecutive parts of the same meeting. Merge them into one structured summary using the format below. Combine duplicates, keep every decision and action item with its owner and deadline, and drop open questions that a later part answered.
+
+""" + SUMMARY_FORMAT + """
+
+Notes:
+{notes}
+
+Please provide a concise but comprehensive summary following the format above."""
+
 FOLLOW_UP_PROMPT = """Based on the meeting summary below, generate a list of follow-up actions and next steps:
 
 {summary}
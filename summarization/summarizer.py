@@ -1,5 +1,7 @@
-# OpenAI-powered meeting summarizer
+# Meeting summarizer: local extraction hedged against the OpenAI API
 from .openai_summarizer import OpenAISummarizer
+from .local_summarizer import LocalMeetingSummarizer
+from .hedged_summarizer import HedgedSummarizer
 
 # Alias for compatibility with existing imports
-MeetingSummarizer = OpenAISummarizer
\ No newline at end of file
+MeetingSummarizer = HedgedSummarizer
\ No newline at end of file
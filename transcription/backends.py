@@ -0,0 +1,110 @@
+import warnings
+import torch
+import whisper
+from config.settings import Config
+
+try:
+    from faster_whisper import WhisperModel as FasterWhisperModel
+except ImportError:
+    FasterWhisperModel = None
+
+class TranscriptionBackend:
+    """Loads models that provide Whisper's transcribe(audio, **options) interface
+
+    Whatever load_model returns must accept a file path or a 16 kHz float32
+    array and return a dict with "text", "segments" and "language", the way
+    whisper's own model.transcribe does.
+    """
+    name = None
+
+    def default_device(self):
+        return "cuda" if torch.cuda.is_available() else "cpu"
+
+    def load_model(self, model_name, device):
+        raise NotImplementedError
+
+class WhisperTorchBackend(TranscriptionBackend):
+    """Reference openai-whisper model running in FP32/FP16 PyTorch"""
+    name = 'whisper'
+
+    def load_model(self, model_name, device):
+        return whisper.load_model(model_name, device=device)
+
+class QuantizedWhisperBackend(TranscriptionBackend):
+    """openai-whisper with int8 dynamically quantized Linear layers, for CPU inference"""
+    name = 'whisper-int8'
+
+    def default_device(self):
+        return "cpu"
+
+    def load_model(self, model_name, device):
+        if device != "cpu":
+            raise ValueError("The whisper-int8 backend only runs on CPU")
+
+        model = whisper.load_model(model_name, device="cpu")
+
+        # whisper subclasses nn.Linear only to cast weights to the input dtype,
+        # which is a no-op in FP32; plain nn.Linear is what the quantizer maps
+        for module in model.modules():
+            if type(module) is whisper.model.Linear:
+                module.__class__ = torch.nn.Linear
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            warnings.simplefilter("ignore", UserWarning)
+            return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+class FasterWhisperBackend(TranscriptionBackend):
+    """CTranslate2 int8 runtime via the optional faster-whisper package"""
+    name = 'faster-whisper'
+
+    def default_device(self):
+        return "cpu"
+
+    def load_model(self, model_name, device):
+        if FasterWhisperModel is None:
+            raise ImportError("The faster-whisper backend requires: pip install faster-whisper")
+        return _FasterWhisperAdapter(FasterWhisperModel(model_name, device=device, compute_type="int8"))
+
+class _FasterWhisperAdapter:
+    """Present a faster-whisper model through whisper's transcribe() result format"""
+
+    # whisper keyword arguments that faster-whisper understands under the same name
+    SUPPORTED_OPTIONS = ('language', 'task', 'temperature', 'initial_prompt',
+                         'condition_on_previous_text', 'word_timestamps', 'beam_size')
+
+    def __init__(self, model):
+        self.model = model
+
+    def transcribe(self, audio, **options):
+        kwargs = {key: value for key, value in options.items() if key in self.SUPPORTED_OPTIONS}
+        segments, info = self.model.transcribe(audio, **kwargs)
+        result_segments = [{
+            "id": i,
+            "start": seg.start,
+            "end": seg.end,
+            "text": seg.text,
+            "avg_logprob": seg.avg_logprob,
+            "no_speech_prob": seg.no_speech_prob,
+        } for i, seg in enumerate(segments)]
+        return {
+            "text": "".join(seg["text"] for seg in result_segments),
+            "segments": result_segments,
+            "language": info.language,
+        }
+
+    def parameters(self):
+        # CTranslate2 weights are not torch tensors, so the model cache can't size them
+        return iter(())
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (WhisperTorchBackend, QuantizedWhisperBackend, FasterWhisperBackend)
+}
+
+def get_backend(name=None):
+    """Return the transcription backend selected by name or Config.TRANSCRIPTION_BACKEND"""
+    name = name or Config.TRANSCRIPTION_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown transcription backend '{name}'. Choose from: {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
@@ -0,0 +1,27 @@
+import os
+from config.settings import Config
+from storage.disk_cache import DiskCache, file_sha256, make_cache_key
+
+class TranscriptionCache(DiskCache):
+    """Transcripts and segments keyed by audio content, model and decode options"""
+
+    def __init__(self, directory=None, max_bytes=None):
+        super().__init__(
+            directory or os.path.join(Config.CACHE_DIR, 'transcripts'),
+            max_bytes if max_bytes is not None else Config.TRANSCRIPTION_CACHE_MAX_BYTES
+        )
+
+    def make_key(self, audio_filepath, model_name, decode_options, backend=None):
+        """Key an audio file by its content rather than its name"""
+        return make_cache_key(
+            audio=file_sha256(audio_filepath),
+            model=model_name,
+            # Quantized and alternative runtimes produce slightly different text
+            backend=backend or Config.TRANSCRIPTION_BACKEND,
+            options=decode_options,
+            # Silence stripping changes what Whisper hears, so it is part of the key
+            vad={name: getattr(Config, name) for name in dir(Config) if name.startswith('VAD_')},
+        )
+
+# Shared by every WhisperTranscriber in the process
+transcription_cache = TranscriptionCache()
@@ -0,0 +1,245 @@
+import json
+import os
+import shutil
+import threading
+import time
+from config.settings import Config
+from storage.atomic import FileLock, atomic_write_json
+from audio.resampler import WHISPER_SAMPLE_RATE
+from .parallel import ParallelTranscriber, find_cut_points, plan_chunks, stitch_segments, transcribe_chunk
+from .whisper_client import WhisperTranscriber
+
+MANIFEST_NAME = 'manifest.json'
+
+class TranscriptionCancelled(Exception):
+    """Raised when a checkpointed transcription stops early; finished chunks are kept"""
+
+def _read_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _chunk_path(job_dir, index):
+    return os.path.join(job_dir, f"chunk_{index:05d}.json")
+
+def _release_job_lock(job_lock, job_dir):
+    # The lock file lives as long as its job directory: removed with a finished job, kept for a resumable one
+    job_lock.release(unlink=not os.path.isdir(job_dir))
+
+def list_unfinished_jobs(jobs_dir=None):
+    """Manifests of interrupted transcriptions, most recent first
+
+    Each manifest gains a "chunks_done" count. Jobs whose audio file no
+    longer exists are deleted, as are lock files left without a job; jobs
+    another process is working on are left out.
+    """
+    jobs_dir = jobs_dir or Config.JOBS_DIR
+    try:
+        entries = list(os.scandir(jobs_dir))
+    except FileNotFoundError:
+        return []
+
+    jobs = []
+    for entry in entries:
+        if entry.name.endswith('.lock'):
+            job_dir = entry.path[:-len('.lock')]
+            if not os.path.isdir(job_dir):
+                job_lock = FileLock(entry.path)
+                if job_lock.acquire(blocking=False):
+                    _release_job_lock(job_lock, job_dir)
+            continue
+        if not entry.is_dir():
+            continue
+
+        job_lock = FileLock(f"{entry.path}.lock")
+        if not job_lock.acquire(blocking=False):
+            continue
+        try:
+            manifest = _read_json(os.path.join(entry.path, MANIFEST_NAME))
+            if manifest is None or not os.path.exists(manifest["audio_file"]):
+                shutil.rmtree(entry.path, ignore_errors=True)
+                continue
+            manifest["chunks_done"] = sum(1 for name in os.listdir(entry.path)
+                                          if name.startswith('chunk_') and name.endswith('.json'))
+            jobs.append(manifest)
+        finally:
+            _release_job_lock(job_lock, entry.path)
+
+    jobs.sort(key=lambda job: job["created"], reverse=True)
+    return jobs
+
+class CheckpointedTranscriber(WhisperTranscriber):
+    """Transcribe audio as a sequence of chunk jobs checkpointed to disk
+
+    Each finished chunk's segments are written to a job directory under
+    Config.JOBS_DIR named after the transcription cache key, so the same
+    audio with the same settings finds its checkpoints again after a crash
+    or restart and only the missing chunks are transcribed. Cancellation is
+    cooperative: it takes effect between chunks, so Config.CHECKPOINT_CHUNK_SECONDS
+    also bounds how long cancelling takes.
+    """
+
+    def __init__(self, model_name=None, backend=None, cancel_event=None, on_progress=None):
+        super().__init__(model_name, backend)
+        self.cancel_event = cancel_event or threading.Event()
+        self.on_progress = on_progress
+
+    def cancel(self):
+        """Stop after the chunk currently being transcribed"""
+        self.cancel_event.set()
+
+    def transcribe_audio(self, audio_filepath):
+        """Transcribe audio file to text, resuming from any checkpointed chunks
+
+        Raises TranscriptionCancelled if cancelled before all chunks finish.
+        """
+        transcript, transcript_filepath = self.get_cached_transcript(audio_filepath)
+        if transcript:
+            self._report(100)
+            return transcript, transcript_filepath
+
+        if not self.local_model:
+            return None, "Local Whisper model not loaded"
+        if not self._cache_key:
+            return None, "Could not read audio file"
+
+        # Workers sharing one outputs/ tree take turns on the same audio rather than race on its checkpoints
+        os.makedirs(Config.JOBS_DIR, exist_ok=True)
+        job_dir = os.path.join(Config.JOBS_DIR, self._cache_key)
+        job_lock = FileLock(f"{job_dir}.lock")
+        if not job_lock.acquire(blocking=False):
+            print("Another process is transcribing this audio, waiting for it...")
+            job_lock.acquire()
+            transcript, transcript_filepath = self.get_cached_transcript(audio_filepath)
+            if transcript:
+                _release_job_lock(job_lock, job_dir)
+                self._report(100)
+                return transcript, transcript_filepath
+
+        try:
+            return self._transcribe_job(audio_filepath, job_dir)
+        finally:
+            _release_job_lock(job_lock, job_dir)
+
+    def _transcribe_job(self, audio_filepath, job_dir):
+        """Transcribe the chunks of a job not checkpointed yet; the caller holds the job's lock"""
+        try:
+            print("Transcribing audio with local Whisper model (checkpointed)...")
+            start_time = time.perf_counter()
+
+            audio, source = self.load_audio(audio_filepath)
+            time_map = None
+            if Config.VAD_ENABLED:
+                audio, time_map = self._strip_silence(audio)
+
+            parallel = self._use_parallel(audio)
+            cut_points = time_map.compact_starts[1:] if time_map else find_cut_points(audio)
+            chunk_seconds = Config.PARALLEL_CHUNK_SECONDS if parallel else Config.CHECKPOINT_CHUNK_SECONDS
+            chunks = [list(chunk) for chunk in plan_chunks(len(audio), cut_points, chunk_seconds)]
+
+            chunk_segments, language = self._load_checkpoints(job_dir, audio_filepath, chunks)
+            remaining = [index for index, segments in enumerate(chunk_segments) if segments is None]
+            if len(remaining) < len(chunks):
+                print(f"Resuming transcription: {len(chunks) - len(remaining)} of {len(chunks)} chunks already done")
+
+            total_samples = max(len(audio), 1)
+            done_samples = sum(end - start for (start, end, _), segments in zip(chunks, chunk_segments)
+                               if segments is not None)
+            self._report(done_samples * 100 // total_samples)
+
+            for index, segments, chunk_language in self._run_chunks(audio, chunks, remaining, chunk_segments, parallel):
+                segments = [self._segment_fields(seg) for seg in segments]
+                atomic_write_json(_chunk_path(job_dir, index), {"segments": segments, "language": chunk_language})
+                chunk_segments[index] = segments
+                if index == 0:
+                    language = chunk_language
+
+                start, end, _ = chunks[index]
+                done_samples += end - start
+                self._report(done_samples * 100 // total_samples)
+
+            segments = stitch_segments(chunks, chunk_segments)
+            if time_map:
+                time_map.map_segments(segments)
+            transcript = "".join(seg["text"] for seg in segments).strip()
+
+            elapsed = time.perf_counter() - start_time
+            print(f"Transcription finished in {elapsed:.1f}s (input: {source}, {len(chunks)} chunks)")
+
+            self.segments = [self._segment_fields(seg) for seg in segments]
+            transcript_filepath = self._store_transcript(transcript, language, audio_filepath)
+            shutil.rmtree(job_dir, ignore_errors=True)
+
+            return transcript, transcript_filepath
+        except TranscriptionCancelled:
+            print("Transcription cancelled; finished chunks will be resumed next time")
+            raise
+        except Exception as e:
+            error_msg = f"Error transcribing with local model: {e}"
+            print(error_msg)
+            return None, error_msg
+
+    def _load_checkpoints(self, job_dir, audio_filepath, chunks):
+        """Return (per-chunk segments or None, language) from an existing job, starting one if needed"""
+        chunk_segments = [None] * len(chunks)
+        language = None
+
+        manifest = _read_json(os.path.join(job_dir, MANIFEST_NAME))
+        if manifest is not None and manifest["chunks"] != chunks:
+            # Same audio and settings but a different chunk plan (e.g. chunk size changed)
+            print("Discarding checkpoints made with a different chunk plan")
+            shutil.rmtree(job_dir, ignore_errors=True)
+            manifest = None
+
+        if manifest is None:
+            os.makedirs(job_dir, exist_ok=True)
+            atomic_write_json(os.path.join(job_dir, MANIFEST_NAME), {
+                "audio_file": os.path.abspath(audio_filepath),
+                "model": self.model_name,
+                "backend": self.backend,
+                "chunks": chunks,
+                "created": time.time(),
+            })
+            return chunk_segments, language
+
+        for index in range(len(chunks)):
+            checkpoint = _read_json(_chunk_path(job_dir, index))
+            if checkpoint is not None:
+                chunk_segments[index] = checkpoint["segments"]
+                if index == 0:
+                    language = checkpoint["language"]
+        return chunk_segments, language
+
+    def _run_chunks(self, audio, chunks, remaining, chunk_segments, parallel):
+        """Yield (chunk_index, segments, language) for the remaining chunks, checking for cancellation"""
+        options = Config.WHISPER_DECODE_OPTIONS
+
+        if parallel and len(remaining) > 1:
+            transcriber = ParallelTranscriber(model_name=self.model_name, backend=self.backend)
+            results = transcriber.map_chunks(audio, [chunks[index] for index in remaining], **options)
+            for position, segments, language in results:
+                yield remaining[position], segments, language
+                if self.cancel_event.is_set():
+                    results.close()
+                    raise TranscriptionCancelled()
+            return
+
+        for index in remaining:
+            if self.cancel_event.is_set():
+                raise TranscriptionCancelled()
+
+            chunk_options = dict(options)
+            if index > 0 and chunk_segments[index - 1] and 'initial_prompt' not in options:
+                # Carry the previous chunk's closing text so context flows across the cut
+                chunk_options['initial_prompt'] = "".join(seg["text"] for seg in chunk_segments[index - 1][-5:])
+
+            start, end, _ = chunks[index]
+            segments, language = transcribe_chunk(self.local_model, audio[start:end],
+                                                  start / WHISPER_SAMPLE_RATE, chunk_options)
+            yield index, segments, language
+
+    def _report(self, percent):
+        if self.on_progress:
+            self.on_progress(int(percent))
@@ -1,35 +1,137 @@
 import re
 
+FILLER_WORDS = ['um', 'uh', 'er', 'ah', 'like', 'you know']
+_PUNCTUATION = ',.!?'
+_SENTENCE_END = '.!?'
+
+_FILLER = r'(?i:\b(?:%s)\b)' % '|'.join(re.escape(word).replace(r'\ ', r'\s+') for word in FILLER_WORDS)
+# A run of words and symbols joined by single spaces that contains no filler or punctuation;
+# most of a transcript is covered by a handful of these per sentence
+_PIECE = rf'(?:(?!{_FILLER})\w+|[^\w\s{_PUNCTUATION}]+)'
+_TOKEN = re.compile(rf'({_FILLER})|([{_PUNCTUATION}])|(\s+)|({_PIECE}(?: ?{_PIECE})*)')
+_FILLER_TOKEN, _PUNCTUATION_TOKEN, _SPACE_TOKEN = 1, 2, 3
+_YOU_TAIL = re.compile(r'\byou\Z', re.IGNORECASE)
+
+class StreamingTranscriptCleaner:
+    """Incremental form of TranscriptCleaner.clean_transcript
+
+    Text is cleaned in one scan with a single compiled pattern, carrying
+    just enough state (the previous token and whether whitespace followed
+    it) to apply the spacing and capitalization rules across calls. The
+    concatenated output of feed() and flush() equals clean_transcript() of
+    the concatenated input.
+    """
+
+    def __init__(self):
+        self._pending = ""
+        self._previous = None  # None before any output, else the last punctuation mark or '' after text
+        self._space = False
+
+    def feed(self, text):
+        """Clean as much of text as can be decided now and return it"""
+        buffer = self._pending + text
+
+        # The last word may continue in the next piece, and "you" may be followed by "know"
+        cut = len(buffer)
+        while cut and not buffer[cut - 1].isspace():
+            cut -= 1
+        while cut and buffer[cut - 1].isspace():
+            cut -= 1
+        if _YOU_TAIL.search(buffer[max(0, cut - 4):cut]):
+            cut -= 3
+
+        self._pending = buffer[cut:]
+        return self._clean(buffer[:cut])
+
+    def flush(self):
+        """Clean whatever is still held back; call once the input has ended"""
+        text, self._pending = self._pending, ""
+        return self._clean(text)
+
+    def _clean(self, text):
+        output = []
+        previous, space = self._previous, self._space
+        for match in _TOKEN.finditer(text):
+            kind = match.lastindex
+            if kind == _FILLER_TOKEN:
+                continue
+            if kind == _SPACE_TOKEN:
+                space = True
+                continue
+
+            token = match.group()
+            if kind == _PUNCTUATION_TOKEN:
+                # Punctuation sticks to the preceding word and is followed by one space
+                if previous:
+                    output.append(' ')
+                output.append(token)
+                previous = token
+            else:
+                if previous is None:
+                    capitalize = not space
+                elif previous:
+                    output.append(' ')
+                    capitalize = previous in _SENTENCE_END
+                else:
+                    if space:
+                        output.append(' ')
+                    capitalize = False
+                if capitalize and 'a' <= token[0] <= 'z':
+                    token = token[0].upper() + token[1:]
+                output.append(token)
+                previous = ''
+            space = False
+
+        self._previous, self._space = previous, space
+        return "".join(output)
+
 class TranscriptCleaner:
     @staticmethod
     def clean_transcript(text):
-        """Clean and format transcript text"""
+        """Clean and format transcript text
+
+        Collapses whitespace, removes filler words, attaches punctuation to
+        the preceding word with a single space after it and capitalizes the
+        first letter of each sentence, in a single pass over the text.
+        """
         if not text:
             return ""
 
-        # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text)
+        cleaner = StreamingTranscriptCleaner()
+        return cleaner.feed(text) + cleaner.flush()
 
-        # Remove common filler words (optional)
-        filler_words = ['um', 'uh', 'er', 'ah', 'like', 'you know']
-        for filler in filler_words:
-            text = re.sub(rf'\b{filler}\b', '', text, flags=re.IGNORECASE)
-
-        # Clean up punctuation spacing
-        text = re.sub(r'\s+([,.!?])', r'\1', text)
-        text = re.sub(r'([,.!?])\s*', r'\1 ', text)
+    @staticmethod
+    def clean_segments(segments):
+        """Yield cleaned text for each Whisper segment (or string) as it arrives
 
-        # Capitalize first letter of sentences
-        text = re.sub(r'(^|[.!?]\s+)([a-z])', lambda m: m.group(1) + m.group(2).upper(), text)
+        Joining everything yielded gives the same result as cleaning the
+        joined segment text in one go, so this can run while transcription
+        is still streaming in.
+        """
+        cleaner = StreamingTranscriptCleaner()
+        for segment in segments:
+            text = segment if isinstance(segment, str) else segment["text"]
+            cleaned = cleaner.feed(text)
+            if cleaned:
+                yield cleaned
+        cleaned = cleaner.flush()
+        if cleaned:
+            yield cleaned
 
-        # Remove extra spaces
-        text = re.sub(r'\s+', ' ', text).strip()
+    @staticmethod
+    def add_timestamps(text, duration_seconds=None, segments=None):
+        """Add timestamps to transcript
 
-        return text
+        Uses the real segment times when Whisper segments are available,
+        otherwise spreads sentences evenly over duration_seconds.
+        """
+        if segments:
+            lines = []
+            for segment in segments:
+                timestamp = int(segment["start"])
+                lines.append(f"[{timestamp // 60:02d}:{timestamp % 60:02d}] {segment['text'].strip()}")
+            return "\n\n".join(lines)
 
-    @staticmethod
-    def add_timestamps(text, duration_seconds=None):
-        """Add approximate timestamps to transcript (basic implementation)"""
         if not text or not duration_seconds:
             return text
 
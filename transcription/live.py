@@ -0,0 +1,166 @@
+import queue
+import numpy as np
+from config.settings import Config
+from audio.resampler import WHISPER_SAMPLE_RATE
+from audio.vad import VoiceActivityDetector
+from .cache import transcription_cache
+from .whisper_client import WhisperTranscriber
+from .parallel import find_cut_points
+
+class LiveTranscriber(WhisperTranscriber):
+    """Transcribe audio in rolling windows while it is still being recorded
+
+    The recorder feeds 16 kHz float32 samples through feed(); run() blocks,
+    transcribing a window whenever enough audio has accumulated, and calls
+    on_segments with each batch of new segments. Windows end at a pause
+    where one is available so words are not split between windows. After
+    finish() is called, only the audio captured since the last window is
+    left to transcribe. Given the saved recording, the transcript is cached
+    under it, so opening the recording later doesn't transcribe it again.
+    """
+
+    def __init__(self, on_segments=None, on_lag=None):
+        # The model is loaded in run() so construction never blocks the caller
+        self.model_name = Config.WHISPER_MODEL
+        self.backend = Config.TRANSCRIPTION_BACKEND
+        self.local_model = None
+        self.on_segments = on_segments
+        self.on_lag = on_lag
+        self.window_samples = int(Config.LIVE_WINDOW_SECONDS * WHISPER_SAMPLE_RATE)
+        self.search_samples = int(Config.LIVE_CUT_SEARCH_SECONDS * WHISPER_SAMPLE_RATE)
+        self.segments = []
+        self.language = None
+        self.audio_filepath = None
+        self.lag_history = []
+        self._cache_key = None
+        self._queue = queue.Queue()
+        self._pending = []
+        self._pending_samples = 0
+        self._buffer_start = 0  # global sample offset of the untranscribed audio
+        self._captured = 0
+
+    def feed(self, samples):
+        """Queue newly captured samples (safe to call from the recording thread)"""
+        self._queue.put(samples)
+
+    def finish(self, audio_filepath=None):
+        """Signal that recording has stopped; run() returns after the final window
+
+        audio_filepath is the saved recording the transcript is cached under.
+        """
+        self.audio_filepath = audio_filepath
+        self._queue.put(None)
+
+    def run(self):
+        """Transcribe windows as audio arrives until finish() is called
+
+        Returns (transcript, transcript_filepath) like transcribe_audio.
+        """
+        self._load_local_model()
+        if not self.local_model:
+            return None, "Local Whisper model not loaded"
+
+        finished = False
+        while not finished:
+            finished = self._collect(self._queue.get())
+            # Drain everything that arrived while the last window was transcribing
+            while not finished:
+                try:
+                    finished = self._collect(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            while self._pending_samples >= self.window_samples:
+                self._transcribe_window(final=False)
+
+        if self._pending_samples:
+            self._transcribe_window(final=True)
+
+        stats = self.get_stats()
+        print(f"Live transcription: {stats['windows']} windows, "
+              f"mean lag {stats['mean_lag']:.1f}s, max lag {stats['max_lag']:.1f}s")
+
+        transcript = "".join(seg["text"] for seg in self.segments).strip()
+        if not transcript:
+            return None, "No speech transcribed"
+
+        self.segments = [self._segment_fields(seg) for seg in self.segments]
+        if self.audio_filepath:
+            # Same key as transcribe_audio, so reopening the recording hits the cache
+            try:
+                self._cache_key = transcription_cache.make_key(
+                    self.audio_filepath, self.model_name, Config.WHISPER_DECODE_OPTIONS, self.backend
+                )
+            except Exception as e:
+                print(f"Error reading recording for the transcription cache: {e}")
+        transcript_filepath = self._store_transcript(transcript, self.language, self.audio_filepath)
+        return transcript, transcript_filepath
+
+    def get_stats(self):
+        """Latency-behind-realtime metrics, in seconds"""
+        if not self.lag_history:
+            return {"windows": 0, "mean_lag": 0.0, "max_lag": 0.0, "final_lag": 0.0}
+        return {
+            "windows": len(self.lag_history),
+            "mean_lag": float(np.mean(self.lag_history)),
+            "max_lag": float(np.max(self.lag_history)),
+            "final_lag": self.lag_history[-1],
+        }
+
+    def _collect(self, samples):
+        if samples is None:
+            return True
+        self._pending.append(samples)
+        self._pending_samples += len(samples)
+        self._captured += len(samples)
+        return False
+
+    def _transcribe_window(self, final):
+        buffer = np.concatenate(self._pending) if len(self._pending) > 1 else self._pending[0]
+
+        cut = len(buffer)
+        if not final:
+            cut = self.window_samples
+            # Prefer the last pause near the end of the window
+            search_start = max(0, cut - self.search_samples)
+            pauses = find_cut_points(buffer[search_start:cut])
+            if len(pauses):
+                cut = search_start + int(pauses[-1])
+
+        window, rest = buffer[:cut], buffer[cut:]
+        offset = self._buffer_start / WHISPER_SAMPLE_RATE
+
+        # Skip windows with no speech rather than let Whisper hallucinate in them
+        new_segments = []
+        if VoiceActivityDetector().detect(window):
+            # Carry recent text as the prompt so context flows between windows
+            options = dict(Config.WHISPER_DECODE_OPTIONS)
+            previous_text = "".join(seg["text"] for seg in self.segments[-5:])
+            if previous_text:
+                options["initial_prompt"] = previous_text
+            result = self.local_model.transcribe(window, **options)
+            if self.language is None:
+                self.language = result.get("language")
+            new_segments = result["segments"]
+            for seg in new_segments:
+                seg["start"] += offset
+                seg["end"] += offset
+                seg["id"] = len(self.segments)
+                self.segments.append(seg)
+
+        self._pending = [rest] if len(rest) else []
+        self._pending_samples = len(rest)
+        self._buffer_start += cut
+
+        # Captured audio that is not transcribed yet, including what queued up meanwhile
+        lag = (self._captured + self._queued_samples() - self._buffer_start) / WHISPER_SAMPLE_RATE
+        self.lag_history.append(lag)
+
+        if new_segments and self.on_segments:
+            self.on_segments(new_segments)
+        if self.on_lag:
+            self.on_lag(lag)
+
+    def _queued_samples(self):
+        with self._queue.mutex:
+            return sum(len(item) for item in self._queue.queue if item is not None)
@@ -0,0 +1,167 @@
+import gc
+import threading
+import time
+from collections import OrderedDict
+from config.settings import Config
+from .backends import get_backend
+
+class WhisperModelCache:
+    """Process-wide registry of loaded Whisper models keyed by backend, model name and device
+
+    Models are loaded once and shared by every transcriber. Entries that sit
+    unused for longer than the idle timeout are unloaded, and the least
+    recently used models are evicted whenever the cache grows past its
+    memory cap.
+    """
+
+    def __init__(self, idle_timeout=None, max_bytes=None):
+        self.idle_timeout = idle_timeout if idle_timeout is not None else Config.MODEL_CACHE_IDLE_TIMEOUT
+        self.max_bytes = max_bytes if max_bytes is not None else Config.MODEL_CACHE_MAX_BYTES
+        self._models = OrderedDict()  # (backend, name, device) -> entry, least recently used first
+        self._key_locks = {}
+        self._lock = threading.Lock()
+        self._reaper = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_times = {}  # (backend, name, device) -> seconds spent loading
+
+    def get(self, model_name=None, device=None, backend=None):
+        """Return a loaded model, loading it on first use"""
+        key = self._make_key(model_name, device, backend)
+
+        with self._lock:
+            model = self._lookup(key)
+            if model is not None:
+                return model
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Only one thread loads a given model; others wait and then hit
+        with key_lock:
+            with self._lock:
+                model = self._lookup(key)
+                if model is not None:
+                    return model
+
+            backend, name, device = key
+            print(f"Loading Whisper model: {self._describe(key)}")
+            start_time = time.perf_counter()
+            model = get_backend(backend).load_model(name, device)
+            load_time = time.perf_counter() - start_time
+            print(f"Whisper model loaded in {load_time:.1f}s")
+
+            with self._lock:
+                self.misses += 1
+                self.load_times[key] = load_time
+                self._models[key] = {
+                    "model": model,
+                    "size": self._model_size(model),
+                    "last_used": time.monotonic(),
+                }
+                self._evict_over_cap()
+                self._start_reaper()
+
+            return model
+
+    def preload(self, model_name=None, device=None, backend=None):
+        """Start loading a model in a background thread"""
+        thread = threading.Thread(target=self._preload, args=(model_name, device, backend), daemon=True)
+        thread.start()
+        return thread
+
+    def evict_idle(self):
+        """Unload models that have not been used within the idle timeout"""
+        now = time.monotonic()
+        with self._lock:
+            idle = [key for key, entry in self._models.items()
+                    if now - entry["last_used"] > self.idle_timeout]
+            for key in idle:
+                self._evict(key)
+        if idle:
+            gc.collect()
+        return len(idle)
+
+    def clear(self):
+        """Unload every cached model"""
+        with self._lock:
+            for key in list(self._models):
+                self._evict(key)
+        gc.collect()
+
+    def get_stats(self):
+        """Return cache metrics"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "loaded_models": [self._describe(key) for key in self._models],
+                "cached_bytes": sum(entry["size"] for entry in self._models.values()),
+                "load_times": {self._describe(key): seconds
+                               for key, seconds in self.load_times.items()},
+            }
+
+    def _preload(self, model_name, device, backend):
+        try:
+            self.get(model_name, device, backend)
+        except Exception as e:
+            print(f"Error preloading Whisper model: {e}")
+
+    def _make_key(self, model_name, device, backend):
+        backend = get_backend(backend)
+        name = model_name or Config.WHISPER_MODEL
+        device = device or Config.WHISPER_DEVICE or backend.default_device()
+        return backend.name, name, device
+
+    def _lookup(self, key):
+        """Return a cached model and mark it used; caller holds the lock"""
+        entry = self._models.get(key)
+        if entry is None:
+            return None
+        self._models.move_to_end(key)
+        entry["last_used"] = time.monotonic()
+        self.hits += 1
+        return entry["model"]
+
+    def _evict(self, key):
+        del self._models[key]
+        self.evictions += 1
+        print(f"Unloaded Whisper model: {self._describe(key)}")
+
+    def _evict_over_cap(self):
+        # Always keep the most recently used model, even if it alone is over the cap
+        while len(self._models) > 1 and sum(e["size"] for e in self._models.values()) > self.max_bytes:
+            self._evict(next(iter(self._models)))
+
+    def _start_reaper(self):
+        if self._reaper and self._reaper.is_alive():
+            return
+        self._reaper = threading.Thread(target=self._reap, daemon=True)
+        self._reaper.start()
+
+    def _reap(self):
+        interval = max(1, min(60, self.idle_timeout / 4))
+        while True:
+            time.sleep(interval)
+            self.evict_idle()
+            with self._lock:
+                if not self._models:
+                    self._reaper = None
+                    return
+
+    @staticmethod
+    def _describe(key):
+        backend, name, device = key
+        return f"{name} ({backend}, {device})"
+
+    @staticmethod
+    def _model_size(model):
+        try:
+            return sum(p.numel() * p.element_size() for p in model.parameters())
+        except Exception:
+            return 0
+
+# Shared by every WhisperTranscriber in the process
+model_cache = WhisperModelCache()
@@ -0,0 +1,157 @@
+import os
+import multiprocessing
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import torch
+from config.settings import Config
+from audio.resampler import WHISPER_SAMPLE_RATE
+from audio.vad import VoiceActivityDetector
+
+# Worker processes don't import whisper_client, so silence the CPU FP16 warning here too
+warnings.filterwarnings("ignore", message="FP16 is not supported on CPU; using FP32 instead")
+
+# Model held by each pool worker process
+_worker_model = None
+
+def _init_worker(model_name, device, backend, num_threads):
+    """Load one model per worker process with a bounded torch thread count"""
+    global _worker_model
+    torch.set_num_threads(num_threads)
+    from transcription.model_cache import model_cache
+    _worker_model = model_cache.get(model_name, device, backend)
+
+def _transcribe_chunk(audio, offset, options):
+    return transcribe_chunk(_worker_model, audio, offset, options)
+
+def transcribe_chunk(model, audio, offset, options):
+    """Transcribe one chunk and shift its segments onto the global timeline"""
+    result = model.transcribe(audio, **options)
+    segments = result["segments"]
+    for seg in segments:
+        seg["start"] += offset
+        seg["end"] += offset
+        for word in seg.get("words") or []:
+            word["start"] += offset
+            word["end"] += offset
+    return segments, result.get("language")
+
+def find_cut_points(audio, sample_rate=WHISPER_SAMPLE_RATE):
+    """Sample positions in the middle of each pause between speech regions"""
+    regions = VoiceActivityDetector(sample_rate).detect(audio)
+    return np.array([(regions[i][1] + regions[i + 1][0]) // 2
+                     for i in range(len(regions) - 1)], dtype=np.int64)
+
+def plan_chunks(num_samples, cut_points, chunk_seconds=None, overlap_seconds=None,
+                sample_rate=WHISPER_SAMPLE_RATE):
+    """Split [0, num_samples) into chunks of roughly chunk_seconds
+
+    Chunks end at the cut point (pause) nearest the target length. When no
+    pause is available within a quarter chunk of the target, the chunk is
+    cut inside speech and the next one starts overlap_seconds earlier.
+
+    Returns a list of (start, end, keep_from) sample positions, where
+    keep_from marks the point before which the previous chunk's segments win.
+    """
+    chunk_samples = int((chunk_seconds or Config.PARALLEL_CHUNK_SECONDS) * sample_rate)
+    overlap = int((overlap_seconds if overlap_seconds is not None
+                   else Config.PARALLEL_CHUNK_OVERLAP_SECONDS) * sample_rate)
+    slack = chunk_samples // 4
+    cut_points = np.sort(np.asarray(cut_points, dtype=np.int64))
+
+    chunks = []
+    start = keep_from = 0
+    while num_samples - start > chunk_samples + slack:
+        target = start + chunk_samples
+        lo = np.searchsorted(cut_points, target - slack)
+        hi = np.searchsorted(cut_points, target + slack, side='right')
+        if hi > lo:
+            candidates = cut_points[lo:hi]
+            end = int(candidates[np.argmin(np.abs(candidates - target))])
+            chunks.append((start, end, keep_from))
+            start = keep_from = end
+        else:
+            end = target
+            chunks.append((start, end, keep_from))
+            start = end - overlap
+            keep_from = end - overlap // 2
+    chunks.append((start, num_samples, keep_from))
+    return chunks
+
+def stitch_segments(chunks, chunk_segments, sample_rate=WHISPER_SAMPLE_RATE):
+    """Merge per-chunk segments, resolving overlaps at the overlap midpoint
+
+    Each chunk keeps the segments whose midpoint falls in its own part of an
+    overlap. A chunk cut mid-speech has limits: if the two chunks time the
+    same words differently, one may put them just after the midpoint and
+    the other just before it. Neither keeps them, and a word is lost at the
+    join. Repeats are only dropped when both chunks produce identical text.
+    Cuts at pauses have no overlap and are not affected.
+    """
+    stitched = []
+    for index, (_, _, keep_from) in enumerate(chunks):
+        keep_until = chunks[index + 1][2] if index + 1 < len(chunks) else None
+        for seg in chunk_segments[index]:
+            middle = (seg["start"] + seg["end"]) / 2 * sample_rate
+            if middle < keep_from or (keep_until is not None and middle >= keep_until):
+                continue
+            # Both sides of an overlap can produce the same sentence
+            if stitched and seg["text"].strip().lower() == stitched[-1]["text"].strip().lower():
+                continue
+            stitched.append(seg)
+
+    for i, seg in enumerate(stitched):
+        seg["id"] = i
+    return stitched
+
+class ParallelTranscriber:
+    """Transcribe long audio as chunks spread across a process pool"""
+
+    def __init__(self, model_name=None, workers=None, device=None, backend=None):
+        self.model_name = model_name or Config.WHISPER_MODEL
+        self.backend = backend or Config.TRANSCRIPTION_BACKEND
+        self.workers = workers or Config.PARALLEL_WORKERS
+        self.device = device or Config.WHISPER_DEVICE or 'cpu'
+        self.threads_per_worker = max(1, (os.cpu_count() or 1) // self.workers)
+
+    def map_chunks(self, audio, chunks, **options):
+        """Yield (chunk_index, segments, language) as chunks finish, in any order"""
+        # Spawn rather than fork: forking a process with live torch threads can deadlock
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(chunks)), mp_context=context,
+                                 initializer=_init_worker,
+                                 initargs=(self.model_name, self.device, self.backend, self.threads_per_worker)) as pool:
+            futures = {
+                pool.submit(_transcribe_chunk, audio[start:end], start / WHISPER_SAMPLE_RATE, options): index
+                for index, (start, end, _) in enumerate(chunks)
+            }
+            try:
+                for future in as_completed(futures):
+                    segments, language = future.result()
+                    yield futures[future], segments, language
+            finally:
+                # If the caller stops early (e.g. cancellation), don't start chunks nobody will read
+                for future in futures:
+                    future.cancel()
+
+    def transcribe(self, audio, cut_points=None, **options):
+        """Transcribe a 16 kHz float32 array, returning a Whisper-style result dict"""
+        if cut_points is None:
+            cut_points = find_cut_points(audio)
+        chunks = plan_chunks(len(audio), cut_points)
+        print(f"Transcribing {len(chunks)} chunks with {min(self.workers, len(chunks))} workers "
+              f"({self.threads_per_worker} threads each)...")
+
+        chunk_segments = [None] * len(chunks)
+        language = None
+        for index, segments, chunk_language in self.map_chunks(audio, chunks, **options):
+            chunk_segments[index] = segments
+            if index == 0:
+                language = chunk_language
+
+        segments = stitch_segments(chunks, chunk_segments)
+        return {
+            "text": "".join(seg["text"] for seg in segments),
+            "segments": segments,
+            "language": language,
+        }
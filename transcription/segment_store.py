@@ -0,0 +1,105 @@
+import io
+import os
+import numpy as np
+from storage.atomic import atomic_write
+
+# Fixed-width record per segment; the text itself lives in a UTF-8 side file
+SEGMENT_DTYPE = np.dtype([
+    ("start", "<f8"),
+    ("end", "<f8"),
+    ("max_end", "<f8"),  # running maximum of end, so range lookups can binary search
+    ("avg_logprob", "<f4"),
+    ("no_speech_prob", "<f4"),
+    ("text_offset", "<u8"),
+    ("text_length", "<u4"),
+])
+
+def get_segments_path(transcript_filepath):
+    """Path of the segment record array stored next to a transcript"""
+    return os.path.splitext(transcript_filepath)[0] + '.segments.npy'
+
+def get_segment_text_path(transcript_filepath):
+    """Path of the segment text blob stored next to a transcript"""
+    return os.path.splitext(transcript_filepath)[0] + '.segments.txt'
+
+class SegmentStore:
+    """Random-access view of a transcript's Whisper segments
+
+    Segments are kept as a memory-mapped NumPy record array ordered by start
+    time, with byte offsets into a UTF-8 text file. Looking up a time range
+    is a binary search plus one contiguous read, regardless of transcript
+    length.
+    """
+
+    def __init__(self, transcript_filepath):
+        self.records = np.load(get_segments_path(transcript_filepath), mmap_mode='r')
+        self.text_path = get_segment_text_path(transcript_filepath)
+
+    @staticmethod
+    def exists(transcript_filepath):
+        return (os.path.exists(get_segments_path(transcript_filepath))
+                and os.path.exists(get_segment_text_path(transcript_filepath)))
+
+    @staticmethod
+    def write(transcript_filepath, segments):
+        """Persist segments (dicts with start, end, text and optional scores)"""
+        segments = sorted(segments, key=lambda seg: seg["start"])
+        encoded = [seg["text"].encode('utf-8') for seg in segments]
+
+        records = np.zeros(len(segments), dtype=SEGMENT_DTYPE)
+        records["start"] = [seg["start"] for seg in segments]
+        records["end"] = [seg["end"] for seg in segments]
+        records["max_end"] = np.maximum.accumulate(records["end"]) if len(segments) else []
+        records["avg_logprob"] = [seg.get("avg_logprob", 0.0) for seg in segments]
+        records["no_speech_prob"] = [seg.get("no_speech_prob", 0.0) for seg in segments]
+        lengths = np.array([len(text) for text in encoded], dtype=np.uint64)
+        records["text_length"] = lengths
+        records["text_offset"] = np.concatenate(([0], np.cumsum(lengths)[:-1])) if len(segments) else []
+
+        # Text first: the records file is what marks the pair as complete
+        atomic_write(get_segment_text_path(transcript_filepath), b''.join(encoded))
+        buffer = io.BytesIO()
+        np.save(buffer, records)
+        atomic_write(get_segments_path(transcript_filepath), buffer.getvalue())
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        return self._read(index, index + 1)[0]
+
+    def all(self):
+        return self._read(0, len(self.records))
+
+    def range(self, start_seconds, end_seconds):
+        """Segments overlapping [start_seconds, end_seconds)"""
+        lo = int(np.searchsorted(self.records["max_end"], start_seconds, side='right'))
+        hi = int(np.searchsorted(self.records["start"], end_seconds, side='left'))
+        return [seg for seg in self._read(lo, hi) if seg["end"] > start_seconds]
+
+    def text_between(self, start_seconds, end_seconds):
+        """Transcript text spoken between two times"""
+        return "".join(seg["text"] for seg in self.range(start_seconds, end_seconds)).strip()
+
+    def _read(self, lo, hi):
+        if hi <= lo:
+            return []
+
+        records = self.records[lo:hi]
+        first = int(records["text_offset"][0])
+        last = int(records["text_offset"][-1] + records["text_length"][-1])
+        with open(self.text_path, 'rb') as f:
+            f.seek(first)
+            blob = f.read(last - first)
+
+        segments = []
+        for record in records:
+            offset = int(record["text_offset"]) - first
+            segments.append({
+                "start": float(record["start"]),
+                "end": float(record["end"]),
+                "text": blob[offset:offset + int(record["text_length"])].decode('utf-8'),
+                "avg_logprob": float(record["avg_logprob"]),
+                "no_speech_prob": float(record["no_speech_prob"]),
+            })
+        return segments
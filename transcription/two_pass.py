@@ -0,0 +1,109 @@
+import difflib
+from config.settings import Config
+from audio.resampler import WHISPER_SAMPLE_RATE
+from .checkpoint import TranscriptionCancelled
+from .whisper_client import WhisperTranscriber
+
+def group_segments(segments, window_seconds):
+    """Group consecutive segments into windows spanning at most window_seconds
+
+    Returns (first_index, end_index) pairs; a single segment longer than the
+    window gets a window of its own.
+    """
+    windows = []
+    first = 0
+    for index in range(1, len(segments) + 1):
+        if index == len(segments) or segments[index]["end"] - segments[first]["start"] > window_seconds:
+            windows.append((first, index))
+            first = index
+    return windows
+
+def transcript_similarity(old_text, new_text):
+    """Word-level similarity ratio between two transcripts (1.0 means identical)"""
+    return difflib.SequenceMatcher(None, old_text.split(), new_text.split(), autojunk=False).ratio()
+
+class TwoPassTranscriber:
+    """Show a fast draft from a small model, then refine it with the configured model
+
+    The draft is transcribed with Config.DRAFT_WHISPER_MODEL. Refinement then
+    re-transcribes the audio behind each window of draft segments with the
+    configured model and swaps the refined segments in, so the transcript
+    improves progressively rather than all at once.
+    """
+
+    def __init__(self, draft_model=None, refine_model=None):
+        self.draft_transcriber = WhisperTranscriber(draft_model or Config.DRAFT_WHISPER_MODEL)
+        self.refine_transcriber = WhisperTranscriber(refine_model or Config.WHISPER_MODEL)
+        self.segments = []
+
+    def get_cached_refined(self, audio_filepath):
+        """Return the refined (transcript, filepath) if this audio was refined before"""
+        transcript, transcript_filepath = self.refine_transcriber.get_cached_transcript(audio_filepath)
+        if transcript:
+            self.segments = list(self.refine_transcriber.segments)
+        return transcript, transcript_filepath
+
+    def transcribe_draft(self, audio_filepath):
+        """Transcribe with the draft model, returning the draft transcript or None
+
+        The draft is only kept in memory until refine() replaces it; only the
+        refined transcript is saved and cached.
+        """
+        drafter = self.draft_transcriber
+        if not drafter.local_model:
+            return None
+
+        result = drafter._transcribe(audio_filepath)
+        self.segments = [drafter._segment_fields(seg) for seg in result["segments"]]
+        return result["text"].strip()
+
+    def refine(self, audio_filepath, on_update=None, cancel_event=None):
+        """Refine the draft window by window
+
+        on_update(transcript, windows_done, windows_total) is called after
+        each window with the partially refined transcript. Returns
+        (transcript, filepath) for the fully refined transcript. Raises
+        TranscriptionCancelled if cancel_event is set, checked between
+        windows.
+        """
+        refiner = self.refine_transcriber
+        if not refiner.local_model:
+            return None, "Local Whisper model not loaded"
+
+        audio, _ = refiner.load_audio(audio_filepath)
+        windows = group_segments(self.segments, Config.REFINE_WINDOW_SECONDS)
+        padding = Config.VAD_PADDING_MS / 1000
+
+        # Windows are refined in order, so earlier replacements shift later indices by a known amount
+        shift = 0
+        for done, (first, end) in enumerate(windows, 1):
+            if cancel_event is not None and cancel_event.is_set():
+                raise TranscriptionCancelled()
+
+            start_time = max(0.0, self.segments[first + shift]["start"] - padding)
+            end_time = self.segments[end - 1 + shift]["end"] + padding
+            window_audio = audio[int(start_time * WHISPER_SAMPLE_RATE):int(end_time * WHISPER_SAMPLE_RATE)]
+
+            result = refiner.local_model.transcribe(window_audio, **Config.WHISPER_DECODE_OPTIONS)
+            refined = []
+            for seg in result["segments"]:
+                seg["start"] += start_time
+                seg["end"] += start_time
+                refined.append(refiner._segment_fields(seg))
+
+            self.segments[first + shift:end + shift] = refined
+            shift += len(refined) - (end - first)
+
+            if on_update:
+                on_update(self._text(), done, len(windows))
+
+        for i, seg in enumerate(self.segments):
+            seg["id"] = i
+
+        transcript = self._text()
+        refiner.segments = self.segments
+        transcript_filepath = refiner._store_transcript(transcript, audio_filepath=audio_filepath)
+        return transcript, transcript_filepath
+
+    def _text(self):
+        return "".join(seg["text"] for seg in self.segments).strip()
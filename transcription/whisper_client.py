@@ -1,38 +1,52 @@
 import whisper
 import warnings
-from datetime import datetime
+import os
+import time
 from config.settings import Config
+from storage.atomic import write_new_file
+from audio.utils import load_analysis_audio, remove_analysis_audio
+from audio.resampler import WHISPER_SAMPLE_RATE
+from audio.vad import VoiceActivityDetector
+from .cache import transcription_cache
+from .model_cache import model_cache
+from .parallel import ParallelTranscriber
+from .segment_store import SegmentStore
 
 # Suppress the FP16 warning for CPU usage
 warnings.filterwarnings("ignore", message="FP16 is not supported on CPU; using FP32 instead")
 
 class WhisperTranscriber:
-    def __init__(self):
+    def __init__(self, model_name=None, backend=None):
+        self.model_name = model_name or Config.WHISPER_MODEL
+        self.backend = backend or Config.TRANSCRIPTION_BACKEND
         self.local_model = None
+        self.segments = []
+        self._cache_key = None
         self._load_local_model()
 
     def _load_local_model(self):
-        """Load local Whisper model"""
+        """Load local Whisper model (shared through the process-wide model cache)"""
         try:
-            print(f"Loading Whisper model: {Config.WHISPER_MODEL}")
-            self.local_model = whisper.load_model(Config.WHISPER_MODEL)
-            print("Whisper model loaded successfully")
+            self.local_model = model_cache.get(self.model_name, backend=self.backend)
         except Exception as e:
             print(f"Error loading Whisper model: {e}")
             self.local_model = None
 
     def transcribe_audio(self, audio_filepath):
         """Transcribe audio file to text using local Whisper model"""
+        # Identical audio with identical settings always gives the same result
+        transcript, transcript_filepath = self.get_cached_transcript(audio_filepath)
+        if transcript:
+            return transcript, transcript_filepath
+
         if not self.local_model:
             return None, "Local Whisper model not loaded"
 
         try:
-            print("Transcribing audio with local Whisper model...")
-            result = self.local_model.transcribe(audio_filepath)
+            result = self._transcribe(audio_filepath)
+            self.segments = [self._segment_fields(seg) for seg in result["segments"]]
             transcript = result["text"].strip()
-
-            # Save transcript to file
-            transcript_filepath = self._save_transcript(transcript)
+            transcript_filepath = self._store_transcript(transcript, result.get("language"), audio_filepath)
 
             return transcript, transcript_filepath
         except Exception as e:
@@ -40,17 +54,142 @@ class WhisperTranscriber:
             print(error_msg)
             return None, error_msg
 
+    def _transcribe(self, audio_filepath):
+        """Run the model over an audio file, returning Whisper's result with segment times in the original audio"""
+        print("Transcribing audio with local Whisper model...")
+        start_time = time.perf_counter()
+
+        # Without VAD or chunking, other files can go to Whisper by path
+        audio = load_analysis_audio(audio_filepath)
+        source = "analysis stream" if audio is not None else "FFmpeg decode"
+        if audio is None and (Config.VAD_ENABLED or Config.PARALLEL_WORKERS > 1):
+            audio = whisper.load_audio(audio_filepath)
+
+        time_map = None
+        if audio is not None and Config.VAD_ENABLED:
+            audio, time_map = self._strip_silence(audio)
+
+        if self._use_parallel(audio):
+            # Region joins in silence-stripped audio are natural cut points
+            cut_points = time_map.compact_starts[1:] if time_map else None
+            result = ParallelTranscriber(model_name=self.model_name, backend=self.backend).transcribe(
+                audio, cut_points=cut_points, **Config.WHISPER_DECODE_OPTIONS
+            )
+        else:
+            result = self.local_model.transcribe(
+                audio if audio is not None else audio_filepath, **Config.WHISPER_DECODE_OPTIONS
+            )
+        if time_map:
+            time_map.map_segments(result["segments"])
+
+        elapsed = time.perf_counter() - start_time
+        print(f"Transcription finished in {elapsed:.1f}s (input: {source})")
+        if time_map:
+            speedup = time_map.original_duration / max(time_map.speech_duration, 1e-6)
+            print(f"VAD skipped {time_map.skipped_fraction:.1%} of the audio "
+                  f"(~{speedup:.2f}x less audio for Whisper)")
+
+        return result
+
+    def get_cached_transcript(self, audio_filepath):
+        """Return (transcript, transcript_filepath) from the cache, or (None, None)"""
+        self._cache_key = None
+        try:
+            self._cache_key = transcription_cache.make_key(
+                audio_filepath, self.model_name, Config.WHISPER_DECODE_OPTIONS, self.backend
+            )
+            cached = transcription_cache.get(self._cache_key)
+        except Exception as e:
+            print(f"Error reading transcription cache: {e}")
+            cached = None
+
+        if not cached:
+            return None, None
+
+        print("Using cached transcript")
+        self.segments = cached["segments"]
+        transcript_filepath = cached.get("transcript_file")
+        if not transcript_filepath or not os.path.exists(transcript_filepath):
+            transcript_filepath = self._save_transcript(cached["text"])
+        if transcript_filepath and not SegmentStore.exists(transcript_filepath):
+            self._save_segments(transcript_filepath)
+        return cached["text"], transcript_filepath
+
+    def load_audio(self, audio_filepath):
+        """Load audio as 16 kHz float32, returning (audio, source description)"""
+        # Recordings made by the app carry a 16 kHz analysis stream that
+        # Whisper accepts as-is; anything else is decoded by FFmpeg
+        audio = load_analysis_audio(audio_filepath)
+        if audio is not None:
+            return audio, "analysis stream"
+        return whisper.load_audio(audio_filepath), "FFmpeg decode"
+
+    def _store_transcript(self, transcript, language=None, audio_filepath=None):
+        """Save the transcript, its segments and a cache entry; returns the transcript path
+
+        The analysis stream of audio_filepath is only read to transcribe it,
+        so it is deleted once the transcript is saved.
+        """
+        transcript_filepath = self._save_transcript(transcript)
+        if transcript_filepath:
+            self._save_segments(transcript_filepath)
+            if audio_filepath:
+                remove_analysis_audio(audio_filepath)
+
+        if self._cache_key:
+            transcription_cache.put(self._cache_key, {
+                "text": transcript,
+                "segments": self.segments,
+                "language": language,
+                "transcript_file": transcript_filepath,
+            })
+            stats = transcription_cache.get_stats()
+            print(f"Transcription cache: {stats['hits']} hits, {stats['misses']} misses")
+
+        return transcript_filepath
+
+    @staticmethod
+    def _segment_fields(segment):
+        """Keep the parts of a Whisper segment worth storing"""
+        return {
+            "id": segment["id"],
+            "start": float(segment["start"]),
+            "end": float(segment["end"]),
+            "text": segment["text"],
+            "avg_logprob": float(segment.get("avg_logprob", 0.0)),
+            "no_speech_prob": float(segment.get("no_speech_prob", 0.0)),
+        }
+
+    def _use_parallel(self, audio):
+        """Whether audio is long enough to be split across the process pool"""
+        return (Config.PARALLEL_WORKERS > 1 and audio is not None
+                and len(audio) >= Config.PARALLEL_MIN_SECONDS * WHISPER_SAMPLE_RATE)
+
+    def _strip_silence(self, audio):
+        """Remove non-speech regions, returning the audio and a TimeMap back to the original"""
+        speech_audio, time_map = VoiceActivityDetector().strip_silence(audio)
+        if len(speech_audio) == 0:
+            # Better to let Whisper see everything than to drop a quiet speaker
+            print("VAD found no speech, transcribing the full recording")
+            return audio, None
+
+        print(f"VAD kept {time_map.speech_duration:.0f}s of speech "
+              f"out of {time_map.original_duration:.0f}s")
+        return speech_audio, time_map
+
     def _save_transcript(self, transcript):
         """Save transcript to text file"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"transcript_{timestamp}.txt"
-        filepath = f"{Config.TRANSCRIPT_DIR}/{filename}"
-
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(transcript)
+            filepath = write_new_file(Config.TRANSCRIPT_DIR, "transcript", ".txt", transcript)
             print(f"Transcript saved to: {filepath}")
             return filepath
         except Exception as e:
             print(f"Error saving transcript: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    def _save_segments(self, transcript_filepath):
+        """Save timed segments next to the transcript for range lookups"""
+        try:
+            SegmentStore.write(transcript_filepath, self.segments)
+        except Exception as e:
+            print(f"Error saving transcript segments: {e}")
\ No newline at end of file
@@ -1,38 +1,54 @@
 import sys
 import os
+import threading
 from PyQt5.QtWidgets import (QMainWindow, QVBoxLayout, QHBoxLayout, QWidget,
                              QPushButton, QTextEdit, QLabel, QFileDialog,
                              QMessageBox, QProgressBar, QSplitter, QFrame, QStatusBar)
-from PyQt5.QtCore import QThread, pyqtSignal, Qt
-from PyQt5.QtGui import QFont, QPalette
+from PyQt5.QtCore import QThread, QTimer, pyqtSignal, Qt
+from PyQt5.QtGui import QFont, QPalette, QTextCursor
 
 # Add parent directory to path to import modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from audio.recorder import AudioRecorder
-from transcription.whisper_client import WhisperTranscriber
-from transcription.cleaner import TranscriptCleaner
+from transcription.checkpoint import CheckpointedTranscriber, TranscriptionCancelled, list_unfinished_jobs
+from transcription.live import LiveTranscriber
+from transcription.two_pass import TwoPassTranscriber, transcript_similarity
+from transcription.cleaner import TranscriptCleaner, StreamingTranscriptCleaner
 from summarization.summarizer import MeetingSummarizer
+from summarization.openai_summarizer import SummaryCancelled
 from storage.file_manager import FileManager
 from storage.db import MeetingDatabase
 from config.settings import Config
 
 class TranscriptionWorkerThread(QThread):
     """Worker thread for processing audio transcription only"""
+    transcript_saved = pyqtSignal(str, list)  # transcript file, segments
     finished = pyqtSignal(str)  # transcript only
     error = pyqtSignal(str)
     progress = pyqtSignal(str)
+    percent = pyqtSignal(int)
 
     def __init__(self, audio_file):
         super().__init__()
         self.audio_file = audio_file
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        """Stop after the current chunk; finished chunks are resumed next time"""
+        self.cancel_event.set()
 
     def run(self):
         try:
             # Transcribe audio
             self.progress.emit("Transcribing audio...")
-            transcriber = WhisperTranscriber()
-            transcript, transcript_file = transcriber.transcribe_audio(self.audio_file)
+            transcriber = CheckpointedTranscriber(cancel_event=self.cancel_event,
+                                                  on_progress=self.percent.emit)
+            try:
+                transcript, transcript_file = transcriber.transcribe_audio(self.audio_file)
+            except TranscriptionCancelled:
+                self.progress.emit("Transcription paused")
+                return
 
             if not transcript:
                 self.error.emit("Failed to transcribe audio")
@@ -43,26 +59,172 @@ class TranscriptionWorkerThread(QThread):
             cleaned_transcript = cleaner.clean_transcript(transcript)
 
             self.finished.emit(cleaned_transcript)
+            self.transcript_saved.emit(transcript_file or "", transcriber.segments)
 
         except Exception as e:
             self.error.emit(f"Error processing audio: {str(e)}")
 
+class TwoPassTranscriptionWorkerThread(QThread):
+    """Worker thread that shows a fast draft transcript, then refines it"""
+    draft_ready = pyqtSignal(str)  # cleaned draft transcript
+    transcript_updated = pyqtSignal(str)  # partially refined transcript
+    transcript_saved = pyqtSignal(str, list)  # refined transcript file, segments
+    finished = pyqtSignal(str)  # fully refined transcript
+    error = pyqtSignal(str)
+    progress = pyqtSignal(str)
+
+    def __init__(self, audio_file):
+        super().__init__()
+        self.audio_file = audio_file
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        """Stop refining after the current window"""
+        self.cancel_event.set()
+
+    def run(self):
+        try:
+            cleaner = TranscriptCleaner()
+            transcriber = TwoPassTranscriber()
+
+            # Audio that has been refined before needs no draft
+            transcript, transcript_file = transcriber.get_cached_refined(self.audio_file)
+            if transcript:
+                self.finished.emit(cleaner.clean_transcript(transcript))
+                self.transcript_saved.emit(transcript_file or "", transcriber.segments)
+                return
+
+            self.progress.emit(f"Transcribing draft with Whisper-{Config.DRAFT_WHISPER_MODEL}...")
+            draft = transcriber.transcribe_draft(self.audio_file)
+            if not draft:
+                self.error.emit("Failed to transcribe audio")
+                return
+            self.draft_ready.emit(cleaner.clean_transcript(draft))
+
+            def on_update(text, done, total):
+                self.transcript_updated.emit(cleaner.clean_transcript(text))
+                self.progress.emit(f"Refining with Whisper-{Config.WHISPER_MODEL} ({done}/{total})...")
+
+            self.progress.emit(f"Refining with Whisper-{Config.WHISPER_MODEL}...")
+            try:
+                transcript, transcript_file = transcriber.refine(self.audio_file, on_update=on_update,
+                                                                 cancel_event=self.cancel_event)
+            except TranscriptionCancelled:
+                self.progress.emit("Refinement cancelled")
+                return
+            if not transcript:
+                self.error.emit("Failed to refine transcript")
+                return
+
+            self.finished.emit(cleaner.clean_transcript(transcript))
+            self.transcript_saved.emit(transcript_file or "", transcriber.segments)
+
+        except Exception as e:
+            self.error.emit(f"Error processing audio: {str(e)}")
+
+class LiveTranscriptionWorkerThread(QThread):
+    """Worker thread that transcribes audio while it is still being recorded"""
+    segments_ready = pyqtSignal(str)  # cleaned text of newly transcribed segments
+    lag_updated = pyqtSignal(float)  # seconds behind realtime
+    transcript_saved = pyqtSignal(str, list)  # transcript file, segments
+    finished = pyqtSignal(str)  # full cleaned transcript
+    error = pyqtSignal(str)
+    progress = pyqtSignal(str)
+
+    def __init__(self):
+        super().__init__()
+        self.cleaner = StreamingTranscriptCleaner()
+        self.transcriber = LiveTranscriber(on_segments=self.on_segments, on_lag=self.lag_updated.emit)
+
+    def on_segments(self, segments):
+        # Clean as segments arrive, so the live text already looks like the final transcript
+        text = self.cleaner.feed("".join(seg["text"] for seg in segments))
+        if text:
+            self.segments_ready.emit(text)
+
+    def feed(self, samples):
+        """Recorder listener; called from the recording thread"""
+        self.transcriber.feed(samples)
+
+    def finish(self, audio_file=None):
+        """Transcribe what is left once recording has stopped; audio_file is the saved recording"""
+        self.transcriber.finish(audio_file)
+
+    def run(self):
+        try:
+            self.progress.emit("Live transcription running...")
+            transcript, transcript_file = self.transcriber.run()
+
+            if not transcript:
+                self.error.emit("Failed to transcribe audio")
+                return
+
+            # Clean transcript
+            cleaner = TranscriptCleaner()
+            cleaned_transcript = cleaner.clean_transcript(transcript)
+
+            self.finished.emit(cleaned_transcript)
+            self.transcript_saved.emit(transcript_file or "", self.transcriber.segments)
+
+        except Exception as e:
+            self.error.emit(f"Error during live transcription: {str(e)}")
+
+class CleanTranscriptWorkerThread(QThread):
+    """Worker thread for cleaning a transcript off the UI thread"""
+    finished = pyqtSignal(str)
+    error = pyqtSignal(str)
+
+    def __init__(self, transcript):
+        super().__init__()
+        self.transcript = transcript
+
+    def run(self):
+        try:
+            self.finished.emit(TranscriptCleaner.clean_transcript(self.transcript))
+        except Exception as e:
+            self.error.emit(f"Error cleaning transcript: {str(e)}")
+
 class SummarizationWorkerThread(QThread):
     """Worker thread for generating summary from transcript"""
     finished = pyqtSignal(str)  # summary only
+    delta = pyqtSignal(str)  # streamed summary text as it arrives
+    replaced = pyqtSignal(str, str)  # OpenAI summary and its file, arriving after the local one was shown
+    cancelled = pyqtSignal()
     error = pyqtSignal(str)
     progress = pyqtSignal(str)
 
-    def __init__(self, transcript):
+    def __init__(self, transcript, meeting_id=None):
         super().__init__()
         self.transcript = transcript
+        self.meeting_id = meeting_id  # meeting the transcript was saved as, if any
+        self.cancel_event = threading.Event()
+        self.source = None  # "api" or "local", whichever summary was shown
+        self.api_pending = False  # a late OpenAI summary may still replace a local one
+        self.summary_file = None
+
+    def cancel(self):
+        """Stop streaming the summary, including an OpenAI request still running in the background"""
+        self.cancel_event.set()
+
+    def on_replace(self, summary, summary_file):
+        self.replaced.emit(summary, summary_file or "")
 
     def run(self):
         try:
             # Generate summary
             self.progress.emit("Generating summary...")
             summarizer = MeetingSummarizer()
-            summary, summary_file = summarizer.summarize_transcript(self.transcript)
+            try:
+                summary, summary_file = summarizer.summarize_transcript(
+                    self.transcript, on_delta=self.delta.emit, cancel_event=self.cancel_event,
+                    on_replace=self.on_replace
+                )
+            except SummaryCancelled:
+                self.cancelled.emit()
+                return
+            self.source = summarizer.report.get("winner")
+            self.api_pending = summarizer.report.get("api_pending", False)
+            self.summary_file = summary_file
 
             if not summary:
                 self.error.emit("Failed to generate summary")
@@ -80,13 +242,24 @@ class MeetingAssistantWindow(QMainWindow):
         self.file_manager = FileManager()
         self.db = MeetingDatabase()
         self.transcription_worker = None
+        self.live_transcription_worker = None
         self.summarization_worker = None
+        self.clean_worker = None
         self.current_transcript = ""
         self.current_summary = ""
+        self.current_audio_file = None
+        self.current_meeting_id = None  # database record of the current transcript, once saved
+        self.refining = False  # a draft transcript is being refined
+        self.summarizing = False
+        self.summary_transcript = ""  # transcript the current summary was generated from
+        self.summary_from_draft = False
 
         self.init_ui()
         self.setup_style()
 
+        # Ask once the window is showing
+        QTimer.singleShot(0, self.offer_resume)
+
     def init_ui(self):
         """Initialize the user interface"""
         self.setWindowTitle("Meeting Recorder")
@@ -117,7 +290,7 @@ class MeetingAssistantWindow(QMainWindow):
         self.generate_summary_button = QPushButton("Generate Summary")
         self.generate_summary_button.setMinimumHeight(40)
         self.generate_summary_button.setMinimumWidth(140)
-        self.generate_summary_button.clicked.connect(self.generate_summary)
+        self.generate_summary_button.clicked.connect(self.toggle_summary)
         self.generate_summary_button.setEnabled(False)
         self.generate_summary_button.setStyleSheet("background-color: #dc3545; color: white;")
         top_controls_layout.addWidget(self.generate_summary_button)
@@ -240,6 +413,9 @@ class MeetingAssistantWindow(QMainWindow):
                 self.save_summary_button.setEnabled(False)
                 self.clean_transcript_button.setEnabled(False)
                 self.generate_summary_button.setEnabled(False)
+
+                if Config.LIVE_TRANSCRIPTION:
+                    self.start_live_transcription()
             else:
                 QMessageBox.warning(self, "Error", "Failed to start recording")
         else:
@@ -249,24 +425,157 @@ class MeetingAssistantWindow(QMainWindow):
             self.record_button.setStyleSheet("")
             self.status_bar.showMessage("Recording stopped")
 
-            if audio_file:
+            if self.live_transcription_worker:
+                # Most of the audio is already transcribed; only the last window remains
+                self.current_audio_file = audio_file
+                self.finish_live_transcription()
+                if not audio_file:
+                    QMessageBox.warning(self, "Error", "Failed to save recording")
+            elif audio_file:
                 # Start processing in worker thread
                 self.start_processing(audio_file)
             else:
                 QMessageBox.warning(self, "Error", "Failed to save recording")
                 self.status_bar.showMessage("Recording stopped")
 
+    def start_live_transcription(self):
+        """Transcribe the recording in rolling windows while it is captured"""
+        self.current_audio_file = None
+        self.current_meeting_id = None
+        self.live_transcription_worker = LiveTranscriptionWorkerThread()
+        self.live_transcription_worker.segments_ready.connect(self.on_live_segments)
+        self.live_transcription_worker.transcript_saved.connect(self.on_transcript_saved)
+        self.live_transcription_worker.lag_updated.connect(self.on_live_lag)
+        self.live_transcription_worker.finished.connect(self.on_transcription_finished)
+        self.live_transcription_worker.error.connect(self.on_transcription_error)
+        self.live_transcription_worker.progress.connect(self.on_progress_update)
+        self.recorder.add_listener(self.live_transcription_worker.feed)
+        self.live_transcription_worker.start()
+
+    def finish_live_transcription(self):
+        """Stop feeding the live transcriber and wait for its final window"""
+        self.recorder.remove_listener(self.live_transcription_worker.feed)
+        self.live_transcription_worker.finish(self.current_audio_file)
+        # Keep a reference to the running thread until it finishes
+        self.transcription_worker = self.live_transcription_worker
+        self.live_transcription_worker = None
+
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setRange(0, 0)  # Indeterminate progress
+        self.transcription_status.setText("Transcribing final window...")
+
+    def on_live_segments(self, text):
+        """Append partial transcript text as it arrives"""
+        self.transcript_text.moveCursor(QTextCursor.End)
+        self.transcript_text.insertPlainText(text)
+
+    def on_live_lag(self, lag_seconds):
+        """Show how far live transcription is behind the recording"""
+        self.transcription_status.setText(f"Live transcription {lag_seconds:.1f}s behind")
+
     def start_processing(self, audio_file):
         """Start transcription in worker thread"""
         self.progress_bar.setVisible(True)
         self.progress_bar.setRange(0, 0)  # Indeterminate progress
-
-        self.transcription_worker = TranscriptionWorkerThread(audio_file)
-        self.transcription_worker.finished.connect(self.on_transcription_finished)
+        self.current_audio_file = audio_file
+        self.current_meeting_id = None
+
+        if Config.TWO_PASS_TRANSCRIPTION and Config.DRAFT_WHISPER_MODEL != Config.WHISPER_MODEL:
+            self.transcription_worker = TwoPassTranscriptionWorkerThread(audio_file)
+            self.transcription_worker.draft_ready.connect(self.on_draft_ready)
+            self.transcription_worker.transcript_updated.connect(self.on_transcript_updated)
+            self.transcription_worker.finished.connect(self.on_refinement_finished)
+        else:
+            self.transcription_worker = TranscriptionWorkerThread(audio_file)
+            self.transcription_worker.finished.connect(self.on_transcription_finished)
+            self.transcription_worker.percent.connect(self.on_transcription_percent)
+        self.transcription_worker.transcript_saved.connect(self.on_transcript_saved)
         self.transcription_worker.error.connect(self.on_transcription_error)
         self.transcription_worker.progress.connect(self.on_progress_update)
         self.transcription_worker.start()
 
+    def on_transcript_saved(self, transcript_file, segments):
+        """Record the meeting, index its transcript segments for search and point out related meetings"""
+        # A cached transcript comes back with the same file, so the meeting may already exist
+        meeting = self.db.get_meeting_by_transcript(transcript_file) if transcript_file else None
+        if meeting:
+            self.current_meeting_id = meeting["id"]
+            if segments:
+                self.db.index_transcript(self.current_meeting_id, segments)
+        else:
+            duration = segments[-1]["end"] if segments else None
+            self.current_meeting_id = self.db.add_meeting(
+                self.current_audio_file, transcript_file or None, None, duration, segments=segments
+            )
+
+        related = self.db.related_meetings(self.current_meeting_id, k=3)
+        if related:
+            self.status_bar.showMessage("Related meetings: " + ", ".join(meeting["title"] for meeting in related))
+
+    def on_transcription_percent(self, percent):
+        """Switch the progress bar to a real percentage once chunk progress is known"""
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setValue(percent)
+
+    def offer_resume(self):
+        """Offer to finish a transcription that was interrupted last time"""
+        jobs = list_unfinished_jobs()
+        if not jobs:
+            return
+
+        job = jobs[0]
+        reply = QMessageBox.question(
+            self, "Resume Transcription",
+            f"Transcription of {os.path.basename(job['audio_file'])} was interrupted "
+            f"({job['chunks_done']} of {len(job['chunks'])} parts done).\n\nResume it now?",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply == QMessageBox.Yes:
+            self.start_processing(job['audio_file'])
+
+    def on_draft_ready(self, transcript):
+        """Show the draft transcript while the refined one is produced"""
+        self.on_transcription_finished(transcript)
+        self.refining = True
+
+        # Keep showing progress; cleaning waits for the refined text
+        self.progress_bar.setVisible(True)
+        self.clean_transcript_button.setEnabled(False)
+        self.transcription_status.setText(f"Draft from Whisper-{Config.DRAFT_WHISPER_MODEL}, refining...")
+
+    def on_transcript_updated(self, transcript):
+        """Replace the draft with partially refined text, keeping the scroll position"""
+        scroll_bar = self.transcript_text.verticalScrollBar()
+        position = scroll_bar.value()
+        self.current_transcript = transcript
+        self.transcript_text.setText(transcript)
+        scroll_bar.setValue(position)
+
+    def on_refinement_finished(self, transcript):
+        """Handle the fully refined transcript"""
+        if not self.refining:
+            # Refined result came straight from the cache
+            self.on_transcription_finished(transcript)
+            return
+
+        self.refining = False
+        self.on_transcript_updated(transcript)
+        self.progress_bar.setVisible(self.summarizing)
+        self.clean_transcript_button.setEnabled(True)
+        self.transcription_status.setText(f"Transcribed with Whisper-{Config.WHISPER_MODEL} (local)")
+        self.resummarize_if_changed()
+
+    def resummarize_if_changed(self):
+        """Regenerate a summary made from the draft if refinement changed the text substantially"""
+        if self.refining or self.summarizing or not self.summary_from_draft:
+            return
+
+        self.summary_from_draft = False
+        similarity = transcript_similarity(self.summary_transcript, self.current_transcript)
+        if similarity < Config.RESUMMARIZE_SIMILARITY_THRESHOLD:
+            print(f"Refined transcript is {similarity:.0%} similar to the draft, regenerating summary")
+            self.generate_summary()
+
     def on_transcription_finished(self, transcript):
         """Handle completed transcription"""
         self.current_transcript = transcript
@@ -287,43 +596,111 @@ class MeetingAssistantWindow(QMainWindow):
 
     def on_transcription_error(self, error_message):
         """Handle transcription errors"""
+        self.refining = False
         self.progress_bar.setVisible(False)
         self.status_bar.showMessage("Recording stopped")
         self.transcription_status.setText("Error")
         QMessageBox.critical(self, "Transcription Error", error_message)
 
+    def toggle_summary(self):
+        """Generate a summary, or stop the one being streamed"""
+        if self.summarizing:
+            self.summarization_worker.cancel()
+            self.generate_summary_button.setEnabled(False)
+        else:
+            self.generate_summary()
+
     def generate_summary(self):
         """Generate summary from current transcript"""
         if not self.current_transcript:
             QMessageBox.warning(self, "Warning", "No transcript available to summarize")
             return
 
+        # Summarize what is on screen, including any edits made by hand
+        edited = self.transcript_text.toPlainText()
+        if edited.strip() and not self.refining:
+            self.current_transcript = edited
+
         self.progress_bar.setVisible(True)
         self.progress_bar.setRange(0, 0)  # Indeterminate progress
-        self.generate_summary_button.setEnabled(False)
+        self.generate_summary_button.setText("Stop Summary")
+        self.save_summary_button.setEnabled(False)
 
-        self.summarization_worker = SummarizationWorkerThread(self.current_transcript)
+        # A previous worker may still be returning from run(), or waiting on a late OpenAI summary
+        if self.summarization_worker:
+            self.summarization_worker.cancel()
+            self.summarization_worker.wait()
+
+        self.summarizing = True
+        self.summary_transcript = self.current_transcript
+        self.summary_from_draft = self.refining
+        self.summary_text.clear()
+
+        self.summarization_worker = SummarizationWorkerThread(self.current_transcript, self.current_meeting_id)
         self.summarization_worker.finished.connect(self.on_summarization_finished)
+        self.summarization_worker.delta.connect(self.on_summary_delta)
+        self.summarization_worker.replaced.connect(self.on_summary_replaced)
+        self.summarization_worker.cancelled.connect(self.on_summarization_cancelled)
         self.summarization_worker.error.connect(self.on_summarization_error)
         self.summarization_worker.progress.connect(self.on_progress_update)
         self.summarization_worker.start()
 
+    def on_summary_delta(self, text):
+        """Append streamed summary text as it arrives"""
+        self.summary_text.moveCursor(QTextCursor.End)
+        self.summary_text.insertPlainText(text)
+
     def on_summarization_finished(self, summary):
         """Handle completed summarization"""
         self.current_summary = summary
         self.summary_text.setText(summary)
-
-        self.progress_bar.setVisible(False)
-        self.transcription_status.setText(f"Summary generated with {Config.OPENAI_MODEL}")
+        self.summarizing = False
+        if self.summarization_worker.meeting_id:
+            self.db.set_summary(self.summarization_worker.meeting_id, self.summarization_worker.summary_file, summary)
+
+        self.progress_bar.setVisible(self.refining)
+        if self.summarization_worker.api_pending:
+            self.transcription_status.setText("Quick summary shown; waiting for OpenAI summary")
+        elif self.summarization_worker.source == "local":
+            self.transcription_status.setText("Summary generated locally")
+        else:
+            self.transcription_status.setText(f"Summary generated with {Config.OPENAI_MODEL}")
 
         # Enable buttons after summarization is complete
+        self.generate_summary_button.setText("Generate Summary")
         self.generate_summary_button.setEnabled(True)
         self.save_summary_button.setEnabled(True)
 
+        # Refinement may have finished while this summary was being generated
+        self.resummarize_if_changed()
+
+    def on_summary_replaced(self, summary, summary_file):
+        """Swap the quick local summary for the OpenAI one once it arrives"""
+        # Ignore late results from an older summary, or if the transcript changed since
+        if self.sender() is not self.summarization_worker or self.summarizing or not self.current_summary:
+            return
+        self.current_summary = summary
+        self.summary_text.setText(summary)
+        if self.summarization_worker.meeting_id:
+            self.db.set_summary(self.summarization_worker.meeting_id, summary_file or None, summary)
+        self.transcription_status.setText(f"Summary updated with {Config.OPENAI_MODEL}")
+
+    def on_summarization_cancelled(self):
+        """Keep the partial summary on screen, but don't offer to save it"""
+        self.summarizing = False
+        self.summary_from_draft = False
+        self.progress_bar.setVisible(self.refining)
+        self.transcription_status.setText("Summary stopped")
+        self.generate_summary_button.setText("Generate Summary")
+        self.generate_summary_button.setEnabled(True)
+
     def on_summarization_error(self, error_message):
         """Handle summarization errors"""
-        self.progress_bar.setVisible(False)
+        self.summarizing = False
+        self.summary_from_draft = False
+        self.progress_bar.setVisible(self.refining)
         self.transcription_status.setText("Summary generation failed")
+        self.generate_summary_button.setText("Generate Summary")
         self.generate_summary_button.setEnabled(True)
         QMessageBox.critical(self, "Summarization Error", error_message)
 
@@ -371,30 +748,53 @@ class MeetingAssistantWindow(QMainWindow):
             QMessageBox.warning(self, "Warning", "No transcript to clean")
             return
 
-        from transcription.cleaner import TranscriptCleaner
-        cleaner = TranscriptCleaner()
-        cleaned_text = cleaner.clean_transcript(self.current_transcript)
-
+        self.clean_transcript_button.setEnabled(False)
+        self.status_bar.showMessage("Cleaning transcript...")
+        self.clean_worker = CleanTranscriptWorkerThread(self.current_transcript)
+        self.clean_worker.finished.connect(self.on_clean_finished)
+        self.clean_worker.error.connect(self.on_clean_error)
+        self.clean_worker.start()
+
+    def on_clean_finished(self, cleaned_text):
+        """Show the cleaned transcript"""
+        self.clean_transcript_button.setEnabled(True)
+        self.status_bar.clearMessage()
         self.transcript_text.setText(cleaned_text)
         self.current_transcript = cleaned_text
 
-        # Clear summary since transcript changed - user needs to regenerate manually
+        # Clear summary since transcript changed - user needs to regenerate manually,
+        # which only re-summarizes the parts of a long transcript whose content changed
         self.summary_text.clear()
         self.current_summary = ""
         self.save_summary_button.setEnabled(False)
 
+    def on_clean_error(self, error_message):
+        self.clean_transcript_button.setEnabled(True)
+        self.status_bar.clearMessage()
+        QMessageBox.critical(self, "Error", error_message)
+
     def closeEvent(self, event):
         """Handle application close event"""
         if self.recorder.is_recording:
             self.recorder.stop_recording()
         self.recorder.cleanup()
 
+        if self.live_transcription_worker:
+            self.recorder.remove_listener(self.live_transcription_worker.feed)
+            self.live_transcription_worker.finish()
+            self.live_transcription_worker.wait()
+
         if self.transcription_worker and self.transcription_worker.isRunning():
-            self.transcription_worker.quit()
+            if isinstance(self.transcription_worker, (TranscriptionWorkerThread, TwoPassTranscriptionWorkerThread)):
+                # Stops after the current chunk or refinement window
+                self.transcription_worker.cancel()
             self.transcription_worker.wait()
 
-        if self.summarization_worker and self.summarization_worker.isRunning():
-            self.summarization_worker.quit()
+        if self.summarization_worker:
+            self.summarization_worker.cancel()
             self.summarization_worker.wait()
 
+        if self.clean_worker and self.clean_worker.isRunning():
+            self.clean_worker.wait()
+
         event.accept()
\ No newline at end of file